@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api import leaders, decks, matchups, cards, prices
+from app.api import leaders, decks, matchups, cards, prices, jobs, profiles, admin, export, sync
 
 api_router = APIRouter()
 
@@ -8,4 +8,9 @@ api_router.include_router(decks.router, prefix="/decks", tags=["decks"])
 api_router.include_router(matchups.router, prefix="/matchups", tags=["matchups"])
 api_router.include_router(cards.router, prefix="/cards", tags=["cards"])
 api_router.include_router(prices.router, prefix="/prices", tags=["prices"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
 
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Any, Dict, List
+from app.config import get_settings
+from app.slow_queries import get_slow_queries, reset_slow_queries
+
+settings = get_settings()
+
+
+def require_admin(request: Request):
+    """Admin routes show bound parameters: only with admin_enabled and the admin token"""
+    if not settings.admin_enabled:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if request.headers.get("x-admin-token") != (settings.admin_token or "1"):
+        raise HTTPException(status_code=403, detail="Missing or wrong X-Admin-Token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries")
+def slow_queries(
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|mean_ms|count)$"),
+    limit: int = Query(50, ge=1, le=500),
+) -> List[Dict[str, Any]]:
+    """Slow statements of this API process by shape, with parameters, plan and originating routes/jobs"""
+    return get_slow_queries(order_by=order_by, limit=limit)
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """Reset the slow-query aggregates"""
+    reset_slow_queries()
+    return {"message": "Slow-query log cleared"}
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.read_models import read_models
 from app.services.deck_service import DeckService
 from app.schemas.deck import DeckResponse, DeckWithCost, DeckDetailedResponse
 
@@ -68,11 +69,10 @@ def get_deck_with_cost(deck_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{deck_id}/detailed", response_model=DeckDetailedResponse)
-def get_deck_detailed(deck_id: int, db: Session = Depends(get_db)):
+def get_deck_detailed(deck_id: int, request: Request, db: Session = Depends(get_db)):
     """Get detailed deck with full card information for deck viewer"""
-    service = DeckService(db)
-    deck = service.get_detailed(deck_id)
-    if not deck:
+    response = read_models.response(db, request.headers.get("accept-encoding"), "deck_detailed", deck_id)
+    if response is None:
         raise HTTPException(status_code=404, detail="Deck not found")
-    return deck
+    return response
 
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Any, Iterator, Optional
+from app.columnar import ColumnarUnavailable, arrow_stream, parquet_root, parquet_state, require_pyarrow
+from app.database import SessionLocal, get_db
+from app.services import JobQueue
+from app.services.export_service import ExportService
+from app.services.job_queue import MANUAL_PRIORITY
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",  # Starlette adds the charset
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _cell(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _stream(dataset: str, format: str, since: Optional[datetime]) -> Iterator[str]:
+    """One chunk per fetched batch of rows
+
+    Opens its own session: the response body is produced after the endpoint
+    (and its get_db dependency) has returned.
+    """
+    db = SessionLocal()
+    try:
+        service = ExportService(db)
+        columns = service.columns(dataset)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(columns)
+        for batch in service.batches(dataset, since):
+            if format == "csv":
+                writer.writerows([_cell(value) for value in row] for row in batch)
+            else:
+                for row in batch:
+                    buffer.write(json.dumps(dict(zip(columns, map(_cell, row)))))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/prices/parquet")
+def get_parquet_export():
+    """State of the Parquet price dataset: location, watermark and totals"""
+    return {"path": parquet_root(), **parquet_state()}
+
+
+@router.post("/prices/parquet")
+def trigger_parquet_export(
+    full: bool = Query(False, description="Rewrite the whole dataset instead of appending new rows"),
+    db: Session = Depends(get_db)
+):
+    """Queue the Parquet price export; poll GET /api/jobs/{job_id} for the result"""
+    try:
+        require_pyarrow()
+    except ColumnarUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    job, created = JobQueue(db).enqueue("export_prices_parquet", payload={"full": full}, priority=MANUAL_PRIORITY)
+    return {"job_id": job.id, "status": job.status, "already_queued": not created,
+            "message": "Parquet price export queued"}
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str = Path(..., pattern="^(cards|decks|matchups|prices)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv|arrow)$"),
+    since: Optional[datetime] = Query(None, description="Only rows updated (prices: fetched) at or after this time"),
+):
+    """Stream a whole table as NDJSON, CSV or an Arrow IPC stream in one response
+
+    Prices cover every source: scraped rows and the snapshot history.
+    """
+    if format == "arrow":
+        try:
+            require_pyarrow()
+        except ColumnarUnavailable as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    body = arrow_stream(dataset, since) if format == "arrow" else _stream(dataset, format, since)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.services.job_queue import JobQueue
+from app.schemas.job import JobResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[JobResponse])
+def get_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|succeeded|failed)$"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """List scrape/import jobs, most recent first"""
+    return JobQueue(db).get_jobs(status=status, kind=kind, limit=limit)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Get the status, progress and result of a scrape/import job"""
+    job = JobQueue(db).get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
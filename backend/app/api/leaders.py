@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.read_models import read_models
 from app.services.leader_service import LeaderService
 from app.schemas.leader import LeaderResponse, LeaderWithStats
 
@@ -16,10 +17,9 @@ def get_leaders(db: Session = Depends(get_db)):
 
 
 @router.get("/tier-list", response_model=List[LeaderWithStats])
-def get_tier_list(db: Session = Depends(get_db)):
+def get_tier_list(request: Request, db: Session = Depends(get_db)):
     """Get leaders ranked by win rate with tier assignments"""
-    service = LeaderService(db)
-    return service.get_tier_list()
+    return read_models.response(db, request.headers.get("accept-encoding"), "tier_list")
 
 
 @router.get("/{leader_id}", response_model=LeaderResponse)
@@ -1,13 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+import math
+import struct
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic_core import to_jsonable_python
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional, Union
 from app.database import get_db
+from app.matchup_stats import SmoothingUnavailable, require_numpy
+from app.read_models import read_models
 from app.services.matchup_service import MatchupService
-from app.schemas.matchup import MatchupResponse, MatchupMatrix
+from app.schemas.matchup import (
+    MatchupResponse, MatchupMatrix, MatchupMatrixColumnar, SmoothedMatchupMatrix, SmoothedMatchupMatrixColumnar,
+)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 router = APIRouter()
 
 
+def _float32(values: List[Any]) -> bytes:
+    return struct.pack(f"<{len(values)}f", *(math.nan if value is None else value for value in values))
+
+
+def _msgpack_matrix(columnar: Dict[str, Any]) -> bytes:
+    """MessagePack of the columnar matrix with the arrays as raw little-endian buffers
+
+    Rates are float32 with NaN for no data, sample sizes uint32 - ready for
+    numpy.frombuffer or a JS Float32Array without parsing.
+    """
+    packed = {
+        "leaders": columnar["leaders"],
+        "leader_names": columnar["leader_names"],
+        "win_rate": _float32(columnar["win_rate"]),
+        "sample_size": struct.pack(f"<{len(columnar['sample_size'])}I", *columnar["sample_size"]),
+        "first_win_rate": _float32(columnar["first_win_rate"]),
+        "second_win_rate": _float32(columnar["second_win_rate"]),
+    }
+    if "prior_games" in columnar:
+        packed.update({name: _float32(columnar[name]) for name in ("smoothed_win_rate", "ci_low", "ci_high")})
+        packed["prior_games"] = columnar["prior_games"]
+    return msgpack.packb(packed)
+
+
 @router.get("/", response_model=List[MatchupResponse])
 def get_matchups(db: Session = Depends(get_db)):
     """Get all matchups"""
@@ -15,11 +52,55 @@ def get_matchups(db: Session = Depends(get_db)):
     return service.get_all()
 
 
-@router.get("/matrix", response_model=MatchupMatrix)
-def get_matchup_matrix(db: Session = Depends(get_db)):
-    """Get the full matchup matrix for all leaders"""
-    service = MatchupService(db)
-    return service.get_matrix()
+@router.get("/matrix", response_model=Union[
+    SmoothedMatchupMatrix, SmoothedMatchupMatrixColumnar, MatchupMatrix, MatchupMatrixColumnar
+])
+def get_matchup_matrix(
+    request: Request,
+    format: str = Query("json", pattern="^(json|columnar|msgpack)$"),
+    leaders: Optional[str] = Query(None, description="Comma-separated leader IDs (kept in this order)"),
+    top: Optional[int] = Query(None, ge=1, le=1000, description="Only the N leaders with the most meta share or games"),
+    by: str = Query("meta_share", pattern="^(meta_share|games)$", description="Ranking for top"),
+    min_sample: int = Query(0, ge=0, description="Pairs with fewer games count as no data"),
+    color: Optional[str] = Query(None, description="Only leaders of this color"),
+    smoothed: bool = Query(False, description="Add sample-size-aware estimates and 95% intervals"),
+    db: Session = Depends(get_db)
+):
+    """Get the matchup matrix for all leaders, or the sub-matrix selected by the filters
+
+    format=columnar returns the leader list plus dense row-major arrays
+    (MatchupMatrixColumnar); format=msgpack the same as MessagePack with
+    float32/uint32 array buffers. The unfiltered matrix is served from the
+    read-model cache; filtered ones only read the pairs they cover.
+    smoothed=true adds smoothed_win_rate, ci_low and ci_high per cell
+    (beta-binomial shrinkage, app.matchup_stats) and the prior's strength.
+    """
+    if format == "msgpack" and msgpack is None:
+        raise HTTPException(status_code=501, detail="format=msgpack needs msgpack (pip install msgpack)")
+    if smoothed:
+        try:
+            require_numpy()
+        except SmoothingUnavailable as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    accept_encoding = request.headers.get("accept-encoding")
+    leader_ids = [leader_id.strip() for leader_id in leaders.split(",") if leader_id.strip()] if leaders else None
+    if leader_ids is None and top is None and not min_sample and not color:
+        suffix = "_smoothed" if smoothed else ""
+        if format == "json":
+            return read_models.response(db, accept_encoding, "matrix" + suffix)
+        if format == "columnar":
+            return read_models.response(db, accept_encoding, "matrix_columnar" + suffix)
+        columnar = read_models.get(db, "matrix_columnar" + suffix)
+    else:
+        service = MatchupService(db)
+        filters = {"leader_ids": list(dict.fromkeys(leader_ids)) if leader_ids is not None else None,
+                   "top": top, "by": by, "min_sample": min_sample, "color": color, "smoothed": smoothed}
+        if format == "json":
+            return service.get_matrix(**filters)
+        columnar = service.get_matrix_columnar(**filters)
+        if format == "columnar":
+            return columnar
+    return Response(content=_msgpack_matrix(to_jsonable_python(columnar)), media_type="application/msgpack")
 
 
 @router.get("/leader/{leader_id}", response_model=List[MatchupResponse])
@@ -35,9 +116,6 @@ def get_matchup(leader_a: str, leader_b: str, db: Session = Depends(get_db)):
     service = MatchupService(db)
     matchup = service.get_matchup(leader_a, leader_b)
     if not matchup:
-        # Try reverse
-        matchup = service.get_matchup(leader_b, leader_a)
-        if not matchup:
-            raise HTTPException(status_code=404, detail="Matchup not found")
+        raise HTTPException(status_code=404, detail="Matchup not found")
     return matchup
 
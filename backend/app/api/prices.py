@@ -2,13 +2,14 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 from app.database import get_db
+from app.read_models import read_models
 from app.services.price_service import PriceService
-from app.schemas.card_price import CardPriceResponse
+from app.schemas.card import CardPriceInfo
 
 router = APIRouter()
 
 
-@router.get("/card/{card_id}", response_model=List[CardPriceResponse])
+@router.get("/card/{card_id}", response_model=List[CardPriceInfo])
 def get_price_history(
     card_id: str,
     days: int = Query(30, ge=1, le=365),
@@ -33,6 +34,6 @@ def get_top_movers(
     db: Session = Depends(get_db)
 ) -> Dict[str, List[Dict]]:
     """Get cards with biggest price changes"""
-    service = PriceService(db)
-    return service.get_top_movers(days=days, limit=limit)
+    movers = read_models.get(db, "movers", days)
+    return {"gainers": movers["gainers"][:limit], "losers": movers["losers"][:limit]}
 
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+from typing import List
+from app.config import get_settings
+from app.profiling import list_profiles, profile_path, token_accepted
+from app.schemas.profile import ProfileInfo
+
+settings = get_settings()
+
+
+def require_profiling(request: Request):
+    """Profiles hold code paths and timings: only with profiling_enabled and the profiling token"""
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    token = request.headers.get("x-profile") or request.query_params.get("_profile")
+    if not token_accepted(token):
+        raise HTTPException(status_code=403, detail="Missing or wrong X-Profile token")
+
+
+router = APIRouter(dependencies=[Depends(require_profiling)])
+
+
+@router.get("/", response_model=List[ProfileInfo])
+def get_profiles():
+    """List stored request and job profiles, newest first"""
+    return list_profiles()
+
+
+@router.get("/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|pstats)$"),
+):
+    """Download a profile as speedscope JSON or a pstats file"""
+    path = profile_path(profile_id, format)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    filename = path.rsplit("/", 1)[-1]
+    media_type = "application/json" if format == "speedscope" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=filename)
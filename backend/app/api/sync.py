@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Any, Dict
+from app.database import get_db
+from app.services.sync_service import SyncService
+
+router = APIRouter()
+
+
+@router.get("")
+def sync_catalog(
+    since: int = Query(0, ge=0, description="seq returned by the previous sync; 0 for everything"),
+    limit: int = Query(1000, ge=1, le=10000, description="Change-log entries per page"),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Cards, leaders and card prices inserted, updated or deleted after `since`
+
+    Repeat with since=<seq> while has_more is true, and keep the last seq
+    for the next sync.
+    """
+    return SyncService(db).changes(since=since, limit=limit)
@@ -0,0 +1,194 @@
+"""
+Columnar exports (Arrow IPC and Parquet) for analytics.
+
+GET /api/export/{dataset}?format=arrow streams an Arrow IPC stream, one
+record batch per batch fetched from the export cursor, which pandas,
+Polars and DuckDB read without parsing. The export_prices_parquet job
+appends price history to a Hive-partitioned Parquet dataset under
+export_dir (prices/set_code=OP01/month=2026-10/part-*.parquet) - each run
+only writes rows fetched after the previous run's watermark - and rebuilds
+the daily rollup (price_daily/...) of the partitions it touched.
+
+pyarrow is an optional dependency: without it these functions raise
+ColumnarUnavailable and the API answers 501.
+"""
+import io
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import Boolean, DateTime, Float, Integer
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Card
+from app.progress import stage, track
+from app.services.export_service import ExportService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PARQUET_BATCH_SIZE = 50_000
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"  # Partition directory name pyarrow uses for a NULL set_code
+
+
+class ColumnarUnavailable(RuntimeError):
+    """pyarrow is not installed"""
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ColumnarUnavailable("Arrow/Parquet export needs pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def arrow_schema(fields: List[Tuple[str, Any]]):
+    """Arrow schema for ExportService.fields(): fixed types, so batches that are all NULL in a column still match"""
+    pa = require_pyarrow()
+
+    def arrow_type(sql_type):
+        if isinstance(sql_type, Integer):
+            return pa.int64()
+        if isinstance(sql_type, Float):
+            return pa.float64()
+        if isinstance(sql_type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(sql_type, Boolean):
+            return pa.bool_()
+        return pa.string()
+
+    return pa.schema([(name, arrow_type(sql_type)) for name, sql_type in fields])
+
+
+def record_batch(schema, rows):
+    pa = require_pyarrow()
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+    )
+
+
+def arrow_stream(dataset: str, since: Optional[datetime] = None) -> Iterator[bytes]:
+    """Arrow IPC stream of an export dataset, one message chunk per fetched batch"""
+    pa = require_pyarrow()
+    db = SessionLocal()
+    try:
+        service = ExportService(db)
+        schema = arrow_schema(service.fields(dataset))
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for rows in service.batches(dataset, since):
+                writer.write_batch(record_batch(schema, rows))
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        yield sink.getvalue()  # Schema (if there were no rows) and end-of-stream marker
+    finally:
+        db.close()
+
+
+# ============ PARQUET PRICE HISTORY ============
+
+def parquet_root() -> str:
+    return os.path.join(settings.export_dir, "parquet")
+
+
+def _state_path(root: str) -> str:
+    return os.path.join(root, "prices", "_state.json")
+
+
+def parquet_state(root: Optional[str] = None) -> Dict[str, Any]:
+    """Watermark and totals of the Parquet price export (empty before the first run)"""
+    path = _state_path(root or parquet_root())
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_price_parquet(db: Session, root: Optional[str] = None, full: bool = False) -> Dict[str, Any]:
+    """Append price rows fetched since the last run to the partitioned dataset (blocking)
+
+    full=True drops the dataset and rewrites it from scratch.
+    """
+    pa = require_pyarrow()
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    root = root or parquet_root()
+    prices_dir = os.path.join(root, "prices")
+    daily_dir = os.path.join(root, "price_daily")
+    state = {} if full else parquet_state(root)
+    if full:
+        shutil.rmtree(prices_dir, ignore_errors=True)
+        shutil.rmtree(daily_dir, ignore_errors=True)
+    watermark = datetime.fromisoformat(state["watermark"]) if state.get("watermark") else None
+
+    set_codes = dict(db.query(Card.id, Card.set_code).all())
+    service = ExportService(db, batch_size=PARQUET_BATCH_SIZE)
+    fields = service.fields("prices")
+    schema = arrow_schema(fields).append(pa.field("set_code", pa.string())).append(pa.field("month", pa.string()))
+    touched: Set[Tuple[Optional[str], str]] = set()
+    seen = {"rows": 0, "max_fetched_at": watermark}
+
+    def batches():
+        fetched_index = [name for name, _ in fields].index("fetched_at")
+        for rows in service.batches("prices", after=watermark):
+            extended = []
+            for row in rows:
+                fetched_at = row[fetched_index]
+                key = (set_codes.get(row[0]), fetched_at.strftime("%Y-%m"))
+                touched.add(key)
+                extended.append((*row, *key))
+                if seen["max_fetched_at"] is None or fetched_at > seen["max_fetched_at"]:
+                    seen["max_fetched_at"] = fetched_at
+            seen["rows"] += len(rows)
+            yield record_batch(schema, extended)
+
+    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    with stage("write_parquet"):
+        ds.write_dataset(
+            pa.RecordBatchReader.from_batches(schema, batches()),
+            prices_dir,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("set_code", pa.string()), ("month", pa.string())]),
+                                         flavor="hive"),
+            basename_template=f"part-{run_id}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",  # Keep earlier runs' files: this is an append
+        )
+
+    # Counted here: pyarrow pulls the batches on its own thread, outside the job's context
+    track("rows_exported", seen["rows"])
+
+    # Rebuild the daily rollup of every partition that got new rows
+    with stage("rollup"):
+        for set_code, month in sorted(touched, key=lambda key: (key[0] or "", key[1])):
+            partition = os.path.join(f"set_code={set_code if set_code is not None else HIVE_NULL}", f"month={month}")
+            table = pq.read_table(os.path.join(prices_dir, partition), partitioning=None)
+            table = table.append_column("day", pc.cast(table["fetched_at"], pa.date32()))
+            daily = table.group_by(["card_id", "source", "day"]).aggregate([
+                ("market_price", "min"), ("market_price", "max"), ("market_price", "mean"), ("market_price", "count"),
+            ]).sort_by([("card_id", "ascending"), ("source", "ascending"), ("day", "ascending")])
+            os.makedirs(os.path.join(daily_dir, partition), exist_ok=True)
+            pq.write_table(daily, os.path.join(daily_dir, partition, "data.parquet"))
+
+    state = {
+        "watermark": seen["max_fetched_at"].isoformat() if seen["max_fetched_at"] else None,
+        "rows": state.get("rows", 0) + seen["rows"],
+        "runs": state.get("runs", 0) + 1,
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    os.makedirs(prices_dir, exist_ok=True)
+    with open(_state_path(root), "w") as f:
+        json.dump(state, f, indent=2)
+    logger.info(f"Parquet price export: {seen['rows']} new rows in {len(touched)} partition(s)")
+    return {"rows_appended": seen["rows"], "partitions_touched": len(touched), **state}
@@ -0,0 +1,87 @@
+"""
+Response compression with Accept-Encoding negotiation (br, zstd, gzip).
+
+CompressionMiddleware compresses responses on the fly at a fast level; the
+read-model cache (app.read_models) compresses each cached payload once per
+data version at a high level and serves those bytes as they are. gzip is
+always available; Brotli and zstd need the optional brotli / zstandard
+packages and are simply not offered without them.
+"""
+import zlib
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Preference when the client accepts several equally
+ENCODINGS = [name for name, available in (("br", brotli), ("zstd", zstandard), ("gzip", True)) if available]
+
+# Per-response work has to stay cheap; snapshots are compressed once, so spend more
+STREAM_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+SNAPSHOT_LEVELS = {"br": 11, "zstd": 19, "gzip": 9}
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding we support that the Accept-Encoding header allows, or None for identity"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    candidates = [(weights.get(name, wildcard), -rank, name) for rank, name in enumerate(ENCODINGS)]
+    q, _, name = max(candidates)
+    return name if q > 0 else None
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a whole body (SNAPSHOT_LEVELS by default)"""
+    level = SNAPSHOT_LEVELS[encoding] if level is None else level
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        return compressor.compress(data) + compressor.flush()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class StreamCompressor:
+    """Incremental compressor for a response sent in several body messages"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        level = STREAM_LEVELS[encoding] if level is None else level
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == "gzip":
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, chunk: bytes, last: bool = False) -> bytes:
+        """Compressed bytes for `chunk`, flushed so the client can decode each chunk as it arrives"""
+        compressor = self._compressor
+        if self.encoding == "br":
+            return compressor.process(chunk) + (compressor.finish() if last else compressor.flush())
+        if self.encoding == "zstd":
+            mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if last else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            return compressor.compress(chunk) + compressor.flush(mode)
+        return compressor.compress(chunk) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
@@ -5,11 +5,63 @@ from functools import lru_cache
 class Settings(BaseSettings):
     app_name: str = "OPTCG Stats API"
     database_url: str = "sqlite:///./optcg_stats.db"
+    sqlite_mmap_mb: int = 256  # Memory-map the SQLite file, so processes share its pages through the OS cache
     debug: bool = True
     
     # Scraper settings
     scrape_interval_hours: int = 6
     request_delay_seconds: float = 1.0
+    scrape_concurrency: int = 4  # Max in-flight requests per scraper
+    price_scrape_max_pages: int = 20  # Listing pages walked per set
+    ingestion_offload: bool = True  # Parse in a process pool, write on a DB thread
+    parse_workers: int = 2
+    
+    # Ingestion worker (python -m app.worker)
+    embedded_worker: bool = False  # Run the worker inside the API process (single-process dev setups)
+    worker_concurrency: int = 1  # Jobs run at once per worker process
+    worker_poll_seconds: float = 2.0
+    job_lease_seconds: int = 300  # Renewed while the job runs; expiry hands the job to another worker
+    job_retry_backoff_seconds: float = 60.0  # Doubled after each failed attempt
+    job_progress_seconds: float = 5.0  # How often a running job's progress is saved
+    scheduler_lease_seconds: int = 60  # Only the lease holder among worker processes runs the scheduler
+    
+    # SQL instrumentation (app.middleware.QueryCountMiddleware)
+    sql_query_budget: int = 50  # Statements per request before a warning; 0 disables
+    sql_repeat_threshold: int = 10  # Same statement shape this often in one request looks like N+1; 0 disables
+    sql_strict: bool = False  # Fail the request instead of warning (tests/conftest.py sets it)
+    slow_query_ms: float = 100.0  # Statements slower than this go to the slow-query log; 0 disables
+    slow_query_explain: bool = True  # Capture EXPLAIN (QUERY PLAN) for slow SELECTs
+    slow_query_max_shapes: int = 200
+    
+    # Admin endpoints (/api/admin): send "X-Admin-Token: <token>"
+    admin_enabled: bool = False
+    admin_token: str = ""  # Required value of the header; empty accepts "1"
+    
+    # On-demand profiling (app.profiling): send "X-Profile: <token>" or ?_profile=<token>
+    profiling_enabled: bool = False
+    profiling_token: str = ""  # Required value of the header/flag; empty accepts "1"
+    profile_dir: str = "./data/profiles"
+    profile_interval_ms: float = 2.0  # Sampling interval
+    profile_jobs: str = ""  # Comma-separated job kinds the worker profiles ("*" for all)
+    
+    # Read-model cache (app.read_models): hot responses precomputed at startup and after imports
+    read_model_store: str = "memory"  # "memory" (per process) or "database" (shared by all API processes)
+    read_model_warm: bool = True  # Warm in the API lifespan; /ready waits for it
+    read_model_check_seconds: float = 30.0  # How often the API warmer looks for a newly finished ingestion job
+    read_model_ttl_seconds: int = 3600  # Upper bound on an entry's age, whatever the data version
+    warm_mover_days: str = "7,30"  # Price-mover windows to precompute
+    warm_popular_decks: int = 20  # Most-played decks whose detail view is precomputed
+    
+    # Response compression (app.compression); br and zstd need the brotli / zstandard packages
+    compression_enabled: bool = True
+    compression_min_bytes: int = 1024  # Smaller single-body responses are sent as they are
+    
+    # Matchup smoothing (app.matchup_stats)
+    matchup_prior_games: float = 0.0  # Strength of the 50% prior in games; 0 = fit it to the data
+    
+    # Exports (app.columnar)
+    export_dir: str = "./data/exports"
+    parquet_export_hours: int = 0  # Append new price history to the Parquet dataset this often; 0 = on demand only
     
     # Price cache TTL in hours
     price_cache_ttl_hours: int = 4
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
@@ -10,6 +10,20 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
 )
 
+if engine.dialect.name == "sqlite":
+    # The API and the ingestion worker are separate processes sharing one
+    # file: WAL lets readers carry on during a write, and writers wait for
+    # the lock instead of failing with "database is locked". mmap lets the
+    # processes read the file (read-model snapshots included) through the
+    # shared OS page cache instead of each copying pages into its own.
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=30000")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_mb * 1024 * 1024}")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -21,4 +35,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
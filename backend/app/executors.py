@@ -0,0 +1,99 @@
+"""
+Executors that keep ingestion work off the API event loop.
+
+The scheduler and the manual import endpoints run scrapers on the same event
+loop that serves requests. Anything CPU-heavy (HTML/JSON parsing) goes to a
+process pool via run_parse, and blocking SQLAlchemy work goes to a dedicated
+thread via run_db, so request handlers keep getting scheduled while an
+import runs.
+"""
+import asyncio
+import contextvars
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+# Cumulative time spent waiting on each executor, for benchmarks and metrics
+executor_stats = {"parse_calls": 0, "parse_seconds": 0.0, "db_calls": 0, "db_seconds": 0.0}
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        # spawn: forking a process that owns an event loop and DB connections is unsafe
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=settings.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        # One thread: sessions are not thread-safe and SQLite has a single writer
+        _db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion-db")
+    return _db_executor
+
+
+async def run_parse(fn: Callable, *args) -> Any:
+    """Run a module-level parse function in the process pool
+
+    `fn` and its arguments must be picklable. With ingestion_offload turned
+    off this runs inline, which is the old (blocking) behaviour.
+    """
+    start = time.perf_counter()
+    try:
+        if not settings.ingestion_offload:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_parse_pool(), fn, *args)
+    finally:
+        executor_stats["parse_calls"] += 1
+        executor_stats["parse_seconds"] += time.perf_counter() - start
+
+
+async def run_db(fn: Callable, *args, **kwargs) -> Any:
+    """Run blocking database work on the dedicated ingestion DB thread
+
+    Like asyncio.to_thread, the caller's context variables (e.g. the running
+    job's progress counters) are visible to `fn`.
+    """
+    start = time.perf_counter()
+    try:
+        if not settings.ingestion_offload:
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(get_db_executor(), context.run, partial(fn, *args, **kwargs))
+    finally:
+        executor_stats["db_calls"] += 1
+        executor_stats["db_seconds"] += time.perf_counter() - start
+
+
+def warm_parse_pool():
+    """Start the parse pool's worker processes ahead of the first parse"""
+    if settings.ingestion_offload:
+        pool = get_parse_pool()
+        for future in [pool.submit(abs, 0) for _ in range(settings.parse_workers)]:
+            future.result()
+
+
+def shutdown_executors():
+    """Stop the pools; they are recreated lazily if used again"""
+    global _parse_pool, _db_executor
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
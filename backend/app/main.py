@@ -1,35 +1,47 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, BackgroundTasks, Depends
+from fastapi import FastAPI, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.api import api_router
-from app.database import engine, Base, get_db
+from app.database import get_db
 from app.config import get_settings
-from app.scheduler import (
-    start_scheduler, 
-    stop_scheduler, 
-    scrape_matchmaking_data, 
-    scrape_tcgplayer_prices, 
-    scrape_cardmarket_prices,
-    import_optcg_api_data,
-    scrape_limitless_data
-)
+from app.executors import shutdown_executors
+from app import metrics
+from app.middleware import CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware, QueryCountMiddleware
+from app.read_models import read_models
+from app.services import JobQueue
+from app.services.job_queue import MANUAL_PRIORITY
 
 settings = get_settings()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# No schema work here: run `python -m app.migrations` before starting the
+# API or the worker (the image's entrypoint does, or docker-compose's
+# migrate service).
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    if not settings.debug:
-        start_scheduler()
+    # Scrapes and imports run in the ingestion worker (python -m app.worker);
+    # embedded_worker runs one inside this process for single-process setups.
+    worker = worker_task = None
+    if settings.embedded_worker:
+        from app.worker import Worker
+        worker = Worker()
+        worker_task = asyncio.create_task(worker.run())
+    # Precompute the hot read models, then re-warm after each finished job
+    warmer_task = asyncio.create_task(read_models.run_warmer()) if settings.read_model_warm else None
     yield
     # Shutdown
-    if not settings.debug:
-        stop_scheduler()
+    if warmer_task:
+        warmer_task.cancel()
+    if worker:
+        worker.stop()
+        await worker_task
+    shutdown_executors()
 
 
 app = FastAPI(
@@ -48,6 +60,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Single-request profiles on demand (profiling_enabled + X-Profile header)
+app.add_middleware(ProfilingMiddleware)
+# Statement counts per request, N+1 warnings
+app.add_middleware(QueryCountMiddleware)
+# br/zstd/gzip per Accept-Encoding (cached read models come precompressed)
+app.add_middleware(CompressionMiddleware)
+# Outermost, so latency includes the other middleware
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix="/api")
 
 
@@ -65,71 +86,91 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness: 503 until the read models are warm (liveness is /health)"""
+    if settings.read_model_warm and not read_models.ready:
+        return JSONResponse(status_code=503, content={"status": "warming"})
+    return {"status": "ready", "read_models": read_models.status()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics(db: Session = Depends(get_db)):
+    """Prometheus scrape endpoint; request metrics are per API process"""
+    return PlainTextResponse(metrics.render(db), media_type="text/plain; version=0.0.4")
+
+
+# Trigger endpoints only enqueue; poll GET /api/jobs/{job_id} for the result.
+# Triggering a job that is already queued or running returns that job.
+
+def queue_job(db: Session, kind: str, payload: Optional[dict] = None) -> dict:
+    job, created = JobQueue(db).enqueue(kind, payload=payload, priority=MANUAL_PRIORITY)
+    return {"job_id": job.id, "status": job.status, "already_queued": not created}
+
+
 @app.post("/api/scrape/matchmaking")
-async def trigger_matchmaking_scrape(background_tasks: BackgroundTasks):
+def trigger_matchmaking_scrape(db: Session = Depends(get_db)):
     """Manually trigger TCG Matchmaking scrape"""
-    background_tasks.add_task(scrape_matchmaking_data)
-    return {"message": "Matchmaking scrape started"}
+    return {**queue_job(db, "scrape_matchmaking"), "message": "Matchmaking scrape queued"}
 
 
 @app.post("/api/scrape/tcgplayer")
-async def trigger_tcgplayer_scrape(background_tasks: BackgroundTasks):
+def trigger_tcgplayer_scrape(db: Session = Depends(get_db)):
     """Manually trigger TCGPlayer price scrape"""
-    background_tasks.add_task(scrape_tcgplayer_prices)
-    return {"message": "TCGPlayer scrape started"}
+    return {**queue_job(db, "scrape_tcgplayer"), "message": "TCGPlayer scrape queued"}
 
 
 @app.post("/api/scrape/cardmarket")
-async def trigger_cardmarket_scrape(background_tasks: BackgroundTasks):
+def trigger_cardmarket_scrape(db: Session = Depends(get_db)):
     """Manually trigger Cardmarket price scrape"""
-    background_tasks.add_task(scrape_cardmarket_prices)
-    return {"message": "Cardmarket scrape started"}
+    return {**queue_job(db, "scrape_cardmarket"), "message": "Cardmarket scrape queued"}
 
 
 # ============ NEW WORKING DATA IMPORTS ============
 
 @app.post("/api/import/optcg-api")
-async def trigger_optcg_api_import(background_tasks: BackgroundTasks):
+def trigger_optcg_api_import(
+    full: bool = Query(False, description="Re-import every set, not just new or changed ones"),
+    db: Session = Depends(get_db)
+):
     """
     Import cards, leaders, and prices from OPTCG API (optcgapi.com).
     This is the primary source for card data with daily updates.
     """
-    background_tasks.add_task(import_optcg_api_data)
     return {
-        "message": "OPTCG API import started",
+        **queue_job(db, "import_optcg_api", {"full": full}),
+        "message": "OPTCG API import queued",
         "source": "https://optcgapi.com",
         "data": ["cards", "leaders", "prices"]
     }
 
 
 @app.post("/api/import/limitless")
-async def trigger_limitless_scrape(background_tasks: BackgroundTasks):
+def trigger_limitless_scrape(db: Session = Depends(get_db)):
     """
     Scrape tournament/meta data from Limitless TCG (onepiece.limitlesstcg.com).
     This provides meta share, tournament rankings, and deck statistics.
     """
-    background_tasks.add_task(scrape_limitless_data)
     return {
-        "message": "Limitless TCG scrape started",
+        **queue_job(db, "scrape_limitless"),
+        "message": "Limitless TCG scrape queued",
         "source": "https://onepiece.limitlesstcg.com",
         "data": ["meta_share", "deck_rankings", "tournament_results"]
     }
 
 
 @app.post("/api/import/all")
-async def trigger_all_imports(background_tasks: BackgroundTasks):
+def trigger_all_imports(db: Session = Depends(get_db)):
     """
     Import all data from all working sources:
     - OPTCG API: cards, leaders, prices
     - Limitless TCG: meta share, deck rankings
     """
-    background_tasks.add_task(import_optcg_api_data)
-    background_tasks.add_task(scrape_limitless_data)
     return {
-        "message": "All imports started",
+        "message": "All imports queued",
+        "jobs": [queue_job(db, "import_optcg_api", {"full": False}), queue_job(db, "scrape_limitless")],
         "sources": [
             {"name": "OPTCG API", "url": "https://optcgapi.com", "data": ["cards", "leaders", "prices"]},
             {"name": "Limitless TCG", "url": "https://onepiece.limitlesstcg.com", "data": ["meta_share", "deck_rankings"]}
         ]
     }
-
@@ -0,0 +1,172 @@
+"""
+Sample-size-aware matchup estimates: beta-binomial shrinkage with NumPy.
+
+A raw win rate from a handful of games is mostly noise, and a pair with no
+games has no estimate at all. Each pair's record is treated as binomial
+with a Beta(a, a) prior centred on 50% - matchups are zero-sum, so the
+prior is symmetric and the smoothed matrix stays antisymmetric. The prior's
+strength (2a, in games) is fitted by the method of moments unless
+matchup_prior_games is set: the spread of observed win rates around 50%,
+minus what binomial noise alone would produce, is the spread of the true
+rates. Every cell then gets its posterior mean and a 95% interval from the
+normal approximation of the posterior Beta.
+
+The whole L x L matrix is computed in one pass of array operations and
+cached per matchup data version (row counts and last update), so
+sub-matrices and repeated requests are lookups. numpy is an optional
+dependency: without it these functions raise SmoothingUnavailable and the
+API answers 501.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import get_settings
+from app.models import Leader, Matchup
+
+settings = get_settings()
+
+CI_Z = 1.96  # Two-sided 95%
+MIN_PRIOR_GAMES = 2.0  # Beta(1, 1): uniform
+MAX_PRIOR_GAMES = 10_000.0  # No measurable spread between matchups: shrink nearly all the way
+
+
+class SmoothingUnavailable(RuntimeError):
+    """numpy is not installed"""
+
+
+def require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise SmoothingUnavailable("Matchup smoothing needs numpy (pip install numpy)")
+    return numpy
+
+
+def fit_prior_games(wins, games) -> float:
+    """Prior strength in games from dense win/game matrices (each pair counted once)"""
+    np = require_numpy()
+    pairs = np.triu(games > 0, k=1)
+    n = games[pairs]
+    if n.size < 2:
+        return MIN_PRIOR_GAMES
+    p = wins[pairs] / n
+    noise = np.mean(p * (1 - p) / n)
+    spread = np.mean((p - 0.5) ** 2) - noise
+    if spread <= 0:
+        return MAX_PRIOR_GAMES
+    # Beta(a, a) has variance 1 / (4 (2a + 1))
+    return float(np.clip(0.25 / spread - 1, MIN_PRIOR_GAMES, MAX_PRIOR_GAMES))
+
+
+def smooth(wins, games, prior_games: Optional[float] = None):
+    """Posterior mean and interval bounds (fractions) for every cell; returns (mean, low, high, prior_games)"""
+    np = require_numpy()
+    if not prior_games:
+        prior_games = fit_prior_games(wins, games)
+    alpha = prior_games / 2
+    a = alpha + wins
+    b = alpha + games - wins
+    total = a + b
+    mean = a / total
+    sd = np.sqrt(a * b / (total * total * (total + 1)))
+    return mean, np.clip(mean - CI_Z * sd, 0, 1), np.clip(mean + CI_Z * sd, 0, 1), prior_games
+
+
+@dataclass
+class SmoothedMatchups:
+    """Smoothed estimates for every leader pair, in percent from the row leader's side"""
+    version: Tuple
+    index: Dict[str, int]  # leader ID -> row/column
+    prior_games: float
+    win_rate: Any  # L x L float arrays, NaN on the diagonal
+    ci_low: Any
+    ci_high: Any
+
+    def block(self, leader_ids: List[str]):
+        """(win_rate, ci_low, ci_high) sub-matrices for these leaders, in this order"""
+        np = require_numpy()
+        rows = np.array([self.index.get(leader_id, -1) for leader_id in leader_ids], dtype=np.intp)
+        known = rows >= 0
+        blocks = []
+        for values in (self.win_rate, self.ci_low, self.ci_high):
+            block = np.full((len(rows), len(rows)), np.nan)
+            block[np.ix_(known, known)] = values[np.ix_(rows[known], rows[known])]
+            blocks.append(block)
+        return tuple(blocks)
+
+
+def matchup_version(db: Session) -> Tuple:
+    """Changes whenever a matchup or leader is added, removed or updated
+
+    Separate queries so that each one is answered from an index (MAX from
+    ix_matchups_updated_at) instead of one scan of the table.
+    """
+    return (
+        db.query(func.count(Matchup.id)).scalar(),
+        db.query(func.max(Matchup.updated_at)).scalar(),
+        db.query(func.count(Leader.id)).scalar(),
+    )
+
+
+def build(db: Session, version: Tuple = ()) -> SmoothedMatchups:
+    """Dense win/game matrices of every stored pair, smoothed"""
+    np = require_numpy()
+    # Core select: no ORM row processing for ~L^2/2 rows
+    pairs = db.execute(
+        select(Matchup.leader_a_id, Matchup.leader_b_id, Matchup.win_rate_a, Matchup.sample_size).where(
+            Matchup.leader_a_id != Matchup.leader_b_id, Matchup.sample_size > 0
+        )
+    ).all()
+    leader_a, leader_b, rate, sample = zip(*pairs) if pairs else ((), (), (), ())
+    index = {leader_id: i for i, leader_id in enumerate(sorted(
+        {leader_id for (leader_id,) in db.execute(select(Leader.id))}.union(leader_a, leader_b)
+    ))}
+    a = np.fromiter(map(index.__getitem__, leader_a), dtype=np.intp, count=len(leader_a))
+    b = np.fromiter(map(index.__getitem__, leader_b), dtype=np.intp, count=len(leader_b))
+    n = np.array(sample, dtype=float)
+    w = np.clip(np.array(rate, dtype=float) / 100 * n, 0, n)
+
+    # Pairs are stored once; the reverse cell is the other side of the same games
+    wins = np.zeros((len(index), len(index)))
+    games = np.zeros((len(index), len(index)))
+    wins[a, b], wins[b, a] = w, n - w
+    games[a, b], games[b, a] = n, n
+
+    mean, low, high, prior_games = smooth(wins, games, settings.matchup_prior_games)
+    for values in (mean, low, high):
+        np.fill_diagonal(values, np.nan)
+    return SmoothedMatchups(
+        version=version,
+        index=index,
+        prior_games=round(prior_games, 2),
+        win_rate=np.round(mean * 100, 2),
+        ci_low=np.round(low * 100, 2),
+        ci_high=np.round(high * 100, 2),
+    )
+
+
+_lock = threading.Lock()
+_cached: Optional[SmoothedMatchups] = None
+
+
+def smoothed_matchups(db: Session) -> SmoothedMatchups:
+    """Smoothed matrix for the current matchup data, rebuilt only when it changed"""
+    global _cached
+    version = (*matchup_version(db), settings.matchup_prior_games)
+    with _lock:
+        if _cached is not None and _cached.version == version:
+            metrics.record_cache("matchup_smoothing", hit=True)
+            return _cached
+        metrics.record_cache("matchup_smoothing", hit=False)
+        _cached = build(db, version)
+        return _cached
+
+
+def as_list(values) -> List[Optional[float]]:
+    """Flattened row-major values with NaN as None"""
+    return [None if value != value else value for value in values.ravel().tolist()]
@@ -0,0 +1,214 @@
+"""
+Process-local metrics rendered in the Prometheus text format at /metrics.
+
+Request latency, in-flight requests, SQL statement and cache counters are
+kept in memory by this process. Ingestion counters are read from the
+database instead: jobs run in the worker process, and the job queue adds
+each finished attempt's progress counters (http_requests, bytes_downloaded,
+rows_written, ...) and per-stage seconds to running totals in
+ingestion_totals, so any API process can report them with one small query.
+"""
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import IngestionTotal, Job
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = defaultdict(int)
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = defaultdict(float)
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            counts = self._counts.setdefault(labels, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[labels] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            counts = {key: list(value) for key, value in self._counts.items()}
+            sums = dict(self._sums)
+        lines = self.header()
+        for key in sorted(counts):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts[key]):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(sums[key])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "optcg_http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")
+)
+http_requests_in_flight = Gauge(
+    "optcg_http_requests_in_flight", "Requests currently being served", ("method", "route")
+)
+db_statements = Counter(
+    "optcg_db_statements_total", "SQL statements executed by this process"
+)
+db_compiled_cache = Counter(
+    "optcg_db_compiled_cache_total", "SQLAlchemy compiled statement cache lookups", ("result",)
+)
+cache_requests = Counter(
+    "optcg_cache_requests_total", "Application cache lookups", ("cache", "result")
+)
+
+REGISTRY: List[Metric] = [
+    http_request_duration, http_requests_in_flight, db_statements, db_compiled_cache, cache_requests,
+]
+
+
+def record_cache(cache: str, hit: bool):
+    """Count one lookup in an application cache"""
+    cache_requests.inc(cache, "hit" if hit else "miss")
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    db_statements.inc()
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is CacheStats.CACHE_HIT:
+        db_compiled_cache.inc("hit")
+    elif cache_hit is CacheStats.CACHE_MISS:
+        db_compiled_cache.inc("miss")
+
+
+def _pool_lines() -> List[str]:
+    pool = engine.pool
+    lines = []
+    for name, attr, doc in (
+        ("optcg_db_pool_size", "size", "Configured connection pool size"),
+        ("optcg_db_pool_checked_out", "checkedout", "Connections currently checked out"),
+        ("optcg_db_pool_overflow", "overflow", "Connections open beyond the pool size"),
+        ("optcg_db_pool_checked_in", "checkedin", "Idle connections in the pool"),
+    ):
+        if hasattr(pool, attr):
+            # overflow() goes negative while the pool is below its size
+            value = max(0, getattr(pool, attr)())
+            lines += [f"# HELP {name} {doc}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+def _ingestion_lines(db: Session) -> List[str]:
+    """Job counts by status, plus the running progress totals the job queue keeps (ingestion_totals)"""
+    lines = [
+        "# HELP optcg_jobs Jobs in the queue by kind and status",
+        "# TYPE optcg_jobs gauge",
+    ]
+    for kind, status, n in db.query(Job.kind, Job.status, func.count(Job.id)).group_by(Job.kind, Job.status).order_by(
+        Job.kind, Job.status
+    ):
+        lines.append(f"optcg_jobs{_labels(('kind', 'status'), (kind, status))} {n}")
+
+    counters: Dict[Tuple[str, str], float] = {}
+    stages: Dict[Tuple[str, str], Tuple[float, int]] = {}
+    totals = db.query(IngestionTotal).order_by(IngestionTotal.kind, IngestionTotal.metric, IngestionTotal.name)
+    for total in totals:
+        if total.metric == "stage_seconds":
+            stages[(total.kind, total.name)] = (total.value, total.samples)
+        else:
+            counters[(total.kind, total.name)] = total.value
+
+    lines += [
+        "# HELP optcg_ingestion_total Progress counters (http_requests, bytes_downloaded, rows_written, ...) summed over finished job attempts",
+        "# TYPE optcg_ingestion_total counter",
+    ]
+    lines += [
+        f"optcg_ingestion_total{_labels(('kind', 'counter'), key)} {_number(value)}"
+        for key, value in counters.items()
+    ]
+    lines += [
+        "# HELP optcg_ingestion_stage_seconds Time spent per job stage, over finished job attempts",
+        "# TYPE optcg_ingestion_stage_seconds summary",
+    ]
+    for key, (seconds, count) in stages.items():
+        lines.append(f"optcg_ingestion_stage_seconds_sum{_labels(('kind', 'stage'), key)} {_number(seconds)}")
+        lines.append(f"optcg_ingestion_stage_seconds_count{_labels(('kind', 'stage'), key)} {count}")
+    return lines
+
+
+def render(db: Session) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    lines += _ingestion_lines(db)
+    lines += _pool_lines()  # After the queries above, so this request's connection is counted
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,243 @@
+"""
+ASGI middleware for request instrumentation.
+
+Written as plain ASGI callables rather than BaseHTTPMiddleware so they add
+no extra task per request and see the response headers before they are sent.
+"""
+import logging
+import time
+from typing import Optional
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import metrics
+from app.compression import StreamCompressor, negotiate
+from app.config import get_settings
+from app.profiling import SamplingProfiler, code_on_stack, save_profile, token_accepted
+from app.query_stats import track_queries
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a request breaks the SQL query budget"""
+
+
+def matched_route(scope: Scope) -> Optional[BaseRoute]:
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """The matched route's path template ("/api/decks/{deck_id}"), or None"""
+    route = matched_route(scope)
+    return route.path if route else None
+
+
+class QueryCountMiddleware:
+    """
+    Counts SQL statements and DB time per request.
+
+    Adds X-DB-Query-Count / X-DB-Query-Time-Ms to the response and logs them
+    as structured fields. Requests over sql_query_budget statements, or that
+    run one statement shape sql_repeat_threshold times or more (an N+1 loop),
+    are logged as warnings - or, with sql_strict, turned into a server error
+    so tests fail on them.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope) or scope["path"]
+        with track_queries(origin=f"{scope['method']} {route}") as stats:
+            async def send_with_stats(message: Message):
+                if message["type"] == "http.response.start":
+                    # JSON responses are rendered by now, so the counts are final
+                    self._check(scope, route, stats)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-query-count", str(stats.count).encode()))
+                    headers.append((b"x-db-query-time-ms", str(stats.milliseconds).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+    def _check(self, scope: Scope, route: str, stats):
+        fields = {
+            "method": scope["method"],
+            "route": route,
+            "db_queries": stats.count,
+            "db_time_ms": stats.milliseconds,
+        }
+        problems = []
+        if settings.sql_query_budget and stats.count > settings.sql_query_budget:
+            problems.append(f"{stats.count} queries (budget {settings.sql_query_budget})")
+        if settings.sql_repeat_threshold:
+            for shape, n in stats.repeated(settings.sql_repeat_threshold):
+                problems.append(f"{n}x same statement: {shape[:200]}")
+
+        if not problems:
+            logger.debug(f"{scope['method']} {route}: {stats.count} queries in {stats.milliseconds}ms",
+                         extra=fields)
+            return
+        message = f"{scope['method']} {route}: " + "; ".join(problems)
+        if settings.sql_strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message, extra={**fields, "db_problems": problems})
+
+
+class MetricsMiddleware:
+    """Records request latency per route template and the number of requests in flight"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Unmatched paths share one label so random URLs can't blow up cardinality
+        route = route_template(scope) or "<unmatched>"
+        method = scope["method"]
+        status = "500"
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        metrics.http_requests_in_flight.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.http_requests_in_flight.dec(method, route)
+            metrics.http_request_duration.observe(time.perf_counter() - started, method, route, status)
+
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/msgpack", "text/", "application/javascript")
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses for clients that accept br, zstd or gzip.
+
+    Passes through responses that already have a Content-Encoding (the
+    precompressed read models), aren't text-like, or come as a single body
+    smaller than compression_min_bytes. Streamed bodies (exports) are
+    compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.compression_enabled:
+            await self.app(scope, receive, send)
+            return
+        accept = next((value.decode() for name, value in scope.get("headers", []) if name == b"accept-encoding"), None)
+        encoding = negotiate(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message  # Held until the first body message shows how big the body is
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=list(start.get("headers", [])))
+                if ("content-encoding" not in headers
+                        and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                        and (more_body or len(body) >= settings.compression_min_bytes)):
+                    compressor = StreamCompressor(encoding)
+                    del headers["content-length"]
+                    headers["content-encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    start = {**start, "headers": headers.raw}
+                await send(start)
+                start = None
+            if compressor is not None:
+                message = {**message, "body": compressor.compress(body, last=not more_body)}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+PROFILES_PATH = "/api/profiles"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand.
+
+    With profiling_enabled, a request carrying "X-Profile: <token>" or
+    ?_profile=<token> is sampled while its endpoint runs (see app.profiling).
+    The profile is stored and its id returned in X-Profile-Id; download it
+    from /api/profiles/{id} with the same header or flag.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _requested(self, scope: Scope) -> bool:
+        if scope["path"].startswith(PROFILES_PATH):
+            return False  # Downloads carry the token too; they are not what is being profiled
+        for name, value in scope.get("headers", []):
+            if name == b"x-profile":
+                return token_accepted(value.decode())
+        flag = parse_qs(scope.get("query_string", b"").decode()).get("_profile")
+        return bool(flag) and token_accepted(flag[0])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.profiling_enabled or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        route = matched_route(scope)
+        code = getattr(getattr(route, "endpoint", None), "__code__", None)
+        if code is None:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(code_on_stack(code))
+
+        async def send_with_profile(message: Message):
+            if message["type"] == "http.response.start":
+                profiler.stop()
+                profile_id = save_profile(profiler, f"{scope['method']} {route.path}")
+                logger.info(f"Profiled {scope['method']} {scope['path']}: {profile_id} "
+                            f"({profiler.sample_count} samples, {profiler.duration * 1000:.0f}ms)")
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()  # No-op if the response already went out
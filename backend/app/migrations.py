@@ -0,0 +1,56 @@
+"""
+Schema migrations (Alembic, see backend/migrations).
+
+upgrade_database() brings a database to the latest revision. A database
+that predates migrations - tables made by Base.metadata.create_all, no
+alembic_version table - is stamped at the baseline (the original five
+tables) first, so every later revision runs against it.
+
+Run with: python -m app.migrations [--revision REV]
+"""
+import argparse
+import logging
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = "0001"
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def upgrade_database(engine: Engine = default_engine, revision: str = "head"):
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "cards" in tables:
+            logger.info(f"Existing unversioned database: stamping baseline {BASELINE}")
+            command.stamp(config, BASELINE)
+        command.upgrade(config, revision)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upgrade the database schema")
+    parser.add_argument("--revision", default="head")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    upgrade_database(revision=args.revision)
+
+
+if __name__ == "__main__":
+    main()
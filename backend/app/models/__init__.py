@@ -1,8 +1,17 @@
 from app.models.leader import Leader
-from app.models.deck import Deck
+from app.models.deck import Deck, DeckCoreCard
 from app.models.matchup import Matchup
 from app.models.card import Card
 from app.models.card_price import CardPrice
+from app.models.job import Job, IngestionTotal
+from app.models.set_sync import SetSyncState
+from app.models.price_snapshot import PriceImportBatch, PriceSnapshot
+from app.models.coordination import Lease, ReadModelBody, ReadModelSnapshot
+from app.models.change_log import ChangeLog
 
-__all__ = ["Leader", "Deck", "Matchup", "Card", "CardPrice"]
+__all__ = [
+    "Leader", "Deck", "DeckCoreCard", "Matchup", "Card", "CardPrice",
+    "Job", "IngestionTotal", "SetSyncState", "PriceImportBatch", "PriceSnapshot",
+    "Lease", "ReadModelSnapshot", "ReadModelBody", "ChangeLog",
+]
 
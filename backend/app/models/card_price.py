@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -6,6 +6,10 @@ from app.database import Base
 
 class CardPrice(Base):
     __tablename__ = "card_prices"
+    __table_args__ = (
+        # Latest/oldest price per card and source: equality on both, range/order on fetched_at
+        Index("ix_card_prices_card_source_fetched", "card_id", "source", "fetched_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     card_id = Column(String, ForeignKey("cards.id"), nullable=False, index=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
+from app.database import Base
+
+
+class ChangeLog(Base):
+    """Change sequence of the synced tables (cards, leaders, card_prices) for GET /api/sync
+
+    Rows are written by database triggers (migration 0004), so every write
+    path - ORM, bulk Core statements, manual SQL - is recorded. Compaction
+    keeps only the latest entry per row.
+    """
+    __tablename__ = "change_log"
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String, nullable=False)
+    row_key = Column(String, nullable=False)  # Primary key of the changed row, as text
+    op = Column(String, nullable=False)  # "upsert" or "delete"
+    changed_at = Column(DateTime, server_default=func.current_timestamp())
+    
+    __table_args__ = (
+        Index("ix_change_log_row", "table_name", "row_key"),
+        # AUTOINCREMENT: never hand out a seq again, even after compaction deletes the newest rows
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, DateTime, JSON, LargeBinary
+from datetime import datetime
+from app.database import Base
+
+
+class Lease(Base):
+    """A named lock held by one process until it expires (scheduler, read-model warmer)"""
+    __tablename__ = "leases"
+    
+    name = Column(String, primary_key=True)  # e.g. "scheduler"
+    owner = Column(String, nullable=False)  # "host:pid" of the holder
+    expires_at = Column(DateTime, nullable=False)  # Renewed by the holder; free to take after this
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ReadModelSnapshot(Base):
+    """A precomputed API response shared by every API process (app.read_models)"""
+    __tablename__ = "read_model_snapshots"
+    
+    key = Column(String, primary_key=True)  # e.g. "tier_list", "movers:7", "deck_detailed:12"
+    version = Column(DateTime, nullable=True)  # Data version the payload was built from
+    built_at = Column(DateTime, default=datetime.utcnow)
+    payload = Column(JSON, nullable=True)
+
+
+class ReadModelBody(Base):
+    """A read-model snapshot rendered to JSON bytes, per content encoding, so it is compressed once"""
+    __tablename__ = "read_model_bodies"
+    
+    key = Column(String, primary_key=True)  # ReadModelSnapshot.key
+    encoding = Column(String, primary_key=True)  # "identity", "gzip", "br", "zstd"
+    built_at = Column(DateTime, nullable=False)  # built_at of the snapshot it was rendered from
+    body = Column(LargeBinary, nullable=False)
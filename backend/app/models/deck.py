@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -6,6 +6,10 @@ from app.database import Base
 
 class Deck(Base):
     __tablename__ = "decks"
+    __table_args__ = (
+        Index("ix_decks_leader_win_rate", "leader_id", "win_rate"),  # Decks of a leader, best first
+        Index("ix_decks_games_played", "games_played"),  # Most played / default listing order
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     leader_id = Column(String, ForeignKey("leaders.id"), nullable=False, index=True)
@@ -16,9 +20,29 @@ class Deck(Base):
     second_win_rate = Column(Float, default=0.0)  # Win rate when going second
     tier = Column(String, nullable=True)  # S, A, B, C, D
     source_url = Column(String, nullable=True)  # Where this deck was scraped from
+    meta_share = Column(Float, nullable=True)  # % of the tournament meta
+    meta_rank = Column(Integer, nullable=True)  # Position on the Limitless rankings page
+    tournament_points = Column(Integer, nullable=True)
+    placings = Column(Integer, nullable=True)  # Tournament top placings
+    tournament_wins = Column(Integer, nullable=True)  # Placings that were 1st place
+    tournament_win_rate = Column(Float, nullable=True)  # tournament_wins / placings in %: events won, not games
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     leader = relationship("Leader", back_populates="decks")
+    core_cards = relationship("DeckCoreCard", back_populates="deck", cascade="all, delete-orphan")
+
+
+class DeckCoreCard(Base):
+    __tablename__ = "deck_core_cards"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    deck_id = Column(Integer, ForeignKey("decks.id"), nullable=False, index=True)
+    card_id = Column(String, nullable=False, index=True)  # Not a FK - may not be imported yet
+    inclusion_rate = Column(Float, default=100.0)  # % of lists running this card
+    copies = Column(Integer, nullable=True)  # Typical copy count, if listed
+    
+    # Relationships
+    deck = relationship("Deck", back_populates="core_cards")
 
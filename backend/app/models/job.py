@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, JSON, Index, text
+from datetime import datetime
+from app.database import Base
+
+
+class Job(Base):
+    """Ingestion work queued by the API and run by the worker (app.worker)"""
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    kind = Column(String, nullable=False, index=True)  # e.g. "import_optcg_api"
+    payload = Column(JSON, nullable=True)  # Keyword arguments for the job handler
+    dedupe_key = Column(String, nullable=False)  # kind + canonical payload; identical jobs share it
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow)  # Not leased before this (retry backoff)
+    lease_owner = Column(String, nullable=True)  # Worker currently running the job
+    lease_expires_at = Column(DateTime, nullable=True)
+    progress = Column(JSON, nullable=True)  # Counters and per-stage seconds, saved while running
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "priority", "run_after"),
+        # At most one queued/running job per dedupe_key (single-flight)
+        Index(
+            "ix_jobs_active_dedupe",
+            "dedupe_key",
+            unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+
+class IngestionTotal(Base):
+    """Running total of one progress counter or stage over every finished job attempt, for /metrics"""
+    __tablename__ = "ingestion_totals"
+    
+    kind = Column(String, primary_key=True)  # Job kind
+    metric = Column(String, primary_key=True)  # "counter" or "stage_seconds"
+    name = Column(String, primary_key=True)  # e.g. "rows_written", or the stage for stage_seconds
+    value = Column(Float, nullable=False, default=0.0)
+    samples = Column(Integer, nullable=False, default=0)  # Attempts that added to it
@@ -1,14 +1,24 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from datetime import datetime
 from app.database import Base
 
 
 class Matchup(Base):
     __tablename__ = "matchups"
+    __table_args__ = (
+        # One row per ordered pair; a unique index rather than a constraint so
+        # SQLite can add it without rebuilding the table
+        Index("uq_matchups_leader_pair", "leader_a_id", "leader_b_id", unique=True),
+        # Pairs are stored once with leader_a_id < leader_b_id, so a leader's
+        # matchups are a seek on each side: the pair index, and this one
+        Index("ix_matchups_leader_b_pair", "leader_b_id", "leader_a_id"),
+        # Latest change, for the smoothed matrix's data version (app.matchup_stats)
+        Index("ix_matchups_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    leader_a_id = Column(String, ForeignKey("leaders.id"), nullable=False, index=True)
-    leader_b_id = Column(String, ForeignKey("leaders.id"), nullable=False, index=True)
+    leader_a_id = Column(String, ForeignKey("leaders.id"), nullable=False)  # The smaller leader ID of the pair
+    leader_b_id = Column(String, ForeignKey("leaders.id"), nullable=False)
     win_rate_a = Column(Float, default=0.5)  # Win rate of leader A vs leader B
     sample_size = Column(Integer, default=0)  # Number of games in the sample
     first_win_rate = Column(Float, nullable=True)  # Win rate when A goes first
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class PriceImportBatch(Base):
+    """One price import run; its snapshots share this timestamp"""
+    __tablename__ = "price_import_batches"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    source = Column(String, nullable=False)  # e.g. "optcgapi"
+    fetched_at = Column(DateTime, default=datetime.utcnow, index=True)
+    snapshot_count = Column(Integer, default=0)  # Prices that changed in this batch
+
+
+class PriceSnapshot(Base):
+    """Append-only price history, one row per card per batch where the price changed
+
+    Prices are stored as integer cents and the timestamp lives on the batch,
+    so a row is a few bytes; an unchanged price is not written again.
+    """
+    __tablename__ = "price_snapshots"
+    
+    card_id = Column(String, ForeignKey("cards.id"), primary_key=True)
+    batch_id = Column(Integer, ForeignKey("price_import_batches.id"), primary_key=True)
+    market_cents = Column(Integer, nullable=True)
+    low_cents = Column(Integer, nullable=True)
+    
+    # The (card_id, batch_id) key is the table itself - no separate rowid b-tree
+    __table_args__ = {"sqlite_with_rowid": False}
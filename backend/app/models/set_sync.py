@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class SetSyncState(Base):
+    """Per-set watermark for the incremental OPTCG API import"""
+    __tablename__ = "set_sync_state"
+    
+    set_id = Column(String, primary_key=True)  # API set ID, e.g. "OP-01"
+    set_name = Column(String, nullable=True)
+    etag = Column(String, nullable=True)  # Validators for conditional requests
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)  # sha256 of the catalog fields last imported (optcg_api.parse_set_cards)
+    card_count = Column(Integer, default=0)
+    checked_at = Column(DateTime, default=datetime.utcnow)  # Last time the set was looked at
+    changed_at = Column(DateTime, nullable=True)  # Last time its content actually changed
@@ -0,0 +1,218 @@
+"""
+On-demand sampling profiler for single requests and job runs.
+
+cProfile only sees the thread that enabled it, but sync routes run on
+threadpool threads and jobs hand their DB work to the run_db thread. So a
+background thread samples every thread's stack instead and keeps the
+samples that belong to the profiled work - stacks containing the endpoint
+or job handler, or (for jobs) app code on the ingestion DB thread. A sample
+is wall time, so time blocked in SQLite counts; time a coroutine spends
+suspended does not.
+
+Profiles are written to profile_dir as speedscope JSON (open at
+https://www.speedscope.app) and as a pstats file (python -m pstats, snakeviz).
+"""
+import json
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+FORMATS = {"speedscope": ".speedscope.json", "pstats": ".prof"}
+
+FrameKey = Tuple[str, int, str]  # (filename, first line, function) - the pstats key
+Stack = Tuple[FrameKey, ...]  # Outermost call first
+
+
+def _thread_name(ident: int) -> str:
+    return next((t.name for t in threading.enumerate() if t.ident == ident), str(ident))
+
+
+def _stack(frame) -> Stack:
+    keys = []
+    while frame is not None:
+        code = frame.f_code
+        keys.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(keys))
+
+
+class SamplingProfiler:
+    """Samples thread stacks every `interval` seconds while running"""
+
+    def __init__(self, keep: Callable[[int, Stack], bool], interval: Optional[float] = None):
+        self.keep = keep
+        self.interval = interval or settings.profile_interval_ms / 1000
+        self.samples: Dict[int, List[Tuple[Stack, float]]] = defaultdict(list)
+        self.thread_names: Dict[int, str] = {}
+        self.started_at = datetime.utcnow()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _stack(frame)
+                if self.keep(ident, stack):
+                    self.samples[ident].append((stack, weight))
+                    if ident not in self.thread_names:
+                        self.thread_names[ident] = _thread_name(ident)
+
+    @property
+    def sample_count(self) -> int:
+        return sum(len(samples) for samples in self.samples.values())
+
+    def to_speedscope(self, name: str) -> Dict:
+        """One "sampled" profile per thread, in milliseconds"""
+        frames: List[Dict] = []
+        index: Dict[FrameKey, int] = {}
+        profiles = []
+        for ident, samples in self.samples.items():
+            stacks, weights = [], []
+            for stack, weight in samples:
+                ids = []
+                for key in stack:
+                    if key not in index:
+                        index[key] = len(frames)
+                        frames.append({"name": key[2], "file": key[0], "line": key[1]})
+                    ids.append(index[key])
+                stacks.append(ids)
+                weights.append(round(weight * 1000, 3))
+            profiles.append({
+                "type": "sampled",
+                "name": f"{name} [{self.thread_names.get(ident, ident)}]",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": stacks,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "optcg-stats",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def to_pstats(self) -> Dict:
+        """The dict pstats.Stats loads: {func: (calls, calls, self s, cumulative s, {caller: ...})}
+
+        Call counts are sample counts - the profiler cannot see real calls.
+        """
+        stats: Dict[FrameKey, List] = {}
+        for samples in self.samples.values():
+            for stack, weight in samples:
+                for key in set(stack):
+                    entry = stats.setdefault(key, [0, 0, 0.0, 0.0, defaultdict(lambda: [0, 0, 0.0, 0.0])])
+                    entry[0] += 1
+                    entry[1] += 1
+                    entry[3] += weight
+                stats[stack[-1]][2] += weight
+                for caller, callee in set(zip(stack, stack[1:])):
+                    edge = stats[callee][4][caller]
+                    edge[0] += 1
+                    edge[1] += 1
+                    edge[3] += weight
+                    if callee == stack[-1]:
+                        edge[2] += weight
+        return {
+            key: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+            for key, (cc, nc, tt, ct, callers) in stats.items()
+        }
+
+
+def code_on_stack(*codes) -> Callable[[int, Stack], bool]:
+    """Keep samples whose stack includes one of these functions"""
+    keys = {(c.co_filename, c.co_firstlineno, c.co_name) for c in codes}
+    return lambda ident, stack: any(key in keys for key in stack)
+
+
+def app_code_on_thread(prefix: str) -> Callable[[int, Stack], bool]:
+    """Keep samples from threads named `prefix`* while they run app code"""
+    names: Dict[int, str] = {}
+
+    def keep(ident, stack):
+        if ident not in names:
+            names[ident] = _thread_name(ident)
+        return names[ident].startswith(prefix) and any(
+            key[0].startswith(APP_DIR) and not key[0].endswith("executors.py") for key in stack
+        )
+    return keep
+
+
+def any_of(*predicates: Callable[[int, Stack], bool]) -> Callable[[int, Stack], bool]:
+    return lambda ident, stack: any(keep(ident, stack) for keep in predicates)
+
+
+def token_accepted(value: Optional[str]) -> bool:
+    """Whether an X-Profile header or _profile flag carries the profiling token"""
+    return value is not None and value == (settings.profiling_token or "1")
+
+
+def save_profile(profiler: SamplingProfiler, name: str) -> str:
+    """Write both artifact formats; returns the profile id"""
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-")[:60]
+    profile_id = f"{profiler.started_at:%Y%m%dT%H%M%S}-{slug}-{uuid.uuid4().hex[:6]}"
+    base = os.path.join(settings.profile_dir, profile_id)
+    with open(base + FORMATS["speedscope"], "w") as f:
+        json.dump(profiler.to_speedscope(name), f)
+    with open(base + FORMATS["pstats"], "wb") as f:
+        marshal.dump(profiler.to_pstats(), f)
+    return profile_id
+
+
+def profile_path(profile_id: str, fmt: str) -> Optional[str]:
+    """Path of a stored artifact, or None; ids are checked so they can't escape profile_dir"""
+    if fmt not in FORMATS or not re.fullmatch(r"[A-Za-z0-9-]+", profile_id):
+        return None
+    path = os.path.join(settings.profile_dir, profile_id + FORMATS[fmt])
+    return path if os.path.exists(path) else None
+
+
+def list_profiles() -> List[Dict]:
+    """Stored profiles, newest first"""
+    if not os.path.isdir(settings.profile_dir):
+        return []
+    suffix = FORMATS["speedscope"]
+    profiles = []
+    for filename in os.listdir(settings.profile_dir):
+        if filename.endswith(suffix):
+            path = os.path.join(settings.profile_dir, filename)
+            profiles.append({
+                "profile_id": filename[: -len(suffix)],
+                "created_at": datetime.utcfromtimestamp(os.path.getmtime(path)),
+                "size_bytes": os.path.getsize(path),
+            })
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
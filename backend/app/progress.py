@@ -0,0 +1,89 @@
+"""
+Progress counters for the job that is currently running.
+
+The worker installs a JobProgress for each job it runs; scrapers and the
+BatchWriter report into it through track() and stage() without being handed
+anything. Outside a job both are no-ops. The context propagates into tasks
+spawned by the job and into run_db calls.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+
+class JobProgress:
+    """Named counters plus wall time per stage for one job run"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.stages: Dict[str, float] = {}
+        self.current_stage: Optional[str] = None
+        self._stage_started: Optional[float] = None
+        self._started = time.monotonic()
+        self._lock = threading.Lock()  # run_db reports from the DB thread
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    @contextmanager
+    def stage(self, name: str):
+        previous, previous_started = self.current_stage, self._stage_started
+        self.current_stage, self._stage_started = name, time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - self._stage_started
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            self.current_stage, self._stage_started = previous, previous_started
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready view; the running stage shows its elapsed time so far"""
+        with self._lock:
+            stages = {name: round(seconds, 3) for name, seconds in self.stages.items()}
+            counters = dict(self.counters)
+        if self.current_stage is not None:
+            running = time.monotonic() - self._stage_started
+            stages[self.current_stage] = round(stages.get(self.current_stage, 0.0) + running, 3)
+        return {
+            **counters,
+            "stage": self.current_stage,
+            "stage_seconds": stages,
+            "elapsed_seconds": round(time.monotonic() - self._started, 3),
+        }
+
+
+_current: ContextVar[Optional[JobProgress]] = ContextVar("job_progress", default=None)
+
+
+@contextmanager
+def job_progress():
+    """Collect progress for the job run inside this block"""
+    progress = JobProgress()
+    token = _current.set(progress)
+    try:
+        yield progress
+    finally:
+        _current.reset(token)
+
+
+def track(name: str, amount: int = 1):
+    """Add to a counter of the running job, if any"""
+    progress = _current.get()
+    if progress is not None:
+        progress.incr(name, amount)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage of the running job, if any"""
+    progress = _current.get()
+    if progress is None:
+        yield
+        return
+    with progress.stage(name):
+        yield
@@ -0,0 +1,95 @@
+"""
+SQL statement counting for the request (or other unit of work) in progress.
+
+Engine events on every Engine count statements and DB time into the
+QueryStats installed by track_queries(); outside a tracked block they do
+nothing. Statements are grouped by shape (parameters and IN-list lengths
+collapsed), so a loop issuing the same SELECT per row stands out as one
+shape with a high count - the N+1 pattern. The context propagates into
+sync route threads and run_db calls like app.progress does.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+|%\(\w+\)s(?:\s*,\s*%\(\w+\)s)+")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with IN lists, numeric literals and whitespace collapsed"""
+    shape = _PLACEHOLDER_LIST.sub("?, ...", statement)
+    shape = _NUMBER.sub("N", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statement count, cumulative DB time and per-shape counts for one unit of work"""
+
+    def __init__(self, origin: Optional[str] = None):
+        self.origin = origin  # "GET /api/decks/{deck_id}", "job 12 import_optcg_api", ...
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes executed at least `threshold` times, most frequent first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(origin: Optional[str] = None):
+    """Count the statements executed inside this block"""
+    stats = QueryStats(origin)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_origin() -> Optional[str]:
+    """The route or job the running statement belongs to, if tracked"""
+    stats = _current.get()
+    return stats.origin if stats is not None else None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute never fires for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
@@ -0,0 +1,347 @@
+"""
+Cached read models: the expensive API responses that only change when an
+import lands (tier list, matchup matrix, price movers, deck details).
+
+Entries are tagged with the data version - when the last ingestion job
+succeeded - and served until a newer version is seen or they reach
+read_model_ttl_seconds. The warmer started by the API lifespan computes the
+hot entries at startup and again whenever it notices a new version, so the
+first users after a deploy or an import don't pay for them; /ready reports
+ready only once the first warm-up has finished.
+
+With read_model_store="database" the entries live in the
+read_model_snapshots table instead of process memory, so several API
+processes (uvicorn --workers, replicas) share one copy. The worker warms
+them as soon as an ingestion job finishes (app.worker); otherwise only the
+holder of the read-model warmer lease warms, and the other processes pick
+up the latest published warm-up.
+
+Routes that return a cached model unchanged use response(), which serves
+JSON bytes rendered and compressed (app.compression) once per entry and
+encoding, stored next to the entry.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi.responses import Response
+from pydantic_core import to_jsonable_python
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.compression import ENCODINGS, compress, negotiate
+from app.config import get_settings
+from app.database import SessionLocal
+from app.metrics import record_cache
+from app.models import Deck, Job, ReadModelBody, ReadModelSnapshot
+from app.services import DeckService, LeaderService, LeaseService, MatchupService, PriceService
+from app.services.job_queue import INGESTION_KINDS, SUCCEEDED
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MOVERS_LIMIT = 50  # Movers are computed at the API's max limit and sliced per request
+WARMER_LEASE = "read_model_warmer"
+WARM_MARKER = "_warm"  # Shared-store entry holding the last warm-up's status
+
+# name -> builder(db, *args)
+BUILDERS: Dict[str, Callable[..., Any]] = {
+    "tier_list": lambda db: LeaderService(db).get_tier_list(),
+    "matrix": lambda db: MatchupService(db).get_matrix(),
+    "matrix_columnar": lambda db: MatchupService(db).get_matrix_columnar(),
+    "matrix_smoothed": lambda db: MatchupService(db).get_matrix(smoothed=True),
+    "matrix_columnar_smoothed": lambda db: MatchupService(db).get_matrix_columnar(smoothed=True),
+    "movers": lambda db, days: PriceService(db).get_top_movers(days=days, limit=MOVERS_LIMIT),
+    "deck_detailed": lambda db, deck_id: DeckService(db).get_detailed(deck_id),
+}
+
+IDENTITY = "identity"
+
+# Served through response(), so their bodies are rendered and compressed while warming
+PRERENDERED = ("tier_list", "matrix", "matrix_columnar", "deck_detailed")
+
+# (version, built_at, value)
+Entry = Tuple[Optional[datetime], datetime, Any]
+
+
+def data_version(db: Session) -> Optional[datetime]:
+    """When the data last changed: the finish time of the latest successful ingestion job"""
+    return db.query(func.max(Job.finished_at)).filter(
+        Job.status == SUCCEEDED, Job.kind.in_(INGESTION_KINDS)
+    ).scalar()
+
+
+def setting_ints(value: str):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def entry_key(name: str, *args) -> str:
+    return ":".join(map(str, (name, *args)))
+
+
+def json_body(value: Any) -> bytes:
+    """The bytes FastAPI's JSONResponse would send for `value`"""
+    return json.dumps(to_jsonable_python(value), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class MemoryStore:
+    """Entries in this process's memory"""
+
+    shared = False
+
+    def __init__(self):
+        self._entries: Dict[str, Entry] = {}
+        self._bodies: Dict[Tuple[str, str], Tuple[datetime, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def save(self, key: str, version: Optional[datetime], value: Any) -> datetime:
+        built_at = datetime.utcnow()
+        with self._lock:
+            self._entries[key] = (version, built_at, value)
+        return built_at
+
+    def load_body(self, key: str, encoding: str) -> Optional[Tuple[datetime, bytes]]:
+        with self._lock:
+            return self._bodies.get((key, encoding))
+
+    def save_body(self, key: str, encoding: str, built_at: datetime, body: bytes):
+        with self._lock:
+            self._bodies[(key, encoding)] = (built_at, body)
+
+    def prune(self, version: Optional[datetime]):
+        """Drop entries built for other data versions, and bodies rendered from replaced entries"""
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] == version}
+            self._bodies = {
+                (key, encoding): body for (key, encoding), body in self._bodies.items()
+                if key in self._entries and self._entries[key][1] == body[0]
+            }
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class DatabaseStore:
+    """Entries as JSON in the read_model_snapshots table, shared by every process"""
+
+    shared = True
+
+    def load(self, key: str) -> Optional[Entry]:
+        db = SessionLocal()
+        try:
+            row = db.get(ReadModelSnapshot, key)
+            return (row.version, row.built_at, row.payload) if row else None
+        finally:
+            db.close()
+
+    def save(self, key: str, version: Optional[datetime], value: Any) -> datetime:
+        built_at = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.merge(ReadModelSnapshot(key=key, version=version, built_at=built_at,
+                                       payload=to_jsonable_python(value)))
+            db.query(ReadModelBody).filter(ReadModelBody.key == key).delete(synchronize_session=False)
+            db.commit()
+        except IntegrityError:
+            # Another process inserted the same key first; its copy is as good
+            db.rollback()
+        finally:
+            db.close()
+        return built_at
+
+    def load_body(self, key: str, encoding: str) -> Optional[Tuple[datetime, bytes]]:
+        db = SessionLocal()
+        try:
+            row = db.get(ReadModelBody, (key, encoding))
+            return (row.built_at, row.body) if row else None
+        finally:
+            db.close()
+
+    def save_body(self, key: str, encoding: str, built_at: datetime, body: bytes):
+        db = SessionLocal()
+        try:
+            db.merge(ReadModelBody(key=key, encoding=encoding, built_at=built_at, body=body))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+
+    def prune(self, version: Optional[datetime]):
+        db = SessionLocal()
+        try:
+            db.query(ReadModelSnapshot).filter(
+                ReadModelSnapshot.key != WARM_MARKER,
+                ReadModelSnapshot.version.is_distinct_from(version)
+            ).delete(synchronize_session=False)
+            db.query(ReadModelBody).filter(
+                ReadModelBody.key.notin_(select(ReadModelSnapshot.key))
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def count(self) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(func.count(ReadModelSnapshot.key)).filter(ReadModelSnapshot.key != WARM_MARKER).scalar()
+        finally:
+            db.close()
+
+
+class ReadModelCache:
+    """Cache of read models keyed by name and arguments"""
+
+    def __init__(self, store=None):
+        self.store = store or (DatabaseStore() if settings.read_model_store == "database" else MemoryStore())
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.version: Optional[datetime] = None
+        self.ready = False
+        self.last_warm: Dict[str, Any] = {}
+
+    def _fresh(self, entry: Optional[Entry]) -> bool:
+        if entry is None or (datetime.utcnow() - entry[1]).total_seconds() >= settings.read_model_ttl_seconds:
+            return False
+        if entry[0] == self.version:
+            return True
+        # A shared entry may come from a newer warm-up this process hasn't seen yet
+        return self.store.shared and entry[0] is not None and (self.version is None or entry[0] > self.version)
+
+    def get(self, db: Session, name: str, *args) -> Any:
+        """Cached value, or build it with `db` and cache it"""
+        return self._entry(db, name, *args)[2]
+
+    def response(self, db: Session, accept_encoding: Optional[str], name: str, *args) -> Optional[Response]:
+        """The cached value as a ready JSON response in the best accepted encoding; None if the value is None"""
+        key = entry_key(name, *args)
+        _, built_at, value = self._entry(db, name, *args)
+        if value is None:
+            return None
+        encoding = negotiate(accept_encoding) if settings.compression_enabled else None
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        body = self._body(key, built_at, value, encoding or IDENTITY)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def _entry(self, db: Session, name: str, *args) -> Entry:
+        key = entry_key(name, *args)
+        version = self.version
+        entry = self.store.load(key)
+        if self._fresh(entry):
+            record_cache("read_models", hit=True)
+            return entry
+        record_cache("read_models", hit=False)
+        value = BUILDERS[name](db, *args)
+        return version, self.store.save(key, version, value), value
+
+    def _body(self, key: str, built_at: datetime, value: Any, encoding: str) -> bytes:
+        """JSON bytes of an entry in one encoding, rendered and compressed once per entry"""
+        cached = self.store.load_body(key, encoding)
+        if cached is not None and cached[0] == built_at:
+            record_cache("read_model_bodies", hit=True)
+            return cached[1]
+        record_cache("read_model_bodies", hit=False)
+        body = json_body(value)
+        if encoding != IDENTITY:
+            body = compress(body, encoding)
+        self.store.save_body(key, encoding, built_at, body)
+        return body
+
+    def warm(self, version: Optional[datetime] = None) -> Dict[str, Any]:
+        """Rebuild the hot entries for the current data version (blocking)"""
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            if version is None:
+                version = data_version(db)
+            keys = [("tier_list",), ("matrix",), ("matrix_columnar",)]
+            keys += [("movers", days) for days in setting_ints(settings.warm_mover_days)]
+            popular = db.query(Deck.id).order_by(Deck.games_played.desc()).limit(settings.warm_popular_decks)
+            keys += [("deck_detailed", deck_id) for (deck_id,) in popular]
+
+            timings = {}
+            for name, *args in keys:
+                key = entry_key(name, *args)
+                key_started = time.perf_counter()
+                value = BUILDERS[name](db, *args)
+                built_at = self.store.save(key, version, value)
+                db.expunge_all()
+                if value is not None and name in PRERENDERED:
+                    for encoding in (IDENTITY, *ENCODINGS):
+                        self._body(key, built_at, value, encoding)
+                timings[key] = round(time.perf_counter() - key_started, 3)
+        finally:
+            db.close()
+
+        # Entries built for older versions are now stale
+        self.store.prune(version)
+        self.version = version
+        self.ready = True
+        self.last_warm = {
+            "version": version,
+            "finished_at": datetime.utcnow(),
+            "seconds": round(time.perf_counter() - started, 3),
+            "warmed_by": self.owner,
+            "entries": timings,
+        }
+        if self.store.shared:
+            self.store.save(WARM_MARKER, version, self.last_warm)
+        logger.info(f"Read models warmed in {self.last_warm['seconds']}s ({len(keys)} entries)")
+        return self.last_warm
+
+    def check(self):
+        """Warm if the data changed since the last warm-up, or follow the process that does (blocking)"""
+        db = SessionLocal()
+        try:
+            version = data_version(db)
+            warmer = not self.store.shared or LeaseService(db).acquire(
+                WARMER_LEASE, self.owner, max(3 * settings.read_model_check_seconds, 30))
+        finally:
+            db.close()
+
+        marker = self.store.load(WARM_MARKER) if self.store.shared else None
+        if warmer and (marker is None or marker[0] != version):
+            if not self.ready or version != self.version:
+                self.warm(version)
+            return
+        # Someone else (the lease holder, or a worker after an import) published this version
+        if marker is not None:
+            self.version, _, self.last_warm = marker
+            self.ready = True
+
+    async def run_warmer(self):
+        """Warm now, then re-warm whenever an ingestion job finishes successfully"""
+        while True:
+            try:
+                await asyncio.to_thread(self.check)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Read model warm-up failed: {e}")
+            await asyncio.sleep(settings.read_model_check_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "store": "database" if self.store.shared else "memory",
+            "version": self.version,
+            "entries": self.store.count(),
+            "last_warm": self.last_warm,
+        }
+
+
+read_models = ReadModelCache()
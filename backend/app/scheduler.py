@@ -1,10 +1,14 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING, STATE_STOPPED
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.scrapers import TCGMatchmakingScraper, TCGPlayerScraper, CardmarketScraper
-from app.scrapers import OPTCGAPIImporter, LimitlessTCGScraper
+from app.models import Job
+from app.services import JobQueue, LeaseService
+from app.services.job_queue import MANUAL_PRIORITY, SCHEDULED_PRIORITY  # noqa: F401
 from app.config import get_settings
+from typing import Dict, Optional
+import asyncio
 import logging
 
 settings = get_settings()
@@ -12,27 +16,40 @@ logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
+SCHEDULER_LEASE = "scheduler"
+
+# The job functions below are run by the worker (app.worker), never by the
+# API. They raise on failure so the worker can record the error and retry.
+# Each imports its scraper when it runs, so importing this module (and
+# starting the worker) doesn't load httpx/BeautifulSoup/lxml up front.
+
 
 # ============ NEW DATA SOURCES (WORKING) ============
 
-async def import_optcg_api_data():
-    """Import cards and prices from OPTCG API (optcgapi.com)"""
-    logger.info("Starting OPTCG API import...")
+async def import_optcg_api_data(full: bool = False):
+    """Import cards and prices from OPTCG API (optcgapi.com)
+
+    By default only new or changed sets are re-imported; full=True re-reads
+    the whole catalog.
+    """
+    from app.scrapers.optcg_api import OPTCGAPIImporter
+    logger.info(f"Starting OPTCG API import ({'full' if full else 'incremental'})...")
     db = SessionLocal()
     try:
         importer = OPTCGAPIImporter(db)
-        results = await importer.import_all()
+        results = await (importer.import_all() if full else importer.import_incremental())
         logger.info(f"OPTCG API import complete: {results}")
         return results
     except Exception as e:
         logger.error(f"Error in OPTCG API import: {e}")
-        return {"error": str(e)}
+        raise
     finally:
         db.close()
 
 
 async def scrape_limitless_data():
     """Scrape tournament/meta data from Limitless TCG"""
+    from app.scrapers.limitless_scraper import LimitlessTCGScraper
     logger.info("Starting Limitless TCG scrape...")
     db = SessionLocal()
     try:
@@ -42,79 +59,192 @@ async def scrape_limitless_data():
         return results
     except Exception as e:
         logger.error(f"Error in Limitless TCG scrape: {e}")
-        return {"error": str(e)}
+        raise
     finally:
         db.close()
 
 
+async def export_prices_parquet(full: bool = False):
+    """Append new price history to the partitioned Parquet dataset (app.columnar)"""
+    from app.columnar import write_price_parquet
+    from app.executors import run_db
+    logger.info(f"Starting Parquet price export ({'full' if full else 'incremental'})...")
+
+    def export():
+        db = SessionLocal()
+        try:
+            return write_price_parquet(db, full=full)
+        finally:
+            db.close()
+
+    try:
+        results = await run_db(export)
+        logger.info(f"Parquet price export complete: {results}")
+        return results
+    except Exception as e:
+        logger.error(f"Error in Parquet price export: {e}")
+        raise
+
+
+async def compact_change_log():
+    """Drop superseded delta-sync log entries (SyncService.compact)"""
+    from app.executors import run_db
+    from app.services import SyncService
+
+    def compact():
+        db = SessionLocal()
+        try:
+            return SyncService(db).compact()
+        finally:
+            db.close()
+
+    removed = await run_db(compact)
+    logger.info(f"Change log compacted: {removed} superseded entries removed")
+    return {"removed": removed}
+
+
 # ============ LEGACY SCRAPERS (TEMPLATE CODE) ============
 
 async def scrape_matchmaking_data():
     """Scheduled job to scrape TCG Matchmaking data (legacy - template only)"""
+    from app.scrapers.tcg_matchmaking import TCGMatchmakingScraper
     logger.info("Starting TCG Matchmaking scrape job...")
     db = SessionLocal()
     try:
         scraper = TCGMatchmakingScraper(db)
         results = await scraper.scrape()
         logger.info(f"TCG Matchmaking scrape complete: {results}")
+        return results
     except Exception as e:
         logger.error(f"Error in TCG Matchmaking scrape: {e}")
+        raise
     finally:
         db.close()
 
 
 async def scrape_tcgplayer_prices():
     """Scheduled job to scrape TCGPlayer prices (legacy - template only)"""
+    from app.scrapers.tcgplayer import TCGPlayerScraper
     logger.info("Starting TCGPlayer price scrape job...")
     db = SessionLocal()
     try:
         scraper = TCGPlayerScraper(db)
         count = await scraper.scrape()
         logger.info(f"TCGPlayer scrape complete: {count} prices updated")
+        return count
     except Exception as e:
         logger.error(f"Error in TCGPlayer scrape: {e}")
+        raise
     finally:
         db.close()
 
 
 async def scrape_cardmarket_prices():
     """Scheduled job to scrape Cardmarket prices (legacy - template only)"""
+    from app.scrapers.cardmarket import CardmarketScraper
     logger.info("Starting Cardmarket price scrape job...")
     db = SessionLocal()
     try:
         scraper = CardmarketScraper(db)
         count = await scraper.scrape()
         logger.info(f"Cardmarket scrape complete: {count} prices updated")
+        return count
     except Exception as e:
         logger.error(f"Error in Cardmarket scrape: {e}")
+        raise
+    finally:
+        db.close()
+
+
+# Job kind -> coroutine the worker runs for it
+JOB_HANDLERS = {
+    "import_optcg_api": import_optcg_api_data,
+    "scrape_limitless": scrape_limitless_data,
+    "export_prices_parquet": export_prices_parquet,
+    "compact_change_log": compact_change_log,
+    "scrape_matchmaking": scrape_matchmaking_data,
+    "scrape_tcgplayer": scrape_tcgplayer_prices,
+    "scrape_cardmarket": scrape_cardmarket_prices,
+}
+
+
+def enqueue_job(kind: str, priority: int = SCHEDULED_PRIORITY, payload: Optional[Dict] = None) -> Job:
+    """Queue a job for the worker, unless the same job is already queued or running"""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    db = SessionLocal()
+    try:
+        job, created = JobQueue(db).enqueue(kind, payload=payload, priority=priority)
+        if created:
+            logger.info(f"Queued {kind} job {job.id}")
+        else:
+            logger.info(f"Skipped {kind}: job {job.id} is still {job.status}")
+        return job
     finally:
         db.close()
 
 
 def start_scheduler():
-    """Start the background scheduler"""
+    """Start the background scheduler
+
+    Runs in the worker process and only enqueues; the worker's own loop
+    picks the jobs up.
+    """
     # Schedule OPTCG API import every 24 hours (card data updates daily)
     scheduler.add_job(
-        import_optcg_api_data,
+        enqueue_job,
+        args=["import_optcg_api"],
+        kwargs={"payload": {"full": False}},  # Same payload as the trigger endpoint, so they single-flight
         trigger=IntervalTrigger(hours=24),
         id="import_optcg_api",
         name="Import OPTCG API Data (Cards & Prices)",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
     )
     
     # Schedule Limitless TCG scrape every 6 hours (tournament data)
     scheduler.add_job(
-        scrape_limitless_data,
+        enqueue_job,
+        args=["scrape_limitless"],
         trigger=IntervalTrigger(hours=settings.scrape_interval_hours),
         id="scrape_limitless",
         name="Scrape Limitless TCG Meta Data",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    
+    # Keep the delta-sync log at one entry per changed row
+    scheduler.add_job(
+        enqueue_job,
+        args=["compact_change_log"],
+        trigger=IntervalTrigger(hours=24),
+        id="compact_change_log",
+        name="Compact Delta-Sync Change Log",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
     )
     
+    if settings.parquet_export_hours:
+        scheduler.add_job(
+            enqueue_job,
+            args=["export_prices_parquet"],
+            kwargs={"payload": {"full": False}},
+            trigger=IntervalTrigger(hours=settings.parquet_export_hours),
+            id="export_prices_parquet",
+            name="Append Price History to Parquet",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+    
     # Legacy scrapers (kept for reference but not scheduled by default)
     # Uncomment if you want to enable these template scrapers
     # scheduler.add_job(
-    #     scrape_matchmaking_data,
+    #     enqueue_job,
+    #     args=["scrape_matchmaking"],
     #     trigger=IntervalTrigger(hours=settings.scrape_interval_hours),
     #     id="scrape_matchmaking",
     #     name="Scrape TCG Matchmaking Data",
@@ -130,3 +260,46 @@ def stop_scheduler():
     scheduler.shutdown()
     logger.info("Background scheduler stopped")
 
+
+
+def _scheduler_lease(owner: str, release: bool = False) -> bool:
+    db = SessionLocal()
+    try:
+        leases = LeaseService(db)
+        if release:
+            return leases.release(SCHEDULER_LEASE, owner)
+        return leases.acquire(SCHEDULER_LEASE, owner, settings.scheduler_lease_seconds)
+    finally:
+        db.close()
+
+
+async def lead_scheduler(owner: str):
+    """Run the scheduler only while this process holds the scheduler lease
+
+    Any number of worker processes can call this; the lease holder enqueues
+    the interval jobs and the others stand by, taking over within
+    scheduler_lease_seconds if the holder dies. Runs until cancelled.
+    Lease calls go to a plain thread, not run_db, so a long import can't
+    hold up the renewal.
+    """
+    try:
+        while True:
+            try:
+                held = await asyncio.to_thread(_scheduler_lease, owner)
+            except Exception as e:
+                logger.error(f"Scheduler lease check failed: {e}")
+                held = False
+            if held and scheduler.state == STATE_STOPPED:
+                start_scheduler()
+            elif held and scheduler.state == STATE_PAUSED:
+                scheduler.resume()
+                logger.info("Scheduler lease acquired; scheduler resumed")
+            elif not held and scheduler.state == STATE_RUNNING:
+                scheduler.pause()
+                logger.warning("Scheduler lease lost; scheduler paused")
+            await asyncio.sleep(settings.scheduler_lease_seconds / 3)
+    finally:
+        if scheduler.state != STATE_STOPPED:
+            stop_scheduler()
+            # Let a standby process take over now rather than after expiry
+            await asyncio.to_thread(_scheduler_lease, owner, True)
@@ -3,6 +3,8 @@ from app.schemas.deck import DeckBase, DeckCreate, DeckResponse, DeckWithCost
 from app.schemas.matchup import MatchupBase, MatchupCreate, MatchupResponse, MatchupMatrix
 from app.schemas.card import CardBase, CardCreate, CardResponse, CardWithPrice
 from app.schemas.card_price import CardPriceBase, CardPriceCreate, CardPriceResponse
+from app.schemas.job import JobResponse
+from app.schemas.profile import ProfileInfo
 
 __all__ = [
     "LeaderBase", "LeaderCreate", "LeaderResponse", "LeaderWithStats",
@@ -10,5 +12,6 @@ __all__ = [
     "MatchupBase", "MatchupCreate", "MatchupResponse", "MatchupMatrix",
     "CardBase", "CardCreate", "CardResponse", "CardWithPrice",
     "CardPriceBase", "CardPriceCreate", "CardPriceResponse",
+    "JobResponse", "ProfileInfo",
 ]
 
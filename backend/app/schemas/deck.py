@@ -16,6 +16,7 @@ class CardInDeck(BaseModel):
     count: int = 1
     price_usd: Optional[float] = None
     price_eur: Optional[float] = None
+    inclusion_rate: Optional[float] = None  # % of tournament lists running this card
 
 
 class DeckBase(BaseModel):
@@ -26,6 +27,12 @@ class DeckBase(BaseModel):
     first_win_rate: float = 0.0
     second_win_rate: float = 0.0
     tier: Optional[str] = None
+    meta_share: Optional[float] = None
+    meta_rank: Optional[int] = None
+    tournament_points: Optional[int] = None
+    placings: Optional[int] = None
+    tournament_wins: Optional[int] = None
+    tournament_win_rate: Optional[float] = None  # % of placings that won the event
 
 
 class DeckCreate(DeckBase):
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, Any, Dict
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    payload: Optional[Dict[str, Any]] = None
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    progress: Optional[Dict[str, Any]] = None  # pages_fetched, rows_written, stage_seconds, ...
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
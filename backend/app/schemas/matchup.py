@@ -39,3 +39,35 @@ class MatchupMatrix(BaseModel):
     leader_names: Dict[str, str]  # Leader ID -> Name mapping
     matrix: Dict[str, Dict[str, MatchupCell]]  # leader_a -> leader_b -> matchup data
 
+
+
+class MatchupMatrixColumnar(BaseModel):
+    """The matrix as dense row-major arrays: cell (i, j) of leaders i vs j is at index i * len(leaders) + j
+
+    Rates are null where there is no data (including the diagonal); sample_size is 0 there.
+    """
+    leaders: List[str]
+    leader_names: Dict[str, str]
+    win_rate: List[Optional[float]]
+    sample_size: List[int]
+    first_win_rate: List[Optional[float]]
+    second_win_rate: List[Optional[float]]
+
+
+class SmoothedMatchupCell(MatchupCell):
+    """A cell with its beta-binomial estimate and 95% interval (app.matchup_stats); null on the diagonal"""
+    smoothed_win_rate: Optional[float]
+    ci_low: Optional[float]
+    ci_high: Optional[float]
+
+
+class SmoothedMatchupMatrix(MatchupMatrix):
+    matrix: Dict[str, Dict[str, SmoothedMatchupCell]]
+    prior_games: float  # Strength of the 50% prior, in games
+
+
+class SmoothedMatchupMatrixColumnar(MatchupMatrixColumnar):
+    smoothed_win_rate: List[Optional[float]]
+    ci_low: List[Optional[float]]
+    ci_high: List[Optional[float]]
+    prior_games: float
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ProfileInfo(BaseModel):
+    profile_id: str
+    created_at: datetime
+    size_bytes: int  # Of the speedscope file
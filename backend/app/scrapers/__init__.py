@@ -1,16 +1,28 @@
-from app.scrapers.tcg_matchmaking import TCGMatchmakingScraper
-from app.scrapers.tcgplayer import TCGPlayerScraper
-from app.scrapers.cardmarket import CardmarketScraper
-from app.scrapers.optcg_api import OPTCGAPIImporter, run_optcg_import
-from app.scrapers.limitless_scraper import LimitlessTCGScraper, run_limitless_scrape
+"""
+Scrapers and importers.
 
-__all__ = [
-    "TCGMatchmakingScraper", 
-    "TCGPlayerScraper", 
-    "CardmarketScraper",
-    "OPTCGAPIImporter",
-    "run_optcg_import",
-    "LimitlessTCGScraper",
-    "run_limitless_scrape"
-]
+Loaded lazily: the names below are imported from their modules on first
+access, so importing app.scrapers (or app.scrapers.http) doesn't pull in
+every scraper with httpx, BeautifulSoup and lxml.
+"""
+from importlib import import_module
 
+_EXPORTS = {
+    "TCGMatchmakingScraper": "app.scrapers.tcg_matchmaking",
+    "TCGPlayerScraper": "app.scrapers.tcgplayer",
+    "CardmarketScraper": "app.scrapers.cardmarket",
+    "OPTCGAPIImporter": "app.scrapers.optcg_api",
+    "run_optcg_import": "app.scrapers.optcg_api",
+    "LimitlessTCGScraper": "app.scrapers.limitless_scraper",
+    "run_limitless_scrape": "app.scrapers.limitless_scraper",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
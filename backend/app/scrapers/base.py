@@ -1,35 +1,136 @@
 import httpx
 import asyncio
+import re
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
 from app.config import get_settings
+from app.executors import run_parse
+from app.models import Card
+from app.progress import track
+from app.scrapers.http import create_client
 
 settings = get_settings()
 
+# Matches "OP01-001", "OP-01-001", "ST10-005", "EB01-012", ...
+CARD_ID_PATTERN = re.compile(r"\b([A-Z]{2,3})-?(\d{2})-(\d{3})\b")
+
+
+def normalize_card_id(text: Optional[str]) -> Optional[str]:
+    """Pull a card ID out of listing text in our "OP01-001" format"""
+    if not text:
+        return None
+    match = CARD_ID_PATTERN.search(text.upper())
+    if not match:
+        return None
+    return f"{match.group(1)}{match.group(2)}-{match.group(3)}"
+
+
+class CardCatalog:
+    """In-memory index of our cards, used to match scraped set listings"""
+
+    def __init__(self, db: Session):
+        self.ids = set()
+        self.set_codes: List[str] = []
+        self._by_name: Dict[tuple, List[str]] = {}
+
+        set_codes = set()
+        for card_id, name, set_code in db.query(Card.id, Card.name, Card.set_code):
+            self.ids.add(card_id)
+            if set_code:
+                set_codes.add(set_code)
+            self._by_name.setdefault((set_code, name.lower()), []).append(card_id)
+        self.set_codes = sorted(set_codes)
+
+    def match(self, set_code: str, card_id: Optional[str], name: Optional[str]) -> Optional[str]:
+        """Resolve a listing to one of our card IDs
+
+        Prefers the printed card number; falls back to the card name when it
+        is unique within the set. Returns None for anything ambiguous.
+        """
+        if card_id and card_id in self.ids:
+            return card_id
+        if name:
+            candidates = self._by_name.get((set_code, name.strip().lower()), [])
+            if len(candidates) == 1:
+                return candidates[0]
+        return None
+
+
+class RateLimiter:
+    """Spaces out request starts so at most one begins every `interval` seconds"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def wait(self):
+        """Block until this caller's request slot comes up"""
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
 
 class BaseScraper(ABC):
     """Base class for all scrapers"""
-    
+
     def __init__(self):
         self.delay = settings.request_delay_seconds
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
-    
+        # Shared by every fetch on this scraper, so concurrent fetches still
+        # respect request_delay_seconds against the remote site
+        self.rate_limiter = RateLimiter(self.delay)
+        self.semaphore = asyncio.Semaphore(settings.scrape_concurrency)
+
     async def fetch(self, url: str) -> Optional[str]:
         """Fetch a URL with rate limiting"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers, timeout=30.0)
-                response.raise_for_status()
-                await asyncio.sleep(self.delay)
-                return response.text
-            except httpx.HTTPError as e:
-                print(f"Error fetching {url}: {e}")
-                return None
-    
+        async with self.semaphore:
+            await self.rate_limiter.wait()
+            async with create_client() as client:
+                try:
+                    response = await client.get(url, headers=self.headers, timeout=30.0)
+                    response.raise_for_status()
+                    track("pages_fetched")
+                    return response.text
+                except httpx.HTTPError as e:
+                    print(f"Error fetching {url}: {e}")
+                    return None
+
+    async def fetch_pages(
+        self,
+        page_url: Callable[[int], str],
+        parse_page: Callable[[str], List[Dict]],
+        max_pages: int,
+    ) -> List[Dict]:
+        """Walk a paginated listing, parsing each page in the parse pool
+
+        Stops at the first empty or failed page, or when a page repeats the
+        previous one in full (sites that ignore the page parameter). Items are
+        not deduplicated: parallel and alternate arts share a card number and
+        often a name, and each is its own listing.
+        """
+        items: List[Dict] = []
+        previous: Optional[List[Dict]] = None
+        for page in range(1, max_pages + 1):
+            html = await self.fetch(page_url(page))
+            if not html:
+                break
+
+            page_items = await run_parse(parse_page, html)
+            if not page_items or page_items == previous:
+                break
+
+            items.extend(page_items)
+            previous = page_items
+        return items
+
     @abstractmethod
     async def scrape(self):
         """Main scraping method to be implemented by subclasses"""
         pass
-
@@ -1,12 +1,20 @@
-from typing import List, Optional
+import asyncio
+import logging
+from typing import Dict, List, Optional
 
 from bs4 import BeautifulSoup
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
+from app.executors import run_db
+from app.progress import stage
 from app.models import CardPrice
 from app.schemas.card_price import CardPriceCreate
-from app.scrapers.base import BaseScraper
-from app.services import CardService, PriceService
+from app.scrapers.base import BaseScraper, CardCatalog, normalize_card_id
+from app.services import BatchWriter, CardService, PriceService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 class CardmarketScraper(BaseScraper):
@@ -25,15 +33,38 @@ class CardmarketScraper(BaseScraper):
         self.price_service = PriceService(db)
 
     async def scrape(self) -> int:
-        """Scrape all OPTCG card prices"""
-        # Get all cards from database
-        cards = self.card_service.get_all(limit=10000)
-        count = 0
+        """Scrape all OPTCG card prices
+
+        Walks each set's listing pages instead of searching card by card, so
+        a full refresh costs O(sets x pages) requests. Sets are crawled
+        concurrently under the shared rate limiter.
+        """
+        with stage("catalog"):
+            catalog = await run_db(CardCatalog, self.db)
+        writer = BatchWriter(self.db)
+        try:
+            with stage("sets"):
+                results = await asyncio.gather(
+                    *(
+                        self.scrape_set(set_code, catalog, writer)
+                        for set_code in catalog.set_codes
+                    ),
+                    return_exceptions=True,
+                )
+            with stage("write"):
+                await run_db(writer.flush)
+        except BaseException:
+            # What `with BatchWriter(...)` does, with the rollback on the DB thread
+            writer.discard()
+            await run_db(self.db.rollback)
+            raise
 
-        for card in cards:
-            price = await self.scrape_card_price(card.id, card.name)
-            if price:
-                count += 1
+        count = 0
+        for set_code, result in zip(catalog.set_codes, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scraping Cardmarket set {set_code}: {result}")
+            else:
+                count += len(result)
 
         return count
 
@@ -80,60 +111,110 @@ class CardmarketScraper(BaseScraper):
 
     def _parse_price(self, price_str: Optional[str]) -> Optional[float]:
         """Parse price string to float (EUR format)"""
-        if not price_str:
-            return None
-        try:
-            # Remove € and handle European number format
-            clean = price_str.replace("€", "").replace(",", ".").strip()
-            return float(clean)
-        except ValueError:
-            return None
-
-    async def scrape_set(self, set_code: str) -> List[CardPrice]:
-        """Scrape all cards from a specific set"""
-        # Cardmarket uses different set naming
+        return parse_price(price_str)
+
+    async def scrape_set(
+        self,
+        set_code: str,
+        catalog: Optional[CardCatalog] = None,
+        writer: Optional[BatchWriter] = None,
+    ) -> List[CardPriceCreate]:
+        """Scrape all cards from a specific set, following the listing's pages
+
+        Prices are queued on `writer` (or a writer of its own) rather than
+        committed one row at a time.
+        """
+        catalog = catalog or await run_db(CardCatalog, self.db)
+        # Cardmarket uses different set naming and paginates with ?site=N
         set_url = f"{self.BASE_URL}/en/OnePiece/Products/Singles/{set_code}"
-        html = await self.fetch(set_url)
 
-        if not html:
-            return []
+        products = await self.fetch_pages(
+            lambda page: f"{set_url}?site={page}",
+            parse_set_page,
+            settings.price_scrape_max_pages,
+        )
 
-        prices = []
-        soup = BeautifulSoup(html, "lxml")
+        batch = writer or BatchWriter(self.db)
+        prices = await run_db(self._queue_prices, set_code, products, catalog, batch)
+        if writer is None:
+            await run_db(batch.flush)
 
-        # Parse all products on the page
-        products = soup.select(".table-body .row")
+        logger.info(
+            f"Cardmarket set {set_code}: {len(prices)}/{len(products)} listings matched"
+        )
+        return prices
 
+    def _queue_prices(
+        self,
+        set_code: str,
+        products: List[Dict],
+        catalog: CardCatalog,
+        batch: BatchWriter,
+    ) -> List[CardPriceCreate]:
+        """Match listings to our cards and queue their prices (runs on the DB thread)"""
+        prices = []
         for product in products:
-            try:
-                name_el = product.select_one(".product-name")
-                if not name_el:
-                    continue
-
-                card_name = name_el.text.strip()
-                card_id_el = product.select_one(".product-id")
-                card_id = (
-                    card_id_el.text.strip()
-                    if card_id_el
-                    else f"{set_code}-{len(prices) + 1:03d}"
-                )
-
-                price_el = product.select_one(".price-container .price-from")
-                price_eur = self._parse_price(price_el.text if price_el else None)
-
-                if price_eur:
-                    price_data = CardPriceCreate(
-                        card_id=card_id,
-                        source="cardmarket",
-                        price_eur=price_eur,
-                        price_usd=round(price_eur * self.EUR_TO_USD, 2),
-                        market_price=price_eur,
-                    )
-                    price = self.price_service.add_price(price_data)
-                    prices.append(price)
-
-            except (AttributeError, ValueError) as e:
-                print(f"Error parsing product: {e}")
+            card_id = catalog.match(set_code, product["card_id"], product["name"])
+            price_eur = product["price_eur"]
+            if not card_id or not price_eur:
                 continue
 
+            price_data = CardPriceCreate(
+                card_id=card_id,
+                source="cardmarket",
+                price_eur=price_eur,
+                price_usd=round(price_eur * self.EUR_TO_USD, 2),
+                market_price=product["trend_eur"] or price_eur,
+                low_price=price_eur,
+            )
+            batch.add(CardPrice, price_data.model_dump())
+            prices.append(price_data)
+
         return prices
+
+
+def parse_price(price_str: Optional[str]) -> Optional[float]:
+    """Parse price string to float (EUR format)"""
+    if not price_str:
+        return None
+    try:
+        # Remove € and handle European number format
+        clean = price_str.replace("€", "").replace(",", ".").strip()
+        return float(clean)
+    except ValueError:
+        return None
+
+
+def parse_set_page(html: str) -> List[Dict]:
+    """Parse one page of a Cardmarket set listing"""
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+
+    for product in soup.select(".table-body .row"):
+        try:
+            name_el = product.select_one(".product-name")
+            if not name_el:
+                continue
+
+            card_id_el = product.select_one(".product-id")
+            card_id = normalize_card_id(
+                card_id_el.text if card_id_el else product.get_text(" ")
+            )
+
+            price_el = product.select_one(".price-container .price-from")
+            trend_el = product.select_one(".price-container .price-trend")
+
+            products.append(
+                {
+                    "name": name_el.text.strip(),
+                    "card_id": card_id,
+                    "price_eur": parse_price(price_el.text if price_el else None),
+                    "trend_eur": parse_price(trend_el.text if trend_el else None),
+                }
+            )
+
+        except (AttributeError, ValueError) as e:
+            print(f"Error parsing product: {e}")
+            continue
+
+    return products
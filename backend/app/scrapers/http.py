@@ -0,0 +1,40 @@
+"""
+Shared httpx client factory for all scrapers and importers.
+
+Everything that talks to a remote site builds its client through
+create_client(), so a different transport (e.g. the record/replay harness in
+benchmarks/replay.py) can be swapped in without touching scraper code. Its
+response hook also counts requests and bytes for the running job's progress.
+"""
+from typing import Optional
+
+import httpx
+
+from app.progress import track
+
+_transport: Optional[httpx.AsyncBaseTransport] = None
+
+
+def set_transport(transport: Optional[httpx.AsyncBaseTransport]):
+    """Route every scraper request through `transport` (None restores the default)"""
+    global _transport
+    _transport = transport
+
+
+def get_transport() -> Optional[httpx.AsyncBaseTransport]:
+    return _transport
+
+
+async def _track_response(response: httpx.Response):
+    # Callers read every body anyway; reading here lets the running job count the bytes
+    await response.aread()
+    track("http_requests")
+    track("bytes_downloaded", len(response.content))
+
+
+def create_client(**kwargs) -> httpx.AsyncClient:
+    """Build an AsyncClient using the configured transport, if any"""
+    if _transport is not None:
+        kwargs.setdefault("transport", _transport)
+    kwargs.setdefault("event_hooks", {"response": [_track_response]})
+    return httpx.AsyncClient(**kwargs)
@@ -12,9 +12,12 @@ import asyncio
 import re
 from bs4 import BeautifulSoup
 from typing import List, Dict, Optional, Tuple
+from sqlalchemy import delete, insert
 from sqlalchemy.orm import Session
-from app.models import Leader, Deck
+from app.models import Leader, Deck, DeckCoreCard
 from app.database import SessionLocal
+from app.executors import run_db, run_parse
+from app.progress import stage, track
 from app.scrapers.base import BaseScraper
 import logging
 import json
@@ -24,6 +27,10 @@ logger = logging.getLogger(__name__)
 BASE_URL = "https://onepiece.limitlesstcg.com"
 DECKS_URL = f"{BASE_URL}/decks"
 CARD_IMAGES_CDN = "https://limitlesstcg.nyc3.cdn.digitaloceanspaces.com/one-piece"
+LEADER_ID_PATTERN = re.compile(r'(OP\d{2}-\d{3}|ST\d{2}-\d{3})')
+
+# With fewer placings one lucky event decides the tier, so meta share is used instead
+TOURNAMENT_TIER_MIN_PLACINGS = 10
 
 
 class LimitlessTCGScraper(BaseScraper):
@@ -37,125 +44,63 @@ class LimitlessTCGScraper(BaseScraper):
         """Main scraping entry point"""
         results = {
             "decks": 0,
-            "leaders_updated": 0
+            "leaders_updated": 0,
+            "details": 0,
+            "core_cards": 0
         }
         
         # Scrape meta data (deck rankings)
-        meta_data = await self.scrape_meta()
+        with stage("meta"):
+            meta_data = await self.scrape_meta()
         results["decks"] = len(meta_data)
         
+        # Fetch every ranked deck's detail page concurrently
+        deck_ids = [d["limitless_deck_id"] for d in meta_data if d.get("limitless_deck_id")]
+        with stage("deck_details"):
+            details = await self.scrape_all_deck_details(deck_ids)
+        results["details"] = len(details)
+        
+        with stage("save"):
+            results.update(await run_db(self._save_results, meta_data, details))
+        return results
+    
+    def _save_results(self, meta_data: List[Dict], details: Dict[str, Dict]) -> Dict[str, int]:
+        """Write decks and core cards in one transaction (runs on the DB thread)"""
+        saved = {"leaders_updated": 0, "core_cards": 0}
+        
         # Update leaders with meta info
+        core_cards: List[Tuple[Deck, List[Dict]]] = []
         for deck_info in meta_data:
+            detail = details.get(deck_info.get("limitless_deck_id"))
             try:
-                self._update_deck_meta(deck_info)
-                results["leaders_updated"] += 1
+                deck = self._update_deck_meta(deck_info, detail)
+                if deck is not None:
+                    saved["leaders_updated"] += 1
+                    if detail:
+                        core_cards.append((deck, detail["core_cards"]))
             except Exception as e:
                 logger.error(f"Error updating deck {deck_info.get('name')}: {e}")
         
+        saved["core_cards"] = self._store_core_cards(core_cards)
         self.db.commit()
-        return results
+        track("rows_written", saved["leaders_updated"] + saved["core_cards"])
+        return saved
     
     async def scrape_meta(self) -> List[Dict]:
-        """Scrape the meta/deck rankings page"""
+        """Scrape the meta/deck rankings page
+        
+        Leader IDs are left empty here; they come from the deck detail pages
+        fetched by scrape_all_deck_details.
+        """
         html = await self.fetch(DECKS_URL)
         if not html:
             logger.error("Failed to fetch meta page")
             return []
         
-        decks = []
-        soup = BeautifulSoup(html, "lxml")
-        
-        # Find the main table with deck rankings
-        table = soup.select_one("table")
-        if not table:
-            logger.error("Could not find deck rankings table")
-            return []
-        
-        rows = table.select("tbody tr, tr")
-        
-        for row in rows:
-            cells = row.select("td")
-            if len(cells) < 4:
-                continue
-            
-            try:
-                # Parse row data
-                # Format: Rank | Image | Deck Name (link) | Points | Share %
-                rank_cell = cells[0].text.strip()
-                if not rank_cell.isdigit():
-                    continue
-                
-                rank = int(rank_cell)
-                
-                # Get deck link and name
-                deck_link = cells[2].select_one("a")
-                if not deck_link:
-                    continue
-                
-                deck_name = deck_link.text.strip()
-                deck_url = deck_link.get("href", "")
-                deck_id = deck_url.split("/")[-1] if deck_url else None
-                
-                # Parse color from deck name element
-                color_elem = cells[2].select_one("span, div")
-                color = color_elem.text.strip() if color_elem else self._extract_color(deck_name)
-                
-                # Points
-                points = 0
-                if len(cells) > 3:
-                    points_text = cells[3].text.strip().replace(",", "")
-                    if points_text.isdigit():
-                        points = int(points_text)
-                
-                # Share percentage
-                share = 0.0
-                if len(cells) > 4:
-                    share_text = cells[4].text.strip().replace("%", "")
-                    try:
-                        share = float(share_text)
-                    except ValueError:
-                        pass
-                
-                # Extract leader ID from deck page URL if possible
-                leader_id = await self._get_leader_id_from_deck(deck_id) if deck_id else None
-                
-                decks.append({
-                    "rank": rank,
-                    "name": deck_name,
-                    "color": color,
-                    "limitless_deck_id": deck_id,
-                    "points": points,
-                    "meta_share": share,
-                    "leader_id": leader_id,
-                    "source_url": f"{BASE_URL}{deck_url}" if deck_url else None
-                })
-                
-            except Exception as e:
-                logger.error(f"Error parsing deck row: {e}")
-                continue
-        
+        decks = await run_parse(parse_meta_page, html)
         logger.info(f"Scraped {len(decks)} decks from meta page")
         return decks
     
-    async def _get_leader_id_from_deck(self, deck_id: str) -> Optional[str]:
-        """Fetch deck detail page to get the leader ID"""
-        url = f"{DECKS_URL}/{deck_id}"
-        html = await self.fetch(url)
-        if not html:
-            return None
-        
-        soup = BeautifulSoup(html, "lxml")
-        
-        # Look for leader ID in the page (usually in a subtitle like "OP13-079")
-        # The leader ID pattern is like OP##-### or ST##-###
-        text = soup.get_text()
-        match = re.search(r'(OP\d{2}-\d{3}|ST\d{2}-\d{3})', text)
-        
-        if match:
-            return match.group(1)
-        
-        return None
-    
     async def scrape_deck_details(self, deck_id: str) -> Optional[Dict]:
         """Scrape detailed info for a specific deck"""
         url = f"{DECKS_URL}/{deck_id}"
@@ -163,74 +108,34 @@ class LimitlessTCGScraper(BaseScraper):
         if not html:
             return None
         
-        soup = BeautifulSoup(html, "lxml")
-        
-        details = {
-            "id": deck_id,
-            "name": "",
-            "leader_id": None,
-            "placings": 0,
-            "wins": 0,
-            "points": 0,
-            "core_cards": []
-        }
-        
-        # Get deck name from h1
-        h1 = soup.select_one("h1")
-        if h1:
-            details["name"] = h1.text.strip()
+        return await run_parse(parse_deck_details, html, deck_id)
+    
+    async def scrape_all_deck_details(self, deck_ids: List[str]) -> Dict[str, Dict]:
+        """Scrape detail pages for many decks concurrently
         
-        # Parse stats from subtitle (e.g., "128 placings, including 10 wins • 1662 points")
-        subtitle = soup.select_one("h1 + div, .subtitle")
-        if subtitle:
-            text = subtitle.get_text()
-            
-            # Extract leader ID
-            leader_match = re.search(r'(OP\d{2}-\d{3}|ST\d{2}-\d{3})', text)
-            if leader_match:
-                details["leader_id"] = leader_match.group(1)
-            
-            # Extract placings
-            placings_match = re.search(r'(\d+)\s*placings?', text, re.I)
-            if placings_match:
-                details["placings"] = int(placings_match.group(1))
-            
-            # Extract wins
-            wins_match = re.search(r'(\d+)\s*wins?', text, re.I)
-            if wins_match:
-                details["wins"] = int(wins_match.group(1))
-            
-            # Extract points
-            points_match = re.search(r'(\d+)\s*points?', text, re.I)
-            if points_match:
-                details["points"] = int(points_match.group(1))
+        Requests share this scraper's rate limiter and concurrency cap, so the
+        stage is bounded by request_delay_seconds rather than by round trips.
+        Returns deck ID -> details for every page that could be fetched.
+        """
+        unique_ids = list(dict.fromkeys(deck_ids))
+        fetched = await asyncio.gather(
+            *(self.scrape_deck_details(deck_id) for deck_id in unique_ids),
+            return_exceptions=True
+        )
         
-        # Get core cards
-        core_cards_section = soup.select_one("h2:-soup-contains('Core Cards')")
-        if core_cards_section:
-            parent = core_cards_section.parent
-            if parent:
-                card_links = parent.select("a[href*='/cards/']")
-                for link in card_links:
-                    card_id = link.get("href", "").split("/")[-1]
-                    # Try to get inclusion rate
-                    rate_elem = link.find_next_sibling()
-                    rate = 100.0
-                    if rate_elem:
-                        rate_match = re.search(r'(\d+(?:\.\d+)?)\s*%', rate_elem.get_text())
-                        if rate_match:
-                            rate = float(rate_match.group(1))
-                    
-                    details["core_cards"].append({
-                        "card_id": card_id,
-                        "inclusion_rate": rate
-                    })
+        details = {}
+        for deck_id, result in zip(unique_ids, fetched):
+            if isinstance(result, Exception):
+                logger.error(f"Error scraping deck details for {deck_id}: {result}")
+            elif result:
+                details[deck_id] = result
         
+        logger.info(f"Scraped details for {len(details)}/{len(unique_ids)} decks")
         return details
     
-    def _update_deck_meta(self, deck_info: Dict):
-        """Update or create deck record with meta data"""
-        leader_id = deck_info.get("leader_id")
+    def _update_deck_meta(self, deck_info: Dict, details: Optional[Dict] = None) -> Optional[Deck]:
+        """Update or create deck record with meta data and deck page details"""
+        leader_id = deck_info.get("leader_id") or (details or {}).get("leader_id")
         
         if not leader_id:
             # Try to find leader by name match
@@ -243,7 +148,7 @@ class LimitlessTCGScraper(BaseScraper):
         
         if not leader_id:
             logger.warning(f"Could not find leader for deck: {deck_info.get('name')}")
-            return
+            return None
         
         # Check if leader exists
         leader = self.db.query(Leader).filter(Leader.id == leader_id).first()
@@ -257,6 +162,8 @@ class LimitlessTCGScraper(BaseScraper):
                 color=color
             )
             self.db.add(leader)
+            # Make it visible to later decks for the same leader in this run
+            self.db.flush()
         
         # Find or create deck
         deck = self.db.query(Deck).filter(
@@ -272,41 +179,81 @@ class LimitlessTCGScraper(BaseScraper):
         # Update with meta data
         points = deck_info.get("points", 0)
         meta_share = deck_info.get("meta_share", 0)
+        placings = details.get("placings", 0) if details else 0
+        wins = details.get("wins", 0) if details else 0
         
-        # Calculate approximate games from points (rough estimate)
-        # In tournament scoring, points roughly correlate with wins
+        # Limitless has no game records, so games_played / win_rate stay estimates on the
+        # game-win-rate scale the leader tier list averages. The real result is
+        # tournament_win_rate: the share of top placings that won the event.
         deck.games_played = max(points // 3, 1) if points > 0 else 0
-        
-        # Estimate win rate from meta share (higher share = generally better performance)
-        # This is an approximation since we don't have exact win rates
         deck.win_rate = min(50 + (meta_share * 0.5), 70) if meta_share > 0 else 50.0
+        tournament_win_rate = round(wins / placings * 100, 2) if placings > 0 else None
         
-        # Assign tier based on meta share
-        deck.tier = self._calculate_tier_from_meta(meta_share)
+        # Tier from tournament results once there are enough of them, else from meta share
+        if tournament_win_rate is not None and placings >= TOURNAMENT_TIER_MIN_PLACINGS:
+            deck.tier = self._calculate_tier_from_tournaments(tournament_win_rate)
+        else:
+            deck.tier = self._calculate_tier_from_meta(meta_share)
         deck.source_url = deck_info.get("source_url")
+        deck.meta_share = meta_share
+        deck.meta_rank = deck_info.get("rank")
+        deck.tournament_points = (details.get("points") or points) if details else points
+        deck.placings = placings if details else None
+        deck.tournament_wins = wins if details else None
+        deck.tournament_win_rate = tournament_win_rate
         
-        # Store additional data in deck_list_json
-        extra_data = {
-            "limitless_deck_id": deck_info.get("limitless_deck_id"),
-            "meta_share": meta_share,
-            "tournament_points": points,
-            "rank": deck_info.get("rank")
-        }
-        deck.deck_list_json = json.dumps(extra_data)
+        # Deck list is card ID -> count, built from the core cards
+        if details and details.get("core_cards"):
+            deck.deck_list_json = json.dumps({
+                c["card_id"]: c.get("copies") or 1 for c in details["core_cards"]
+            })
+        
+        return deck
+    
+    def _store_core_cards(self, decks: List[Tuple[Deck, List[Dict]]]) -> int:
+        """Replace the core card rows of the given decks in bulk"""
+        if not decks:
+            return 0
+        
+        # New decks need their primary keys before core cards can reference them
+        self.db.flush()
+        
+        deck_ids = [deck.id for deck, _ in decks]
+        self.db.execute(delete(DeckCoreCard).where(DeckCoreCard.deck_id.in_(deck_ids)))
+        
+        rows = [
+            {
+                "deck_id": deck.id,
+                "card_id": card["card_id"],
+                "inclusion_rate": card["inclusion_rate"],
+                "copies": card.get("copies")
+            }
+            for deck, cards in decks
+            for card in cards
+        ]
+        if rows:
+            self.db.execute(insert(DeckCoreCard), rows)
+        return len(rows)
     
     def _extract_color(self, deck_name: str) -> str:
         """Extract color from deck name"""
-        colors = ["Red", "Blue", "Green", "Purple", "Black", "Yellow"]
-        name_lower = deck_name.lower()
-        
-        found_colors = []
-        for color in colors:
-            if color.lower() in name_lower:
-                found_colors.append(color)
+        return extract_color(deck_name)
+    
+    def _calculate_tier_from_tournaments(self, tournament_win_rate: float) -> str:
+        """Calculate tier from the % of top placings that won the event
         
-        if found_colors:
-            return "/".join(found_colors)
-        return "Unknown"
+        A deck in an 8-player top cut wins it 12.5% of the time by chance.
+        """
+        if tournament_win_rate >= 20:
+            return "S"
+        elif tournament_win_rate >= 14:
+            return "A"
+        elif tournament_win_rate >= 9:
+            return "B"
+        elif tournament_win_rate >= 5:
+            return "C"
+        else:
+            return "D"
     
     def _calculate_tier_from_meta(self, meta_share: float) -> str:
         """Calculate tier based on meta share percentage"""
@@ -322,6 +269,179 @@ class LimitlessTCGScraper(BaseScraper):
             return "D"
 
 
+def parse_meta_page(html: str) -> List[Dict]:
+    """Parse the deck rankings table on the Limitless meta page"""
+    decks = []
+    soup = BeautifulSoup(html, "lxml")
+    
+    # Find the main table with deck rankings
+    table = soup.select_one("table")
+    if not table:
+        logger.error("Could not find deck rankings table")
+        return []
+    
+    rows = table.select("tbody tr, tr")
+    
+    for row in rows:
+        cells = row.select("td")
+        if len(cells) < 4:
+            continue
+        
+        try:
+            # Parse row data
+            # Format: Rank | Image | Deck Name (link) | Points | Share %
+            rank_cell = cells[0].text.strip()
+            if not rank_cell.isdigit():
+                continue
+            
+            rank = int(rank_cell)
+            
+            # Get deck link and name
+            deck_link = cells[2].select_one("a")
+            if not deck_link:
+                continue
+            
+            deck_name = deck_link.text.strip()
+            deck_url = deck_link.get("href", "")
+            deck_id = deck_url.split("/")[-1] if deck_url else None
+            
+            # Parse color from deck name element
+            color_elem = cells[2].select_one("span, div")
+            color = color_elem.text.strip() if color_elem else extract_color(deck_name)
+            
+            # Points
+            points = 0
+            if len(cells) > 3:
+                points_text = cells[3].text.strip().replace(",", "")
+                if points_text.isdigit():
+                    points = int(points_text)
+            
+            # Share percentage
+            share = 0.0
+            if len(cells) > 4:
+                share_text = cells[4].text.strip().replace("%", "")
+                try:
+                    share = float(share_text)
+                except ValueError:
+                    pass
+            
+            decks.append({
+                "rank": rank,
+                "name": deck_name,
+                "color": color,
+                "limitless_deck_id": deck_id,
+                "points": points,
+                "meta_share": share,
+                "leader_id": None,
+                "source_url": f"{BASE_URL}{deck_url}" if deck_url else None
+            })
+            
+        except Exception as e:
+            logger.error(f"Error parsing deck row: {e}")
+            continue
+    
+    return decks
+
+
+def parse_deck_details(html: str, deck_id: str) -> Dict:
+    """Parse a Limitless deck detail page
+    
+    Pure, picklable function of the page HTML so it can run in the parse pool.
+    """
+    soup = BeautifulSoup(html, "lxml")
+    
+    details = {
+        "id": deck_id,
+        "name": "",
+        "leader_id": None,
+        "placings": 0,
+        "wins": 0,
+        "points": 0,
+        "core_cards": []
+    }
+    
+    # Get deck name from h1
+    h1 = soup.select_one("h1")
+    if h1:
+        details["name"] = h1.text.strip()
+    
+    # Parse stats from subtitle (e.g., "128 placings, including 10 wins • 1662 points")
+    subtitle = soup.select_one("h1 + div, .subtitle")
+    if subtitle:
+        text = subtitle.get_text()
+        
+        # Extract leader ID
+        leader_match = LEADER_ID_PATTERN.search(text)
+        if leader_match:
+            details["leader_id"] = leader_match.group(1)
+        
+        # Extract placings
+        placings_match = re.search(r'(\d+)\s*placings?', text, re.I)
+        if placings_match:
+            details["placings"] = int(placings_match.group(1))
+        
+        # Extract wins
+        wins_match = re.search(r'(\d+)\s*wins?', text, re.I)
+        if wins_match:
+            details["wins"] = int(wins_match.group(1))
+        
+        # Extract points
+        points_match = re.search(r'(\d+)\s*points?', text, re.I)
+        if points_match:
+            details["points"] = int(points_match.group(1))
+    
+    if not details["leader_id"]:
+        # Fall back to the first leader-looking ID anywhere on the page
+        leader_match = LEADER_ID_PATTERN.search(soup.get_text())
+        if leader_match:
+            details["leader_id"] = leader_match.group(1)
+    
+    # Get core cards
+    core_cards_section = soup.select_one("h2:-soup-contains('Core Cards')")
+    if core_cards_section:
+        parent = core_cards_section.parent
+        if parent:
+            card_links = parent.select("a[href*='/cards/']")
+            for link in card_links:
+                card_id = link.get("href", "").split("/")[-1]
+                # Try to get inclusion rate
+                rate_elem = link.find_next_sibling()
+                rate = 100.0
+                if rate_elem:
+                    rate_match = re.search(r'(\d+(?:\.\d+)?)\s*%', rate_elem.get_text())
+                    if rate_match:
+                        rate = float(rate_match.group(1))
+                
+                # Copy count is shown as e.g. "4x" when the page lists it
+                copies = None
+                copies_match = re.search(r'(\d+)\s*x\b', link.get_text(" "), re.I)
+                if copies_match:
+                    copies = int(copies_match.group(1))
+                
+                details["core_cards"].append({
+                    "card_id": card_id,
+                    "inclusion_rate": rate,
+                    "copies": copies
+                })
+    
+    return details
+
+
+def extract_color(deck_name: str) -> str:
+    """Extract color from deck name"""
+    colors = ["Red", "Blue", "Green", "Purple", "Black", "Yellow"]
+    name_lower = deck_name.lower()
+    
+    found_colors = []
+    for color in colors:
+        if color.lower() in name_lower:
+            found_colors.append(color)
+    
+    if found_colors:
+        return "/".join(found_colors)
+    return "Unknown"
+
+
 async def run_limitless_scrape():
     """Standalone function to run the scrape"""
     db = SessionLocal()
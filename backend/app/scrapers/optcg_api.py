@@ -4,25 +4,46 @@ API Documentation: https://optcgapi.com/documentation
 
 This is a free, public API with no authentication required.
 Data is updated daily.
+
+import_all() re-reads the whole catalog from allSetCards. import_incremental()
+lists sets via allSets and only re-imports sets that are new or whose
+response changed since the last run (tracked in set_sync_state).
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 import httpx
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
-from app.models import Card, CardPrice, Leader
-
+from app.executors import run_db, run_parse
+from app.config import get_settings
+from app.models import Card, CardPrice, Leader, SetSyncState
+from app.progress import stage, track
+from app.scrapers.http import create_client
+from app.services import BatchWriter, PriceService
+
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 # API Endpoints
 BASE_URL = "https://optcgapi.com/api"
 ALL_CARDS_URL = f"{BASE_URL}/allSetCards/"  # Returns all cards with prices
-ALL_SETS_URL = f"{BASE_URL}/allSets/"
+ALL_SETS_URL = f"{BASE_URL}/allSets/"  # [{"set_id": "OP-01", "set_name": ...}, ...]
+SET_CARDS_URL = f"{BASE_URL}/sets/"  # Append set_id/ - same card shape as allSetCards
 SINGLE_CARD_URL = f"{BASE_URL}/sets/card/"  # Append card_id/
 
+# Fields the Card and Leader rows are built from; prices are not among them
+CATALOG_FIELDS = (
+    "card_set_id", "card_name", "set_id", "rarity", "card_type", "card_color",
+    "card_cost", "card_power", "card_image",
+)
+
 # Note: The allSetCards endpoint returns both regular cards AND leaders
 # Leaders have card_type == "Leader"
 
@@ -33,14 +54,18 @@ class OPTCGAPIImporter:
     def __init__(self, db: Session):
         self.db = db
         self.headers = {"User-Agent": "OPTCG-Stats-App/1.0"}
+        self.semaphore = asyncio.Semaphore(settings.scrape_concurrency)
+        self.price_service = PriceService(db)
+        self._price_batch_id: Optional[int] = None  # Snapshot batch shared by this run
 
     async def fetch_json(self, url: str) -> Optional[Dict | List]:
         """Fetch JSON data from URL"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with create_client(timeout=60.0) as client:
             try:
                 response = await client.get(url, headers=self.headers)
                 response.raise_for_status()
-                return response.json()
+                track("pages_fetched")
+                return await run_parse(parse_json, response.content)
             except httpx.HTTPError as e:
                 logger.error(f"Error fetching {url}: {e}")
                 return None
@@ -54,38 +79,58 @@ class OPTCGAPIImporter:
             logger.error("Failed to fetch cards from API")
             return 0
 
-        # Deduplicate cards - API returns same card_set_id for alternate arts
-        # Keep only the first (main) version of each card
-        seen_ids = set()
-        unique_cards = []
-        for card_data in data:
-            card_id = card_data.get("card_set_id")
-            if card_id and card_id not in seen_ids:
-                seen_ids.add(card_id)
-                unique_cards.append(card_data)
+        unique_cards = unique_by_card_id(data)
 
         logger.info(
             f"Processing {len(unique_cards)} unique cards (filtered from {len(data)} total)"
         )
 
-        count = 0
-        for card_data in unique_cards:
-            try:
-                card = self._upsert_card(card_data)
-                if card:
-                    # Also create/update price if available
-                    self._upsert_price(card_data)
-                    count += 1
-            except Exception as e:
-                logger.error(
-                    f"Error processing card {card_data.get('card_set_id', 'unknown')}: {e}"
-                )
-                continue
-
-        self.db.commit()
+        count = await run_db(self._save_cards, unique_cards)
         logger.info(f"Imported {count} cards")
         return count
 
+    def _save_cards(self, unique_cards: List[Dict]) -> int:
+        """Upsert cards in bulk, then their prices (see _save_prices). Runs on the DB thread."""
+        count = 0
+        with BatchWriter(self.db) as writer:
+            for card_data in unique_cards:
+                try:
+                    card = self._card_values(card_data)
+                    if card:
+                        writer.upsert(Card, card, skip_unchanged=True)
+                        count += 1
+                except Exception as e:
+                    logger.error(
+                        f"Error processing card {card_data.get('card_set_id', 'unknown')}: {e}"
+                    )
+                    continue
+
+        self._save_prices(unique_cards)
+        return count
+
+    def _save_prices(self, cards: List[Dict]) -> int:
+        """Upsert the latest prices of cards already imported, then append price snapshots
+
+        The card_prices row keeps the current optcgapi price; history goes to
+        price_snapshots, one batch per import run. Returns the number of
+        snapshots recorded (prices that changed). Runs on the DB thread.
+        """
+        prices = []
+        with BatchWriter(self.db) as writer:
+            for card_data in cards:
+                price = self._price_values(card_data)
+                if price:
+                    writer.upsert(CardPrice, price, key=("card_id", "source"), skip_unchanged=True)
+                    prices.append(price)
+
+        if not prices:
+            return 0
+        if self._price_batch_id is None:
+            self._price_batch_id = self.price_service.start_import_batch("optcgapi")
+        snapshots = self.price_service.record_snapshots(self._price_batch_id, prices)
+        logger.info(f"Recorded {snapshots} changed prices")
+        return snapshots
+
     async def import_all_leaders(self) -> int:
         """Import all leaders from the all cards API (filtered by card_type=Leader)"""
         logger.info("Fetching all leaders from OPTCG API...")
@@ -98,37 +143,36 @@ class OPTCGAPIImporter:
 
         # Filter for leaders only and deduplicate
         leaders_data = [c for c in data if c.get("card_type") == "Leader"]
-
-        seen_ids = set()
-        unique_leaders = []
-        for leader_data in leaders_data:
-            leader_id = leader_data.get("card_set_id")
-            if leader_id and leader_id not in seen_ids:
-                seen_ids.add(leader_id)
-                unique_leaders.append(leader_data)
+        unique_leaders = unique_by_card_id(leaders_data)
 
         logger.info(
             f"Processing {len(unique_leaders)} unique leaders (filtered from {len(leaders_data)} total)"
         )
 
+        count = await run_db(self._save_leaders, unique_leaders)
+        logger.info(f"Imported {count} leaders")
+        return count
+
+    def _save_leaders(self, unique_leaders: List[Dict]) -> int:
+        """Upsert leaders in bulk (runs on the DB thread)"""
         count = 0
-        for leader_data in unique_leaders:
-            try:
-                leader = self._upsert_leader(leader_data)
-                if leader:
-                    count += 1
-            except Exception as e:
-                logger.error(
-                    f"Error processing leader {leader_data.get('card_set_id', 'unknown')}: {e}"
-                )
-                continue
+        with BatchWriter(self.db) as writer:
+            for leader_data in unique_leaders:
+                try:
+                    leader = self._leader_values(leader_data)
+                    if leader:
+                        writer.upsert(Leader, leader, skip_unchanged=True)
+                        count += 1
+                except Exception as e:
+                    logger.error(
+                        f"Error processing leader {leader_data.get('card_set_id', 'unknown')}: {e}"
+                    )
+                    continue
 
-        self.db.commit()
-        logger.info(f"Imported {count} leaders")
         return count
 
-    def _upsert_card(self, data: Dict) -> Optional[Card]:
-        """Create or update a card from API data
+    def _card_values(self, data: Dict) -> Optional[Dict]:
+        """Map API data to Card column values
 
         API fields:
         - card_set_id: "OP13-079"
@@ -150,50 +194,41 @@ class OPTCGAPIImporter:
         # Extract set code from card ID (e.g., "OP13" from "OP13-079")
         set_code = card_id.split("-")[0] if "-" in card_id else None
 
-        # Map API fields to our model
-        card = self.db.query(Card).filter(Card.id == card_id).first()
-
-        if not card:
-            card = Card(id=card_id)
-            self.db.add(card)
-
-        # Update fields - API uses slightly different field names
-        card.name = data.get("card_name", "Unknown")
-        card.set_code = set_code
-        card.rarity = data.get("rarity")
-        card.card_type = data.get("card_type")
-        card.color = data.get("card_color")
-        card.cost = (
-            str(data.get("card_cost")) if data.get("card_cost") is not None else None
-        )
-        card.power = (
-            str(data.get("card_power")) if data.get("card_power") is not None else None
-        )
-        card.image_url = data.get("card_image")  # API uses card_image, not card_img_url
-
-        return card
-
-    def _upsert_leader(self, data: Dict) -> Optional[Leader]:
-        """Create or update a leader from API data"""
+        # Map API fields to our model - API uses slightly different field names
+        return {
+            "id": card_id,
+            "name": data.get("card_name", "Unknown"),
+            "set_code": set_code,
+            "rarity": data.get("rarity"),
+            "card_type": data.get("card_type"),
+            "color": data.get("card_color"),
+            "cost": (
+                str(data.get("card_cost")) if data.get("card_cost") is not None else None
+            ),
+            "power": (
+                str(data.get("card_power"))
+                if data.get("card_power") is not None
+                else None
+            ),
+            "image_url": data.get("card_image"),  # API uses card_image, not card_img_url
+        }
+
+    def _leader_values(self, data: Dict) -> Optional[Dict]:
+        """Map API data to Leader column values"""
         leader_id = data.get("card_set_id")
         if not leader_id:
             return None
 
-        leader = self.db.query(Leader).filter(Leader.id == leader_id).first()
-
-        if not leader:
-            leader = Leader(id=leader_id)
-            self.db.add(leader)
+        # API uses card_image for image URL
+        return {
+            "id": leader_id,
+            "name": data.get("card_name", "Unknown"),
+            "color": data.get("card_color", "Unknown"),
+            "image_url": data.get("card_image"),
+        }
 
-        # Update fields - API uses card_image for image URL
-        leader.name = data.get("card_name", "Unknown")
-        leader.color = data.get("card_color", "Unknown")
-        leader.image_url = data.get("card_image")
-
-        return leader
-
-    def _upsert_price(self, data: Dict) -> Optional[CardPrice]:
-        """Create or update price data from API
+    def _price_values(self, data: Dict) -> Optional[Dict]:
+        """Map API data to CardPrice column values for the "optcgapi" source
 
         API provides:
         - market_price: float (e.g., 0.12)
@@ -212,27 +247,18 @@ class OPTCGAPIImporter:
         if market_price is None and inventory_price is None:
             return None
 
-        # Find or create price record
-        price = (
-            self.db.query(CardPrice)
-            .filter(CardPrice.card_id == card_id, CardPrice.source == "optcgapi")
-            .first()
-        )
-
-        if not price:
-            price = CardPrice(card_id=card_id, source="optcgapi")
-            self.db.add(price)
+        price = {"card_id": card_id, "source": "optcgapi"}
 
-        # Update price fields
+        # Only overwrite fields the API gave us a usable value for
         if market_price is not None:
             try:
-                price.market_price = float(market_price)
+                price["market_price"] = float(market_price)
             except (ValueError, TypeError):
                 pass
 
         if inventory_price is not None:
             try:
-                price.low_price = float(inventory_price)
+                price["low_price"] = float(inventory_price)
             except (ValueError, TypeError):
                 pass
 
@@ -243,19 +269,149 @@ class OPTCGAPIImporter:
         results = {"cards": 0, "leaders": 0}
 
         # Import leaders first (they're also cards, but we want them in the leaders table)
-        results["leaders"] = await self.import_all_leaders()
+        with stage("leaders"):
+            results["leaders"] = await self.import_all_leaders()
         # Then import all cards
-        results["cards"] = await self.import_all_cards()
+        with stage("cards"):
+            results["cards"] = await self.import_all_cards()
 
         return results
 
+    async def import_incremental(self) -> Dict[str, int]:
+        """Import only new sets and sets whose content changed since the last run
+
+        Sets are checked concurrently with conditional requests (ETag /
+        Last-Modified) and a hash of their catalog fields, so unchanged sets
+        cost one cheap request and no card writes. Prices move daily and are
+        left out of the hash: every fetched set still records its changed
+        prices as snapshots. Falls back to import_all() if the set list is
+        unavailable.
+        """
+        with stage("sets"):
+            sets = await self.fetch_json(ALL_SETS_URL)
+        if not sets:
+            logger.warning("Set list unavailable, falling back to a full import")
+            return await self.import_all()
+
+        sets = [s for s in sets if s.get("set_id")]
+        states = await run_db(self._load_sync_states)
+        with stage("set_cards"):
+            outcomes = await asyncio.gather(
+                *(self.sync_set(s, states.get(s["set_id"])) for s in sets),
+                return_exceptions=True
+            )
+
+        results = {"sets": len(sets), "sets_changed": 0, "cards": 0, "leaders": 0, "prices_changed": 0}
+        watermarks = []
+        for set_info, outcome in zip(sets, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error syncing set {set_info['set_id']}: {outcome}")
+                continue
+            watermarks.append(outcome["watermark"])
+            results["prices_changed"] += outcome["prices_changed"]
+            if outcome["changed"]:
+                results["sets_changed"] += 1
+                results["cards"] += outcome["cards"]
+                results["leaders"] += outcome["leaders"]
+
+        # Watermarks go last: a crash before this point only means the same
+        # sets are fetched again next run
+        with stage("watermarks"):
+            await run_db(self._save_watermarks, watermarks)
+        return results
 
-async def run_optcg_import():
+    async def sync_set(self, set_info: Dict, state: Optional[Dict]) -> Dict:
+        """Fetch one set; import its cards and leaders if the catalog changed, and its changed prices"""
+        set_id = set_info["set_id"]
+        now = datetime.utcnow()
+        watermark = {"set_id": set_id, "set_name": set_info.get("set_name"), "checked_at": now}
+        unchanged = {"changed": False, "cards": 0, "leaders": 0, "prices_changed": 0, "watermark": watermark}
+
+        headers = dict(self.headers)
+        if state and state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state and state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        async with self.semaphore:
+            async with create_client(timeout=60.0) as client:
+                response = await client.get(f"{SET_CARDS_URL}{set_id}/", headers=headers)
+        track("pages_fetched")
+        if response.status_code == 304:
+            return unchanged
+        response.raise_for_status()
+
+        cards, content_hash = await run_parse(parse_set_cards, response.content)
+        watermark.update({
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "content_hash": content_hash,
+        })
+        if state and state.get("content_hash") == content_hash:
+            return {**unchanged, "prices_changed": await run_db(self._save_prices, cards)}
+
+        leaders = [c for c in cards if c.get("card_type") == "Leader"]
+        await run_db(self._save_leaders, leaders)
+        await run_db(self._save_cards, cards)
+
+        watermark.update({"card_count": len(cards), "changed_at": now})
+        logger.info(f"Set {set_id} changed: {len(cards)} cards, {len(leaders)} leaders")
+        return {"changed": True, "cards": len(cards), "leaders": len(leaders), "prices_changed": 0,
+                "watermark": watermark}
+
+    def _load_sync_states(self) -> Dict[str, Dict]:
+        return {
+            state.set_id: {
+                "etag": state.etag,
+                "last_modified": state.last_modified,
+                "content_hash": state.content_hash,
+            }
+            for state in self.db.query(SetSyncState).all()
+        }
+
+    def _save_watermarks(self, watermarks: List[Dict]):
+        with BatchWriter(self.db) as writer:
+            for watermark in watermarks:
+                writer.upsert(SetSyncState, watermark)
+
+
+def parse_json(content: bytes) -> Dict | List:
+    """Decode an API response body"""
+    return json.loads(content)
+
+
+def parse_set_cards(content: bytes) -> Tuple[List[Dict], str]:
+    """A set's unique cards and a hash of their catalog fields
+
+    The hash leaves out market_price / inventory_price, which change daily,
+    so it only changes when cards or leaders need re-importing.
+    """
+    cards = unique_by_card_id(parse_json(content))
+    catalog = [[card.get(field) for field in CATALOG_FIELDS] for card in cards]
+    return cards, hashlib.sha256(json.dumps(catalog).encode()).hexdigest()
+
+
+def unique_by_card_id(data: List[Dict]) -> List[Dict]:
+    """Deduplicate cards - API returns same card_set_id for alternate arts
+
+    Keeps only the first (main) version of each card.
+    """
+    seen_ids = set()
+    unique = []
+    for card_data in data:
+        card_id = card_data.get("card_set_id")
+        if card_id and card_id not in seen_ids:
+            seen_ids.add(card_id)
+            unique.append(card_data)
+    return unique
+
+
+async def run_optcg_import(full: bool = True):
     """Standalone function to run the import"""
     db = SessionLocal()
     try:
         importer = OPTCGAPIImporter(db)
-        results = await importer.import_all()
+        results = await (importer.import_all() if full else importer.import_incremental())
         logger.info(f"OPTCG API import complete: {results}")
         return results
     except Exception as e:
@@ -6,7 +6,8 @@ from app.models import Leader, Deck, Matchup
 from app.schemas.leader import LeaderCreate
 from app.schemas.deck import DeckCreate
 from app.schemas.matchup import MatchupCreate
-from app.services import LeaderService, DeckService, MatchupService
+from app.services import BatchWriter, LeaderService, DeckService, MatchupService
+from app.services.matchup_service import canonical_matchup
 
 
 class TCGMatchmakingScraper(BaseScraper):
@@ -29,17 +30,18 @@ class TCGMatchmakingScraper(BaseScraper):
             "matchups": 0
         }
         
-        # Scrape leaders and their stats
-        leaders = await self.scrape_leaders()
-        results["leaders"] = len(leaders)
-        
-        # Scrape matchup data
-        matchups = await self.scrape_matchups()
-        results["matchups"] = len(matchups)
+        with BatchWriter(self.db) as writer:
+            # Scrape leaders and their stats
+            leaders = await self.scrape_leaders(writer)
+            results["leaders"] = len(leaders)
+            
+            # Scrape matchup data
+            matchups = await self.scrape_matchups(writer)
+            results["matchups"] = len(matchups)
         
         return results
     
-    async def scrape_leaders(self) -> List[Leader]:
+    async def scrape_leaders(self, writer: Optional[BatchWriter] = None) -> List[LeaderCreate]:
         """Scrape leader statistics"""
         url = f"{self.BASE_URL}/leaders"  # Adjust endpoint as needed
         html = await self.fetch(url)
@@ -47,6 +49,7 @@ class TCGMatchmakingScraper(BaseScraper):
         if not html:
             return []
         
+        batch = writer or BatchWriter(self.db)
         leaders = []
         soup = BeautifulSoup(html, "lxml")
         
@@ -72,7 +75,7 @@ class TCGMatchmakingScraper(BaseScraper):
                     color=color,
                     image_url=image_url
                 )
-                leader = self.leader_service.upsert(leader_data)
+                batch.upsert(Leader, leader_data.model_dump())
                 
                 # Create deck entry for aggregate stats
                 deck_data = DeckCreate(
@@ -81,17 +84,19 @@ class TCGMatchmakingScraper(BaseScraper):
                     games_played=games,
                     tier=self._calculate_tier(win_rate)
                 )
-                self.deck_service.create(deck_data)
+                batch.add(Deck, deck_data.model_dump())
                 
-                leaders.append(leader)
+                leaders.append(leader_data)
                 
             except (AttributeError, ValueError) as e:
                 print(f"Error parsing leader row: {e}")
                 continue
         
+        if writer is None:
+            batch.flush()
         return leaders
     
-    async def scrape_matchups(self) -> List[Matchup]:
+    async def scrape_matchups(self, writer: Optional[BatchWriter] = None) -> List[MatchupCreate]:
         """Scrape matchup matrix data"""
         url = f"{self.BASE_URL}/matchups"  # Adjust endpoint as needed
         html = await self.fetch(url)
@@ -99,6 +104,7 @@ class TCGMatchmakingScraper(BaseScraper):
         if not html:
             return []
         
+        batch = writer or BatchWriter(self.db)
         matchups = []
         soup = BeautifulSoup(html, "lxml")
         
@@ -124,13 +130,15 @@ class TCGMatchmakingScraper(BaseScraper):
                     first_win_rate=float(first_wr) if first_wr else None,
                     second_win_rate=float(second_wr) if second_wr else None
                 )
-                matchup = self.matchup_service.upsert(matchup_data)
-                matchups.append(matchup)
+                batch.upsert(Matchup, canonical_matchup(matchup_data.model_dump()), key=("leader_a_id", "leader_b_id"))
+                matchups.append(matchup_data)
                 
             except (AttributeError, ValueError) as e:
                 print(f"Error parsing matchup cell: {e}")
                 continue
         
+        if writer is None:
+            batch.flush()
         return matchups
     
     def _calculate_tier(self, win_rate: float) -> str:
@@ -1,11 +1,19 @@
+import asyncio
+import logging
 from bs4 import BeautifulSoup
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
-from app.scrapers.base import BaseScraper
+from app.config import get_settings
+from app.executors import run_db
+from app.progress import stage
+from app.scrapers.base import BaseScraper, CardCatalog, normalize_card_id
 from app.models import Card, CardPrice
 from app.schemas.card import CardCreate
 from app.schemas.card_price import CardPriceCreate
-from app.services import CardService, PriceService
+from app.services import BatchWriter, CardService, PriceService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 class TCGPlayerScraper(BaseScraper):
@@ -21,15 +29,35 @@ class TCGPlayerScraper(BaseScraper):
         self.price_service = PriceService(db)
     
     async def scrape(self) -> int:
-        """Scrape all OPTCG card prices"""
-        # Get all cards from database
-        cards = self.card_service.get_all(limit=10000)
-        count = 0
+        """Scrape all OPTCG card prices
         
-        for card in cards:
-            price = await self.scrape_card_price(card.id, card.name)
-            if price:
-                count += 1
+        Walks each set's listing pages instead of searching card by card, so
+        a full refresh costs O(sets x pages) requests. Sets are crawled
+        concurrently under the shared rate limiter.
+        """
+        with stage("catalog"):
+            catalog = await run_db(CardCatalog, self.db)
+        writer = BatchWriter(self.db)
+        try:
+            with stage("sets"):
+                results = await asyncio.gather(
+                    *(self.scrape_set(set_code, catalog, writer) for set_code in catalog.set_codes),
+                    return_exceptions=True
+                )
+            with stage("write"):
+                await run_db(writer.flush)
+        except BaseException:
+            # What `with BatchWriter(...)` does, with the rollback on the DB thread
+            writer.discard()
+            await run_db(self.db.rollback)
+            raise
+        
+        count = 0
+        for set_code, result in zip(catalog.set_codes, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scraping TCGPlayer set {set_code}: {result}")
+            else:
+                count += len(result)
         
         return count
     
@@ -74,54 +102,99 @@ class TCGPlayerScraper(BaseScraper):
     
     def _parse_price(self, price_str: Optional[str]) -> Optional[float]:
         """Parse price string to float"""
-        if not price_str:
-            return None
-        try:
-            # Remove $ and commas, convert to float
-            clean = price_str.replace("$", "").replace(",", "").strip()
-            return float(clean)
-        except ValueError:
-            return None
+        return parse_price(price_str)
     
-    async def scrape_set(self, set_code: str) -> List[CardPrice]:
-        """Scrape all cards from a specific set"""
-        set_url = f"{self.BASE_URL}/search/one-piece-card-game/{set_code}/product"
-        html = await self.fetch(set_url)
+    async def scrape_set(
+        self,
+        set_code: str,
+        catalog: Optional[CardCatalog] = None,
+        writer: Optional[BatchWriter] = None
+    ) -> List[CardPriceCreate]:
+        """Scrape all cards from a specific set, following the listing's pages
         
-        if not html:
-            return []
+        Prices are queued on `writer` (or a writer of its own) rather than
+        committed one row at a time.
+        """
+        catalog = catalog or await run_db(CardCatalog, self.db)
+        set_url = f"{self.BASE_URL}/search/one-piece-card-game/{set_code}/product"
         
-        prices = []
-        soup = BeautifulSoup(html, "lxml")
+        products = await self.fetch_pages(
+            lambda page: f"{set_url}?page={page}",
+            parse_set_page,
+            settings.price_scrape_max_pages
+        )
         
-        # Parse all products on the page
-        products = soup.select(".search-result__product")
+        batch = writer or BatchWriter(self.db)
+        prices = await run_db(self._queue_prices, set_code, products, catalog, batch)
+        if writer is None:
+            await run_db(batch.flush)
         
+        logger.info(f"TCGPlayer set {set_code}: {len(prices)}/{len(products)} listings matched")
+        return prices
+    
+    def _queue_prices(
+        self, set_code: str, products: List[Dict], catalog: CardCatalog, batch: BatchWriter
+    ) -> List[CardPriceCreate]:
+        """Match listings to our cards and queue their prices (runs on the DB thread)"""
+        prices = []
         for product in products:
-            try:
-                name_el = product.select_one(".product-card__name")
-                if not name_el:
-                    continue
-                
-                card_name = name_el.text.strip()
-                card_id = f"{set_code}-{len(prices)+1:03d}"  # Generate ID if not available
-                
-                market_price_el = product.select_one(".product-card__market-price")
-                market_price = self._parse_price(market_price_el.text if market_price_el else None)
-                
-                if market_price:
-                    price_data = CardPriceCreate(
-                        card_id=card_id,
-                        source="tcgplayer",
-                        price_usd=market_price,
-                        market_price=market_price
-                    )
-                    price = self.price_service.add_price(price_data)
-                    prices.append(price)
-                    
-            except (AttributeError, ValueError) as e:
-                print(f"Error parsing product: {e}")
+            card_id = catalog.match(set_code, product["card_id"], product["name"])
+            if not card_id or not product["market_price"]:
                 continue
+            
+            price_data = CardPriceCreate(
+                card_id=card_id,
+                source="tcgplayer",
+                price_usd=product["market_price"],
+                market_price=product["market_price"],
+                low_price=product["low_price"]
+            )
+            batch.add(CardPrice, price_data.model_dump())
+            prices.append(price_data)
         
         return prices
 
+
+def parse_price(price_str: Optional[str]) -> Optional[float]:
+    """Parse price string to float"""
+    if not price_str:
+        return None
+    try:
+        # Remove $ and commas, convert to float
+        clean = price_str.replace("$", "").replace(",", "").strip()
+        return float(clean)
+    except ValueError:
+        return None
+
+
+def parse_set_page(html: str) -> List[Dict]:
+    """Parse one page of a TCGPlayer set listing"""
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+    
+    # This is a template - adjust selectors based on actual site structure
+    for product in soup.select(".search-result__product"):
+        try:
+            name_el = product.select_one(".product-card__name")
+            if not name_el:
+                continue
+            
+            # Card number is printed in the product subtitle, e.g. "OP01-001"
+            number_el = product.select_one(".product-card__number")
+            card_id = normalize_card_id(number_el.text if number_el else product.get_text(" "))
+            
+            market_price_el = product.select_one(".product-card__market-price")
+            low_price_el = product.select_one(".product-card__low-price")
+            
+            products.append({
+                "name": name_el.text.strip(),
+                "card_id": card_id,
+                "market_price": parse_price(market_price_el.text if market_price_el else None),
+                "low_price": parse_price(low_price_el.text if low_price_el else None)
+            })
+            
+        except (AttributeError, ValueError) as e:
+            print(f"Error parsing product: {e}")
+            continue
+    
+    return products
@@ -3,6 +3,12 @@ from app.services.deck_service import DeckService
 from app.services.matchup_service import MatchupService
 from app.services.card_service import CardService
 from app.services.price_service import PriceService
+from app.services.batch_writer import BatchWriter
+from app.services.job_queue import JobQueue
+from app.services.leases import LeaseService
+from app.services.export_service import ExportService
+from app.services.sync_service import SyncService
 
-__all__ = ["LeaderService", "DeckService", "MatchupService", "CardService", "PriceService"]
+__all__ = ["LeaderService", "DeckService", "MatchupService", "CardService", "PriceService", "BatchWriter", "JobQueue",
+           "LeaseService", "ExportService", "SyncService"]
 
@@ -0,0 +1,156 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, update, tuple_
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import time
+from app.progress import track
+
+
+class BatchWriter:
+    """Unit of work that buffers inserts and upserts and writes them in bulk
+
+    Rows are plain dicts of column values. Buffered rows are flushed as
+    executemany statements with a single commit whenever `max_rows` rows are
+    pending or `max_interval_seconds` has passed since the last flush, and
+    when the context manager exits.
+
+        with BatchWriter(db) as writer:
+            for data in rows:
+                writer.add(CardPrice, data)
+    """
+
+    def __init__(self, db: Session, max_rows: int = 500, max_interval_seconds: float = 5.0):
+        self.db = db
+        self.max_rows = max_rows
+        self.max_interval_seconds = max_interval_seconds
+        self.rows_written = 0
+        self.flushes = 0
+        # Keyed by (model, upsert key or None for plain inserts, skip_unchanged).
+        # Dicts keep insertion order, so parents queued first are written first.
+        self._buffers: Dict[Tuple[type, Optional[Tuple[str, ...]], bool], Any] = {}
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.discard()
+            self.db.rollback()
+
+    def add(self, model: Type, values: Dict[str, Any]):
+        """Queue a plain INSERT"""
+        self._buffers.setdefault((model, None, False), []).append(values)
+        self._pending += 1
+        self._maybe_flush()
+
+    def upsert(
+        self,
+        model: Type,
+        values: Dict[str, Any],
+        key: Optional[Sequence[str]] = None,
+        skip_unchanged: bool = False,
+    ):
+        """Queue an insert-or-update matched on `key` (defaults to the primary key)
+
+        Later upserts of the same key within a batch replace earlier ones.
+        With skip_unchanged, rows whose stored columns already equal `values`
+        are not written at all, so re-importing unchanged data costs reads only.
+        """
+        key = tuple(key or (col.name for col in model.__table__.primary_key.columns))
+        rows = self._buffers.setdefault((model, key, skip_unchanged), {})
+        key_value = tuple(values[k] for k in key)
+        if key_value not in rows:
+            self._pending += 1
+        rows[key_value] = values
+        self._maybe_flush()
+
+    def flush(self):
+        """Write everything buffered so far and commit once"""
+        written = 0
+        for (model, key, skip_unchanged), rows in self._buffers.items():
+            if key is None:
+                self.db.execute(insert(model), rows)
+                written += len(rows)
+            else:
+                written += self._write_upserts(model, key, rows, skip_unchanged)
+
+        self.discard()
+        self._last_flush = time.monotonic()
+        if written:
+            self.db.commit()
+            self.rows_written += written
+            self.flushes += 1
+            track("rows_written", written)
+
+    def discard(self):
+        """Drop buffered rows without writing them"""
+        self._buffers = {}
+        self._pending = 0
+
+    def _maybe_flush(self):
+        if (
+            self._pending >= self.max_rows
+            or time.monotonic() - self._last_flush >= self.max_interval_seconds
+        ):
+            self.flush()
+
+    def _write_upserts(
+        self,
+        model: Type,
+        key: Tuple[str, ...],
+        rows: Dict[Tuple, Dict[str, Any]],
+        skip_unchanged: bool = False,
+    ) -> int:
+        """Split upserts into bulk UPDATE-by-primary-key and bulk INSERT
+
+        One SELECT finds which keys already exist (plus their current values
+        when skip_unchanged), so this works on any dialect without needing a
+        unique constraint on `key`.
+        """
+        table = model.__table__
+        pk_cols = list(table.primary_key.columns)
+        key_cols = [table.c[k] for k in key]
+        value_cols = []
+        if skip_unchanged:
+            names = {name for values in rows.values() for name in values}
+            value_cols = [table.c[name] for name in sorted(names) if name not in key]
+
+        existing: Dict[Tuple, Dict[str, Any]] = {}
+        current: Dict[Tuple, Dict[str, Any]] = {}
+        key_values = list(rows.keys())
+        # Stay well under SQLite's bound parameter limit
+        chunk_size = max(1, 900 // len(key_cols))
+        for start in range(0, len(key_values), chunk_size):
+            chunk = key_values[start:start + chunk_size]
+            if len(key_cols) == 1:
+                condition = key_cols[0].in_([k[0] for k in chunk])
+            else:
+                condition = tuple_(*key_cols).in_(chunk)
+            query = self.db.query(*key_cols, *pk_cols, *value_cols).filter(condition)
+            pk_end = len(key_cols) + len(pk_cols)
+            for row in query:
+                key_value = tuple(row[:len(key_cols)])
+                existing[key_value] = {
+                    col.name: value for col, value in zip(pk_cols, row[len(key_cols):pk_end])
+                }
+                current[key_value] = {col.name: value for col, value in zip(value_cols, row[pk_end:])}
+
+        updates = []
+        inserts = []
+        for key_value, values in rows.items():
+            if key_value in existing:
+                stored = current.get(key_value, {})
+                if skip_unchanged and all(stored.get(k) == v for k, v in values.items() if k not in key):
+                    continue
+                updates.append({**values, **existing[key_value]})
+            else:
+                inserts.append(values)
+
+        if updates:
+            self.db.execute(update(model), updates)
+        if inserts:
+            self.db.execute(insert(model), inserts)
+        return len(updates) + len(inserts)
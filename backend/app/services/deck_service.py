@@ -1,9 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import desc
 from typing import List, Optional
 import json
-from app.models import Deck, Leader, Card, CardPrice
+from app.models import Deck, Leader, Card
 from app.schemas.deck import DeckCreate, DeckWithCost, DeckDetailedResponse, CardInDeck
+from app.services.price_service import PriceService
 
 
 class DeckService:
@@ -48,10 +49,9 @@ class DeckService:
         if deck.deck_list_json:
             try:
                 deck_list = json.loads(deck.deck_list_json)
+                prices = PriceService(self.db).get_latest_prices(list(deck_list))
                 for card_id, count in deck_list.items():
-                    price = self.db.query(CardPrice).filter(
-                        CardPrice.card_id == card_id
-                    ).order_by(desc(CardPrice.fetched_at)).first()
+                    price = prices.get(card_id)
                     
                     if price:
                         card_price_usd = (price.price_usd or price.market_price or 0) * count
@@ -72,6 +72,12 @@ class DeckService:
             second_win_rate=deck.second_win_rate,
             tier=deck.tier,
             source_url=deck.source_url,
+            meta_share=deck.meta_share,
+            meta_rank=deck.meta_rank,
+            tournament_points=deck.tournament_points,
+            placings=deck.placings,
+            tournament_wins=deck.tournament_wins,
+            tournament_win_rate=deck.tournament_win_rate,
             created_at=deck.created_at,
             updated_at=deck.updated_at,
             total_cost_usd=round(total_usd, 2) if total_usd > 0 else None,
@@ -83,28 +89,31 @@ class DeckService:
     
     def get_detailed(self, deck_id: int) -> Optional[DeckDetailedResponse]:
         """Get deck with full card details for deck viewer"""
-        deck = self.get_by_id(deck_id)
+        deck = self.db.query(Deck).options(
+            joinedload(Deck.leader), selectinload(Deck.core_cards)
+        ).filter(Deck.id == deck_id).first()
         if not deck:
             return None
         
-        leader = self.db.query(Leader).filter(Leader.id == deck.leader_id).first()
+        leader = deck.leader
         
         cards: List[CardInDeck] = []
         total_usd = 0.0
         total_eur = 0.0
         cost_curve: dict[str, int] = {}
         
+        inclusion_rates = {core.card_id: core.inclusion_rate for core in deck.core_cards}
+        
         if deck.deck_list_json:
             try:
                 deck_list = json.loads(deck.deck_list_json)
+                # Card details and latest prices for the whole list at once
+                card_ids = list(deck_list)
+                card_rows = {card.id: card for card in self.db.query(Card).filter(Card.id.in_(card_ids))}
+                prices = PriceService(self.db).get_latest_prices(card_ids)
                 for card_id, count in deck_list.items():
-                    # Get card details
-                    card = self.db.query(Card).filter(Card.id == card_id).first()
-                    
-                    # Get latest price
-                    price = self.db.query(CardPrice).filter(
-                        CardPrice.card_id == card_id
-                    ).order_by(desc(CardPrice.fetched_at)).first()
+                    card = card_rows.get(card_id)
+                    price = prices.get(card_id)
                     
                     price_usd = None
                     price_eur = None
@@ -137,7 +146,8 @@ class DeckService:
                         image_url=card.image_url if card else None,
                         count=count,
                         price_usd=price_usd,
-                        price_eur=price_eur
+                        price_eur=price_eur,
+                        inclusion_rate=inclusion_rates.get(card_id)
                     ))
             except json.JSONDecodeError:
                 pass
@@ -156,6 +166,12 @@ class DeckService:
             second_win_rate=deck.second_win_rate,
             tier=deck.tier,
             source_url=deck.source_url,
+            meta_share=deck.meta_share,
+            meta_rank=deck.meta_rank,
+            tournament_points=deck.tournament_points,
+            placings=deck.placings,
+            tournament_wins=deck.tournament_wins,
+            tournament_win_rate=deck.tournament_win_rate,
             created_at=deck.created_at,
             updated_at=deck.updated_at,
             total_cost_usd=round(total_usd, 2) if total_usd > 0 else None,
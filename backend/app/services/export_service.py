@@ -0,0 +1,98 @@
+from sqlalchemy import null, select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime
+from app.models import Card, CardPrice, Deck, Matchup, PriceImportBatch, PriceSnapshot
+from app.services.price_service import SNAPSHOT_SOURCES
+
+
+class ExportService:
+    """Full-table row streams for the bulk export endpoints
+
+    Every dataset is read with yield_per, so rows come off a server-side
+    cursor (a lazily stepped cursor on SQLite) in batches of `batch_size`
+    and memory stays flat however large the table is. `since` limits the
+    export to rows updated (prices: fetched) at or after that time, `after`
+    to rows strictly after it (for incremental exports).
+    """
+
+    DATASETS = ("cards", "decks", "matchups", "prices")
+    PRICE_COLUMNS = ["card_id", "source", "price_usd", "price_eur", "market_price", "low_price", "high_price",
+                     "fetched_at"]
+
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+
+    def columns(self, dataset: str) -> List[str]:
+        return [name for name, _ in self.fields(dataset)]
+
+    def fields(self, dataset: str) -> List[Tuple[str, object]]:
+        """(name, SQLAlchemy type) per exported column"""
+        if dataset == "prices":
+            return [(name, CardPrice.__table__.c[name].type) for name in self.PRICE_COLUMNS]
+        return [(column.name, column.type) for column in self._model(dataset).__table__.columns]
+
+    def batches(
+        self,
+        dataset: str,
+        since: Optional[datetime] = None,
+        after: Optional[datetime] = None,
+    ) -> Iterator[Sequence[tuple]]:
+        """Lists of row tuples, in columns(dataset) order"""
+        if dataset == "prices":
+            statements = self._price_statements(since, after)
+        else:
+            statements = [self._table_statement(dataset, since, after)]
+        for statement in statements:
+            result = self.db.execute(statement.execution_options(yield_per=self.batch_size))
+            for partition in result.partitions():
+                yield partition
+
+    def rows(self, dataset: str, since: Optional[datetime] = None, after: Optional[datetime] = None) -> Iterator[Dict]:
+        columns = self.columns(dataset)
+        for batch in self.batches(dataset, since, after):
+            for row in batch:
+                yield dict(zip(columns, row))
+
+    @staticmethod
+    def _model(dataset: str):
+        return {"cards": Card, "decks": Deck, "matchups": Matchup}[dataset]
+
+    def _table_statement(self, dataset: str, since: Optional[datetime], after: Optional[datetime]):
+        model = self._model(dataset)
+        table = model.__table__
+        statement = select(*table.columns).order_by(*table.primary_key.columns)
+        if since is not None:
+            statement = statement.where(table.c.updated_at >= since)
+        if after is not None:
+            statement = statement.where(table.c.updated_at > after)
+        return statement
+
+    def _price_statements(self, since: Optional[datetime], after: Optional[datetime]):
+        """Scraped price rows, then the snapshot history (cents back to prices)"""
+        scraped = select(
+            CardPrice.card_id, CardPrice.source, CardPrice.price_usd, CardPrice.price_eur,
+            CardPrice.market_price, CardPrice.low_price, CardPrice.high_price, CardPrice.fetched_at
+        ).where(CardPrice.source.notin_(SNAPSHOT_SOURCES)).order_by(CardPrice.id)
+
+        snapshots = select(
+            PriceSnapshot.card_id,
+            PriceImportBatch.source,
+            null().label("price_usd"),
+            null().label("price_eur"),
+            (PriceSnapshot.market_cents / 100.0).label("market_price"),
+            (PriceSnapshot.low_cents / 100.0).label("low_price"),
+            null().label("high_price"),
+            PriceImportBatch.fetched_at,
+        ).join(
+            PriceImportBatch, PriceSnapshot.batch_id == PriceImportBatch.id
+        ).order_by(PriceSnapshot.card_id, PriceSnapshot.batch_id)  # The primary key: no sort before the first row
+
+        if since is not None:
+            scraped = scraped.where(CardPrice.fetched_at >= since)
+            snapshots = snapshots.where(PriceImportBatch.fetched_at >= since)
+        if after is not None:
+            scraped = scraped.where(CardPrice.fetched_at > after)
+            snapshots = snapshots.where(PriceImportBatch.fetched_at > after)
+        return [scraped, snapshots]
@@ -0,0 +1,258 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+from app.models import Job, IngestionTotal
+import json
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+# Manually triggered jobs jump ahead of scheduled ones
+SCHEDULED_PRIORITY = 0
+MANUAL_PRIORITY = 10
+
+# Kinds that change the data the API serves (exports and housekeeping don't)
+INGESTION_KINDS = (
+    "import_optcg_api", "scrape_limitless", "scrape_matchmaking", "scrape_tcgplayer", "scrape_cardmarket",
+)
+
+
+def progress_totals(progress: Optional[Dict[str, Any]]) -> Iterator[Tuple[str, str, float]]:
+    """(metric, name, value) for each counter and stage duration in a job's saved progress"""
+    for name, value in (progress or {}).items():
+        if name == "stage_seconds":
+            for stage, seconds in (value or {}).items():
+                yield "stage_seconds", stage, seconds
+        elif name != "elapsed_seconds" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield "counter", name, value
+
+
+class JobQueue:
+    """Durable job queue backed by the jobs table
+
+    The API enqueues; workers lease the highest-priority runnable job, keep
+    the lease alive while they run it and then complete or fail it. A job
+    whose lease runs out (its worker died) is queued again, and failed
+    attempts are retried with exponential backoff until max_attempts.
+
+    Jobs are single-flight: enqueueing a job identical (same kind and
+    payload) to one that is already queued or running returns that job.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        max_attempts: int = 3,
+    ) -> Tuple[Job, bool]:
+        """Queue a job unless an identical one is active; returns (job, created)"""
+        payload = payload or {}
+        dedupe_key = f"{kind}:{json.dumps(payload, sort_keys=True)}"
+
+        existing = self.get_active(dedupe_key)
+        if existing is None:
+            job = Job(
+                kind=kind,
+                payload=payload,
+                dedupe_key=dedupe_key,
+                priority=priority,
+                max_attempts=max_attempts,
+            )
+            self.db.add(job)
+            try:
+                self.db.commit()
+                self.db.refresh(job)
+                return job, True
+            except IntegrityError:
+                # Another process enqueued the same job between our check and insert
+                self.db.rollback()
+                existing = self.get_active(dedupe_key)
+                if existing is None:
+                    raise
+
+        if existing.status == QUEUED and existing.priority < priority:
+            existing.priority = priority
+            self.db.commit()
+        return existing, False
+
+    def get(self, job_id: int) -> Optional[Job]:
+        return self.db.query(Job).filter(Job.id == job_id).first()
+
+    def get_active(self, dedupe_key: str) -> Optional[Job]:
+        return self.db.query(Job).filter(
+            Job.dedupe_key == dedupe_key,
+            Job.status.in_(ACTIVE)
+        ).first()
+
+    def get_jobs(
+        self,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Job]:
+        """Most recent jobs first"""
+        query = self.db.query(Job)
+        if status:
+            query = query.filter(Job.status == status)
+        if kind:
+            query = query.filter(Job.kind == kind)
+        return query.order_by(Job.id.desc()).limit(limit).all()
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """Claim the next runnable job for `worker_id`, or None if there is none
+
+        The claim is a conditional UPDATE on status, so two workers racing for
+        the same row cannot both win; the loser moves on to the next one.
+        """
+        now = datetime.utcnow()
+        self.requeue_expired(now)
+
+        while True:
+            candidate = self.db.query(Job.id).filter(
+                Job.status == QUEUED,
+                Job.run_after <= now
+            ).order_by(Job.priority.desc(), Job.id).first()
+            if candidate is None:
+                return None
+
+            claimed = self.db.query(Job).filter(
+                Job.id == candidate.id,
+                Job.status == QUEUED
+            ).update({
+                Job.status: RUNNING,
+                Job.attempts: Job.attempts + 1,
+                Job.lease_owner: worker_id,
+                Job.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                Job.started_at: now,
+                Job.progress: None,
+                Job.updated_at: now,
+            }, synchronize_session=False)
+            self.db.commit()
+            if claimed:
+                return self.get(candidate.id)
+
+    def extend_lease(
+        self,
+        job_id: int,
+        worker_id: str,
+        lease_seconds: float,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Push the lease out again and save progress; False means the worker no longer owns the job"""
+        now = datetime.utcnow()
+        values = {
+            Job.lease_expires_at: now + timedelta(seconds=lease_seconds),
+            Job.updated_at: now,
+        }
+        if progress is not None:
+            values[Job.progress] = progress
+        extended = self._owned(job_id, worker_id).update(values, synchronize_session=False)
+        self.db.commit()
+        return bool(extended)
+
+    def complete(
+        self,
+        job_id: int,
+        worker_id: str,
+        result: Any = None,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        now = datetime.utcnow()
+        completed = self._owned(job_id, worker_id).update({
+            Job.status: SUCCEEDED,
+            Job.result: result,
+            Job.progress: progress,
+            Job.error: None,
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.finished_at: now,
+            Job.updated_at: now,
+        }, synchronize_session=False)
+        if completed:
+            self._add_totals(self.db.query(Job.kind).filter(Job.id == job_id).scalar(), progress)
+        self.db.commit()
+        return bool(completed)
+
+    def fail(
+        self,
+        job_id: int,
+        worker_id: str,
+        error: str,
+        backoff_seconds: float,
+        retry: bool = True,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Record a failed attempt, queueing a retry if any attempts are left"""
+        job = self.get(job_id)
+        if job is None or job.status != RUNNING or job.lease_owner != worker_id:
+            return False
+
+        now = datetime.utcnow()
+        self._add_totals(job.kind, progress)
+        job.error = error
+        job.progress = progress
+        job.lease_owner = None
+        job.lease_expires_at = None
+        if retry and job.attempts < job.max_attempts:
+            job.status = QUEUED
+            job.run_after = now + timedelta(seconds=backoff_seconds * 2 ** (job.attempts - 1))
+        else:
+            job.status = FAILED
+            job.finished_at = now
+        self.db.commit()
+        return True
+
+    def _add_totals(self, kind: str, progress: Optional[Dict[str, Any]]):
+        """Fold one attempt's progress into the running totals, in the caller's transaction"""
+        for metric, name, value in progress_totals(progress):
+            row = self.db.query(IngestionTotal).filter(
+                IngestionTotal.kind == kind, IngestionTotal.metric == metric, IngestionTotal.name == name
+            )
+            increment = {IngestionTotal.value: IngestionTotal.value + value, IngestionTotal.samples: IngestionTotal.samples + 1}
+            if row.update(increment, synchronize_session=False):
+                continue
+            try:
+                with self.db.begin_nested():
+                    self.db.add(IngestionTotal(kind=kind, metric=metric, name=name, value=value, samples=1))
+            except IntegrityError:
+                # Another worker added the row between our update and insert
+                row.update(increment, synchronize_session=False)
+
+    def requeue_expired(self, now: Optional[datetime] = None) -> int:
+        """Return jobs held by dead workers to the queue (or fail them if out of attempts)"""
+        now = now or datetime.utcnow()
+        expired = self.db.query(Job).filter(
+            Job.status == RUNNING,
+            Job.lease_expires_at < now
+        )
+        failed = expired.filter(Job.attempts >= Job.max_attempts).update({
+            Job.status: FAILED,
+            Job.error: "Lease expired",
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.finished_at: now,
+        }, synchronize_session=False)
+        requeued = expired.update({
+            Job.status: QUEUED,
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.run_after: now,
+        }, synchronize_session=False)
+        if failed or requeued:
+            self.db.commit()
+        return failed + requeued
+
+    def _owned(self, job_id: int, worker_id: str):
+        return self.db.query(Job).filter(
+            Job.id == job_id,
+            Job.status == RUNNING,
+            Job.lease_owner == worker_id
+        )
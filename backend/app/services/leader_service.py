@@ -34,19 +34,27 @@ class LeaderService:
     
     def get_tier_list(self) -> List[LeaderWithStats]:
         """Get all leaders with aggregated stats, ordered by win rate"""
-        leaders = self.db.query(Leader).all()
+        # Every leader's deck aggregates in one grouped query, not one query per leader
+        aggregates = self.db.query(
+            Deck.leader_id.label("leader_id"),
+            func.avg(Deck.win_rate).label("avg_win_rate"),
+            func.sum(Deck.games_played).label("total_games"),
+            func.avg(Deck.first_win_rate).label("avg_first_wr"),
+            func.avg(Deck.second_win_rate).label("avg_second_wr"),
+            func.count(Deck.id).label("deck_count")
+        ).group_by(Deck.leader_id).subquery()
+        rows = self.db.query(
+            Leader,
+            aggregates.c.avg_win_rate,
+            aggregates.c.total_games,
+            aggregates.c.avg_first_wr,
+            aggregates.c.avg_second_wr,
+            aggregates.c.deck_count
+        ).outerjoin(aggregates, aggregates.c.leader_id == Leader.id).all()
         result = []
         
-        for leader in leaders:
-            # Aggregate stats from all decks for this leader
-            stats = self.db.query(
-                func.avg(Deck.win_rate).label("avg_win_rate"),
-                func.sum(Deck.games_played).label("total_games"),
-                func.avg(Deck.first_win_rate).label("avg_first_wr"),
-                func.avg(Deck.second_win_rate).label("avg_second_wr"),
-                func.count(Deck.id).label("deck_count")
-            ).filter(Deck.leader_id == leader.id).first()
-            
+        for stats in rows:
+            leader = stats.Leader
             tier = self._calculate_tier(stats.avg_win_rate or 0)
             
             result.append(LeaderWithStats(
@@ -0,0 +1,60 @@
+from sqlalchemy import case, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+from datetime import datetime, timedelta
+from app.models import Lease
+
+
+class LeaseService:
+    """Named leases in the leases table, for work exactly one process should do
+
+    A holder renews its lease well before it expires; when it dies the lease
+    runs out and the next process to ask takes it over. Like job leases, the
+    take-over is a conditional UPDATE, so two processes cannot both win.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def acquire(self, name: str, owner: str, lease_seconds: float) -> bool:
+        """Take or renew the lease; False means another live process holds it"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=lease_seconds)
+        taken = self.db.query(Lease).filter(
+            Lease.name == name,
+            or_(Lease.owner == owner, Lease.expires_at < now)
+        ).update({
+            Lease.acquired_at: case((Lease.owner == owner, Lease.acquired_at), else_=now),
+            Lease.owner: owner,
+            Lease.expires_at: expires_at,
+        }, synchronize_session=False)
+        self.db.commit()
+        if taken:
+            return True
+
+        if self.db.query(Lease.name).filter(Lease.name == name).first() is not None:
+            return False
+        self.db.add(Lease(name=name, owner=owner, expires_at=expires_at, acquired_at=now))
+        try:
+            self.db.commit()
+            return True
+        except IntegrityError:
+            # Another process created the lease first
+            self.db.rollback()
+            return False
+
+    def release(self, name: str, owner: str) -> bool:
+        released = self.db.query(Lease).filter(
+            Lease.name == name,
+            Lease.owner == owner
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return bool(released)
+
+    def holder(self, name: str) -> Optional[Lease]:
+        """The current, unexpired holder of the lease, if any"""
+        return self.db.query(Lease).filter(
+            Lease.name == name,
+            Lease.expires_at >= datetime.utcnow()
+        ).first()
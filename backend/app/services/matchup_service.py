@@ -1,33 +1,82 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
-from app.models import Matchup, Leader
-from app.schemas.matchup import MatchupCreate, MatchupCell, MatchupMatrix
+from typing import Any, List, Optional, Dict, Tuple
+from app import matchup_stats
+from app.models import Deck, Matchup, Leader
+from app.schemas.matchup import (
+    MatchupCreate, MatchupCell, MatchupMatrix, MatchupMatrixColumnar,
+    SmoothedMatchupCell, SmoothedMatchupMatrix, SmoothedMatchupMatrixColumnar,
+)
+
+# (win_rate, sample_size, first_win_rate, second_win_rate) from the row leader's side
+Cell = Tuple[float, int, Optional[float], Optional[float]]
+
+# Deck column summed per leader to rank the top-N leaders
+TOP_BY = {"meta_share": Deck.meta_share, "games": Deck.games_played}
+
+
+def _complement(rate: Optional[float]) -> Optional[float]:
+    """The opponent's side of a win rate, at the 2 decimals rates are kept to"""
+    return round(100 - rate, 2) if rate is not None else None
+
+
+def reversed_matchup(values: Dict[str, Any]) -> Dict[str, Any]:
+    """The same matchup seen from leader B"""
+    return {
+        **values,
+        "leader_a_id": values["leader_b_id"],
+        "leader_b_id": values["leader_a_id"],
+        "win_rate_a": _complement(values["win_rate_a"]),
+        # A going second is B going first
+        "first_win_rate": _complement(values.get("second_win_rate")),
+        "second_win_rate": _complement(values.get("first_win_rate")),
+    }
+
+
+def canonical_matchup(values: Dict[str, Any]) -> Dict[str, Any]:
+    """The same matchup seen from the leader with the smaller ID, which is how pairs are stored"""
+    if values["leader_a_id"] <= values["leader_b_id"]:
+        return values
+    return reversed_matchup(values)
 
 
 class MatchupService:
+    """Matchups are stored once per pair, leader_a_id < leader_b_id (see canonical_matchup)"""
+    
     def __init__(self, db: Session):
         self.db = db
     
     def get_all(self) -> List[Matchup]:
         return self.db.query(Matchup).all()
     
+    def _seen_by(self, matchup: Matchup, leader_id: str) -> Matchup:
+        """`matchup` from leader_id's side: the stored row, or an unsaved reversed copy of it"""
+        if matchup.leader_a_id == leader_id:
+            return matchup
+        values = {column.key: getattr(matchup, column.key) for column in Matchup.__table__.columns}
+        return Matchup(**reversed_matchup(values))
+    
     def get_matchup(self, leader_a: str, leader_b: str) -> Optional[Matchup]:
-        return self.db.query(Matchup).filter(
-            Matchup.leader_a_id == leader_a,
-            Matchup.leader_b_id == leader_b
+        """The pair's matchup from leader_a's side, whichever way round it is asked for"""
+        first, second = sorted((leader_a, leader_b))
+        matchup = self.db.query(Matchup).filter(
+            Matchup.leader_a_id == first,
+            Matchup.leader_b_id == second
         ).first()
+        return self._seen_by(matchup, leader_a) if matchup else None
     
     def create(self, matchup: MatchupCreate) -> Matchup:
-        db_matchup = Matchup(**matchup.model_dump())
+        db_matchup = Matchup(**canonical_matchup(matchup.model_dump()))
         self.db.add(db_matchup)
         self.db.commit()
         self.db.refresh(db_matchup)
         return db_matchup
     
     def upsert(self, matchup: MatchupCreate) -> Matchup:
-        existing = self.get_matchup(matchup.leader_a_id, matchup.leader_b_id)
+        values = canonical_matchup(matchup.model_dump())
+        existing = self.get_matchup(values["leader_a_id"], values["leader_b_id"])
         if existing:
-            for key, value in matchup.model_dump().items():
+            for key, value in values.items():
                 setattr(existing, key, value)
             self.db.commit()
             self.db.refresh(existing)
@@ -35,78 +84,170 @@ class MatchupService:
         return self.create(matchup)
     
     def get_matchups_for_leader(self, leader_id: str) -> List[Matchup]:
-        return self.db.query(Matchup).filter(
-            (Matchup.leader_a_id == leader_id) | (Matchup.leader_b_id == leader_id)
-        ).all()
+        # One index seek per side (the pair index for leader_a_id, ix_matchups_leader_b_pair
+        # for leader_b_id) instead of OR-ing both columns
+        as_a = self.db.query(Matchup).filter(Matchup.leader_a_id == leader_id)
+        as_b = self.db.query(Matchup).filter(Matchup.leader_b_id == leader_id, Matchup.leader_a_id != leader_id)
+        return [self._seen_by(matchup, leader_id) for matchup in as_a.union_all(as_b)]
     
-    def get_matrix(self) -> MatchupMatrix:
-        """Build a complete matchup matrix for all leaders"""
-        leaders = self.db.query(Leader).all()
-        leader_ids = [l.id for l in leaders]
-        leader_names = {l.id: l.name for l in leaders}
+    def select_leaders(
+        self,
+        leader_ids: Optional[List[str]] = None,
+        top: Optional[int] = None,
+        by: str = "meta_share",
+        color: Optional[str] = None,
+    ) -> List[Tuple[str, str]]:
+        """(id, name) of the leaders a matrix covers
         
-        matchups = self.db.query(Matchup).all()
+        Without filters: every leader. leader_ids keeps the given order; top
+        ranks by the leaders' summed deck meta share or games played.
+        """
+        query = self.db.query(Leader.id, Leader.name)
+        if leader_ids is not None:
+            query = query.filter(Leader.id.in_(leader_ids))
+        if color:
+            query = query.filter(Leader.color.ilike(f"%{color}%"))  # Multicolor leaders are "Red/Green"
+        if top is not None:
+            column = TOP_BY[by]
+            totals = self.db.query(
+                Deck.leader_id.label("leader_id"), func.sum(column).label("total")
+            ).group_by(Deck.leader_id).subquery()
+            query = query.outerjoin(totals, totals.c.leader_id == Leader.id).order_by(
+                func.coalesce(totals.c.total, 0).desc(), Leader.id
+            ).limit(top)
+        leaders = query.all()
+        if leader_ids is not None and top is None:
+            position = {leader_id: i for i, leader_id in enumerate(leader_ids)}
+            leaders.sort(key=lambda leader: position[leader[0]])
+        return leaders
+    
+    def _cells(self, leader_ids: Optional[List[str]] = None, min_sample: int = 0) -> Dict[Tuple[str, str], Cell]:
+        """Stored pairs among `leader_ids` (default all) in both orientations
         
-        # Build the matrix
-        matrix: Dict[str, Dict[str, MatchupCell]] = {}
+        Pairs with fewer than min_sample games are left out. A stored row wins
+        over the flip of its reverse.
+        """
+        query = self.db.query(
+            Matchup.leader_a_id, Matchup.leader_b_id, Matchup.win_rate_a,
+            Matchup.sample_size, Matchup.first_win_rate, Matchup.second_win_rate
+        )
+        if min_sample:
+            query = query.filter(Matchup.sample_size >= min_sample)
+        if leader_ids is None:
+            matchups = query.all()
+        else:
+            # Seek the pair index by leader_a_id; chunked to stay under SQLite's bound parameter limit
+            wanted = set(leader_ids)
+            ids = sorted(wanted)
+            matchups = []
+            for i in range(0, len(ids), 900):
+                chunk = query.filter(Matchup.leader_a_id.in_(ids[i:i + 900]))
+                matchups.extend(row for row in chunk if row.leader_b_id in wanted)
         
-        for leader_a in leader_ids:
+        cells: Dict[Tuple[str, str], Cell] = {}
+        for a, b, win_rate, sample_size, first, second in matchups:
+            cells.setdefault((b, a), (_complement(win_rate), sample_size, _complement(second), _complement(first)))
+        for a, b, win_rate, sample_size, first, second in matchups:
+            cells[(a, b)] = (win_rate, sample_size, first, second)
+        return cells
+    
+    def _selection(
+        self,
+        leader_ids: Optional[List[str]] = None,
+        top: Optional[int] = None,
+        by: str = "meta_share",
+        min_sample: int = 0,
+        color: Optional[str] = None,
+    ) -> Tuple[List[Tuple[str, str]], Dict[Tuple[str, str], Cell]]:
+        """Leaders of a (sub-)matrix and the cells between them, fetching only those pairs"""
+        leaders = self.select_leaders(leader_ids, top, by, color)
+        subset = leader_ids is not None or top is not None or bool(color)
+        cells = self._cells([leader_id for leader_id, _ in leaders] if subset else None, min_sample)
+        return leaders, cells
+    
+    def get_matrix(self, smoothed: bool = False, **filters) -> MatchupMatrix:
+        """Build a complete matchup matrix for all leaders, or the sub-matrix selected by `filters`
+        
+        Filters: leader_ids, top, by, min_sample, color (see select_leaders).
+        smoothed adds each cell's shrunk estimate and interval (needs numpy).
+        """
+        leaders, cells = self._selection(**filters)
+        leader_ids = [leader_id for leader_id, _ in leaders]
+        leader_names = dict(leaders)
+        if smoothed:
+            stats = matchup_stats.smoothed_matchups(self.db)
+            estimates = list(map(matchup_stats.as_list, stats.block(leader_ids)))
+        
+        matrix: Dict[str, Dict[str, MatchupCell]] = {}
+        for i, leader_a in enumerate(leader_ids):
             matrix[leader_a] = {}
-            for leader_b in leader_ids:
+            for j, leader_b in enumerate(leader_ids):
                 if leader_a == leader_b:
                     # Mirror matchup - 50% by definition
-                    matrix[leader_a][leader_b] = MatchupCell(
-                        leader_a_id=leader_a,
-                        leader_b_id=leader_b,
-                        win_rate=50.0,
-                        sample_size=0,
-                        first_win_rate=50.0,
-                        second_win_rate=50.0
-                    )
+                    cell = (50.0, 0, 50.0, 50.0)
                 else:
-                    # Find the matchup data
-                    matchup = next(
-                        (m for m in matchups if m.leader_a_id == leader_a and m.leader_b_id == leader_b),
-                        None
+                    # No data: even odds
+                    cell = cells.get((leader_a, leader_b), (50.0, 0, None, None))
+                win_rate, sample_size, first_win_rate, second_win_rate = cell
+                fields = dict(
+                    leader_a_id=leader_a,
+                    leader_b_id=leader_b,
+                    win_rate=win_rate,
+                    sample_size=sample_size,
+                    first_win_rate=first_win_rate,
+                    second_win_rate=second_win_rate
+                )
+                if smoothed:
+                    position = i * len(leader_ids) + j
+                    matrix[leader_a][leader_b] = SmoothedMatchupCell(
+                        **fields,
+                        smoothed_win_rate=estimates[0][position],
+                        ci_low=estimates[1][position],
+                        ci_high=estimates[2][position]
                     )
-                    if matchup:
-                        matrix[leader_a][leader_b] = MatchupCell(
-                            leader_a_id=leader_a,
-                            leader_b_id=leader_b,
-                            win_rate=matchup.win_rate_a,
-                            sample_size=matchup.sample_size,
-                            first_win_rate=matchup.first_win_rate,
-                            second_win_rate=matchup.second_win_rate
-                        )
-                    else:
-                        # Check reverse matchup
-                        reverse = next(
-                            (m for m in matchups if m.leader_a_id == leader_b and m.leader_b_id == leader_a),
-                            None
-                        )
-                        if reverse:
-                            matrix[leader_a][leader_b] = MatchupCell(
-                                leader_a_id=leader_a,
-                                leader_b_id=leader_b,
-                                win_rate=100 - reverse.win_rate_a,
-                                sample_size=reverse.sample_size,
-                                first_win_rate=100 - reverse.second_win_rate if reverse.second_win_rate else None,
-                                second_win_rate=100 - reverse.first_win_rate if reverse.first_win_rate else None
-                            )
-                        else:
-                            # No data
-                            matrix[leader_a][leader_b] = MatchupCell(
-                                leader_a_id=leader_a,
-                                leader_b_id=leader_b,
-                                win_rate=50.0,
-                                sample_size=0,
-                                first_win_rate=None,
-                                second_win_rate=None
-                            )
+                else:
+                    matrix[leader_a][leader_b] = MatchupCell(**fields)
         
+        if smoothed:
+            return SmoothedMatchupMatrix(
+                leaders=leader_ids,
+                leader_names=leader_names,
+                matrix=matrix,
+                prior_games=stats.prior_games
+            )
         return MatchupMatrix(
             leaders=leader_ids,
             leader_names=leader_names,
             matrix=matrix
         )
-
+    
+    def get_matrix_columnar(self, smoothed: bool = False, **filters) -> MatchupMatrixColumnar:
+        """The matrix as dense row-major arrays, without the per-cell keys (same options as get_matrix)"""
+        leaders, cells = self._selection(**filters)
+        leader_ids = [leader_id for leader_id, _ in leaders]
+        
+        empty: Cell = (None, 0, None, None)
+        rows = [
+            cells.get((leader_a, leader_b), empty) if leader_a != leader_b else empty
+            for leader_a in leader_ids for leader_b in leader_ids
+        ]
+        win_rate, sample_size, first_win_rate, second_win_rate = zip(*rows) if rows else ((), (), (), ())
+        columns = dict(
+            leaders=leader_ids,
+            leader_names=dict(leaders),
+            win_rate=list(win_rate),
+            sample_size=list(sample_size),
+            first_win_rate=list(first_win_rate),
+            second_win_rate=list(second_win_rate)
+        )
+        if smoothed:
+            stats = matchup_stats.smoothed_matchups(self.db)
+            smoothed_win_rate, ci_low, ci_high = map(matchup_stats.as_list, stats.block(leader_ids))
+            return SmoothedMatchupMatrixColumnar(
+                **columns,
+                smoothed_win_rate=smoothed_win_rate,
+                ci_low=ci_low,
+                ci_high=ci_high,
+                prior_games=stats.prior_games
+            )
+        return MatchupMatrixColumnar(**columns)
@@ -1,9 +1,23 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from typing import List, Optional, Dict
+from sqlalchemy import and_, desc, func
+from typing import Iterable, List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
-from app.models import Card, CardPrice
+from app.models import Card, CardPrice, PriceImportBatch, PriceSnapshot
+from app.schemas.card import CardPriceInfo
 from app.schemas.card_price import CardPriceCreate
+from app.services.batch_writer import BatchWriter
+
+# Sources whose history lives in price_snapshots; their card_prices row only
+# holds the latest price
+SNAPSHOT_SOURCES = ("optcgapi",)
+
+
+def to_cents(value: Optional[float]) -> Optional[int]:
+    return None if value is None else int(round(value * 100))
+
+
+def from_cents(cents: Optional[int]) -> Optional[float]:
+    return None if cents is None else cents / 100
 
 
 class PriceService:
@@ -23,41 +37,187 @@ class PriceService:
             query = query.filter(CardPrice.source == source)
         return query.order_by(desc(CardPrice.fetched_at)).first()
     
-    def get_price_history(self, card_id: str, days: int = 30) -> List[CardPrice]:
+    def get_latest_prices(self, card_ids: List[str]) -> Dict[str, CardPrice]:
+        """card_id -> latest price row from any source, for many cards at once"""
+        return self._prices_at(True, card_ids=card_ids)
+    
+    def _prices_at(self, latest: bool, *criteria, card_ids: Optional[List[str]] = None) -> Dict[str, CardPrice]:
+        """card_id -> its latest (or earliest) card_prices row among those matching `criteria`
+
+        Rows tied on fetched_at resolve to the highest ID for the latest and
+        the lowest for the earliest. Card ID lists are chunked to stay under
+        SQLite's bound parameter limit.
+        """
+        pick = func.max if latest else func.min
+        chunks = [None] if card_ids is None else [card_ids[i:i + 900] for i in range(0, len(card_ids), 900)]
+        prices: Dict[str, CardPrice] = {}
+        for chunk in chunks:
+            chosen = self.db.query(
+                CardPrice.card_id,
+                pick(CardPrice.fetched_at).label("fetched_at")
+            ).filter(*criteria)
+            if chunk is not None:
+                chosen = chosen.filter(CardPrice.card_id.in_(chunk))
+            chosen = chosen.group_by(CardPrice.card_id).subquery()
+
+            rows = self.db.query(CardPrice).filter(*criteria).join(chosen, and_(
+                CardPrice.card_id == chosen.c.card_id,
+                CardPrice.fetched_at == chosen.c.fetched_at
+            )).order_by(desc(CardPrice.id) if latest else CardPrice.id)
+            for price in rows:
+                prices.setdefault(price.card_id, price)
+        return prices
+    
+    def get_price_history(self, card_id: str, days: int = 30) -> List[CardPriceInfo]:
+        """Price points per source within the last `days` days
+
+        Snapshot sources also report the price in effect at the start of the
+        window (dated at the cutoff), since unchanged prices are not stored
+        again.
+        """
         cutoff = datetime.utcnow() - timedelta(days=days)
-        return self.db.query(CardPrice).filter(
+        rows = self.db.query(CardPrice).filter(
             CardPrice.card_id == card_id,
+            CardPrice.source.notin_(SNAPSHOT_SOURCES),
             CardPrice.fetched_at >= cutoff
-        ).order_by(CardPrice.fetched_at).all()
+        ).all()
+        history = [CardPriceInfo.model_validate(row, from_attributes=True) for row in rows]
+
+        snapshots = self.db.query(PriceSnapshot, PriceImportBatch).join(
+            PriceImportBatch, PriceSnapshot.batch_id == PriceImportBatch.id
+        ).filter(
+            PriceSnapshot.card_id == card_id
+        ).order_by(PriceSnapshot.batch_id).all()
+        before = [pair for pair in snapshots if pair[1].fetched_at < cutoff]
+        within = [pair for pair in snapshots if pair[1].fetched_at >= cutoff]
+        points = ([(before[-1][0], before[-1][1].source, cutoff)] if before else []) + [
+            (snapshot, batch.source, batch.fetched_at) for snapshot, batch in within
+        ]
+        for snapshot, source, fetched_at in points:
+            history.append(CardPriceInfo(
+                source=source,
+                market_price=from_cents(snapshot.market_cents),
+                low_price=from_cents(snapshot.low_cents),
+                fetched_at=fetched_at,
+            ))
+
+        history.sort(key=lambda p: p.fetched_at)
+        return history
+
+    def start_import_batch(self, source: str) -> int:
+        """Open a snapshot batch for one import run and return its ID"""
+        batch = PriceImportBatch(source=source)
+        self.db.add(batch)
+        self.db.commit()
+        return batch.id
+
+    def record_snapshots(self, batch_id: int, prices: Iterable[Dict]) -> int:
+        """Append a snapshot for each price that differs from the card's last one
+
+        `prices` are CardPrice-style dicts (card_id, market_price, low_price).
+        Returns the number of snapshots written.
+        """
+        points = {
+            price["card_id"]: (to_cents(price.get("market_price")), to_cents(price.get("low_price")))
+            for price in prices
+        }
+        latest = self._latest_snapshots(list(points))
+
+        written = 0
+        with BatchWriter(self.db) as writer:
+            for card_id, (market_cents, low_cents) in points.items():
+                if latest.get(card_id) == (market_cents, low_cents):
+                    continue
+                writer.add(PriceSnapshot, {
+                    "card_id": card_id,
+                    "batch_id": batch_id,
+                    "market_cents": market_cents,
+                    "low_cents": low_cents,
+                })
+                written += 1
+
+        if written:
+            self.db.query(PriceImportBatch).filter(PriceImportBatch.id == batch_id).update(
+                {PriceImportBatch.snapshot_count: PriceImportBatch.snapshot_count + written},
+                synchronize_session=False
+            )
+            self.db.commit()
+        return written
+
+    def _latest_snapshots(self, card_ids: Optional[List[str]] = None) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+        """card_id -> (market_cents, low_cents) of its most recent snapshot"""
+        latest: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+        for card_id, batch_id, market_cents, low_cents in self._snapshots_at(func.max, card_ids=card_ids):
+            latest[card_id] = (market_cents, low_cents)
+        return latest
+
+    def _snapshots_at(
+        self,
+        pick,
+        card_ids: Optional[List[str]] = None,
+        min_batch: Optional[int] = None,
+        max_batch: Optional[int] = None,
+    ) -> List[Tuple]:
+        """One snapshot per card: the pick()-est batch (func.max / func.min) in range
+
+        Rows are (card_id, batch_id, market_cents, low_cents). Card ID lists
+        are chunked to stay under SQLite's bound parameter limit.
+        """
+        chunks = [None] if card_ids is None else [card_ids[i:i + 900] for i in range(0, len(card_ids), 900)]
+        rows = []
+        for chunk in chunks:
+            chosen = self.db.query(
+                PriceSnapshot.card_id,
+                pick(PriceSnapshot.batch_id).label("batch_id")
+            )
+            if chunk is not None:
+                chosen = chosen.filter(PriceSnapshot.card_id.in_(chunk))
+            if min_batch is not None:
+                chosen = chosen.filter(PriceSnapshot.batch_id >= min_batch)
+            if max_batch is not None:
+                chosen = chosen.filter(PriceSnapshot.batch_id <= max_batch)
+            chosen = chosen.group_by(PriceSnapshot.card_id).subquery()
+
+            rows.extend(self.db.query(
+                PriceSnapshot.card_id,
+                PriceSnapshot.batch_id,
+                PriceSnapshot.market_cents,
+                PriceSnapshot.low_cents
+            ).join(chosen, and_(
+                PriceSnapshot.card_id == chosen.c.card_id,
+                PriceSnapshot.batch_id == chosen.c.batch_id
+            )).all())
+        return rows
     
     def get_top_movers(self, days: int = 7, limit: int = 20) -> Dict[str, List[Dict]]:
         """Get cards with biggest price changes"""
         cutoff = datetime.utcnow() - timedelta(days=days)
         
-        # Get cards with price changes
-        cards = self.db.query(Card).all()
-        movers = []
+        # Snapshot sources first; they are the primary price history
+        movers = self._snapshot_movers(cutoff)
+        seen = {m["card_id"] for m in movers}
         
-        for card in cards:
-            # Get oldest and newest prices in the period
-            old_price = self.db.query(CardPrice).filter(
-                CardPrice.card_id == card.id,
-                CardPrice.fetched_at >= cutoff
-            ).order_by(CardPrice.fetched_at).first()
-            
-            new_price = self.db.query(CardPrice).filter(
-                CardPrice.card_id == card.id
-            ).order_by(desc(CardPrice.fetched_at)).first()
+        # Scraped sources: earliest row inside the window vs. latest row, for all cards at once.
+        # A card with a row in the window has its latest row there too.
+        scraped = (CardPrice.source.notin_(SNAPSHOT_SOURCES), CardPrice.fetched_at >= cutoff)
+        oldest = self._prices_at(False, *scraped)
+        newest = self._prices_at(True, *scraped)
+        names = dict(self.db.query(Card.id, Card.name).all()) if oldest else {}
+        
+        for card_id, old_price in oldest.items():
+            if card_id in seen or card_id not in names:
+                continue
+            new_price = newest[card_id]
             
-            if old_price and new_price and old_price.id != new_price.id:
+            if old_price.id != new_price.id:
                 old_val = old_price.price_usd or old_price.market_price or 0
                 new_val = new_price.price_usd or new_price.market_price or 0
                 
                 if old_val > 0:
                     change_pct = ((new_val - old_val) / old_val) * 100
                     movers.append({
-                        "card_id": card.id,
-                        "card_name": card.name,
+                        "card_id": card_id,
+                        "card_name": names[card_id],
                         "old_price": old_val,
                         "new_price": new_val,
                         "change_pct": round(change_pct, 2)
@@ -74,6 +234,39 @@ class PriceService:
             "losers": losers
         }
     
+    def _snapshot_movers(self, cutoff: datetime) -> List[Dict]:
+        """Movers from price_snapshots: price at the cutoff vs. latest price
+
+        The baseline is a card's last snapshot at or before the cutoff, or
+        its first one inside the window for cards added since.
+        """
+        cutoff_batch = self.db.query(func.max(PriceImportBatch.id)).filter(
+            PriceImportBatch.fetched_at <= cutoff
+        ).scalar() or 0
+
+        baseline = {row[0]: row for row in self._snapshots_at(func.min, min_batch=cutoff_batch + 1)}
+        if cutoff_batch:
+            baseline.update({row[0]: row for row in self._snapshots_at(func.max, max_batch=cutoff_batch)})
+        latest = {row[0]: row for row in self._snapshots_at(func.max, min_batch=cutoff_batch + 1)}
+
+        names = dict(self.db.query(Card.id, Card.name).all()) if latest else {}
+        movers = []
+        for card_id, (_, new_batch, new_market, new_low) in latest.items():
+            old = baseline.get(card_id)
+            if old is None or old[1] == new_batch:
+                continue
+            old_val = from_cents(old[2] if old[2] is not None else old[3]) or 0
+            new_val = from_cents(new_market if new_market is not None else new_low) or 0
+            if old_val > 0:
+                movers.append({
+                    "card_id": card_id,
+                    "card_name": names.get(card_id, card_id),
+                    "old_price": old_val,
+                    "new_price": new_val,
+                    "change_pct": round((new_val - old_val) / old_val * 100, 2)
+                })
+        return movers
+    
     def compare_prices(self, card_id: str) -> Dict[str, Optional[float]]:
         """Compare prices between sources"""
         tcgplayer = self.get_latest_price(card_id, "tcgplayer")
@@ -0,0 +1,85 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Tuple
+from app.models import Card, CardPrice, ChangeLog, Leader
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# change_log table_name -> model
+SYNCED_MODELS = {"cards": Card, "leaders": Leader, "card_prices": CardPrice}
+
+
+class SyncService:
+    """Delta sync of the catalog from the change_log sequence
+
+    A client keeps the `seq` of its last sync and asks for what changed
+    after it. Several changes to one row collapse into its current state (or
+    a delete), so a page costs O(rows changed), not O(writes); compact()
+    does the same to the log itself, which keeps long gaps cheap.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def current_seq(self) -> int:
+        return self.db.query(func.max(ChangeLog.seq)).scalar() or 0
+
+    def changes(self, since: int = 0, limit: int = 1000) -> Dict[str, Any]:
+        """Rows upserted and keys deleted after `since`, at most `limit` log entries at a time
+
+        Continue with since=<returned seq> while has_more is true.
+        """
+        entries = self.db.query(ChangeLog.seq, ChangeLog.table_name, ChangeLog.row_key, ChangeLog.op).filter(
+            ChangeLog.seq > since
+        ).order_by(ChangeLog.seq).limit(limit + 1).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # Latest op per row wins
+        latest: Dict[Tuple[str, str], str] = {}
+        for _, table_name, row_key, op in entries:
+            latest[(table_name, row_key)] = op
+
+        changes = {}
+        for table_name, model in SYNCED_MODELS.items():
+            upserted_keys = [key for (table, key), op in latest.items() if table == table_name and op == UPSERT]
+            deleted = [key for (table, key), op in latest.items() if table == table_name and op == DELETE]
+            upserted = self._rows(model, upserted_keys)
+            # Upserted, then deleted after this page's last entry: report the delete now
+            found = {str(row["id"]) for row in upserted}
+            deleted += [key for key in upserted_keys if key not in found]
+            changes[table_name] = {"upserted": upserted, "deleted": deleted}
+
+        return {
+            "since": since,
+            "seq": entries[-1][0] if entries else since,
+            "has_more": has_more,
+            "changes": changes,
+        }
+
+    def _rows(self, model, keys: List[str]) -> List[Dict[str, Any]]:
+        """Current state of the rows with these primary keys, as column dicts"""
+        table = model.__table__
+        id_column = table.c.id
+        if id_column.type.python_type is int:
+            keys = [int(key) for key in keys]
+        rows = []
+        # Chunked to stay under SQLite's bound parameter limit
+        for i in range(0, len(keys), 900):
+            result = self.db.execute(select(*table.columns).where(id_column.in_(keys[i:i + 900])).order_by(id_column))
+            rows.extend(dict(row._mapping) for row in result)
+        return rows
+
+    def compact(self) -> int:
+        """Drop log entries superseded by a later entry for the same row; returns how many
+
+        Safe for every client: whatever `since` it holds, the latest entry of
+        each row changed after it is still there.
+        """
+        latest = select(func.max(ChangeLog.seq)).group_by(ChangeLog.table_name, ChangeLog.row_key)
+        removed = self.db.query(ChangeLog).filter(
+            ChangeLog.seq.notin_(latest.scalar_subquery())
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return removed
@@ -0,0 +1,179 @@
+"""
+Slow-query log with query plans.
+
+Any statement slower than slow_query_ms is logged with its bound parameters
+and the route or job it ran for (app.query_stats origin), and aggregated by
+statement shape. The first time a SELECT shape turns up slow - and again
+whenever it sets a new maximum - its plan is captured on the same DBAPI
+connection: EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL (inside a
+savepoint, so a failed EXPLAIN cannot abort the caller's transaction).
+
+Aggregates are kept per process; GET /api/admin/slow-queries shows the API
+process's (with admin_enabled and the admin token). The worker logs its
+own slow statements.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+from app.query_stats import current_origin, statement_shape
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MAX_PARAM_LENGTH = 200
+
+
+class SlowQuery:
+    """Aggregate of the slow executions of one statement shape"""
+
+    def __init__(self, shape: str):
+        self.shape = shape
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.statement: Optional[str] = None  # Of the slowest execution
+        self.parameters: Any = None
+        self.plan: Optional[List[str]] = None
+        self.origins: Counter = Counter()
+        self.first_seen = datetime.utcnow()
+        self.last_seen = self.first_seen
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "mean_ms": round(self.total_seconds * 1000 / self.count, 2),
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "statement": self.statement,
+            "parameters": self.parameters,
+            "plan": self.plan,
+            "origins": dict(self.origins.most_common()),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        }
+
+
+_lock = threading.Lock()
+_queries: Dict[str, SlowQuery] = {}
+
+
+def _printable(parameters: Any) -> Any:
+    """Bound parameters, with long values cut down"""
+    def short(value):
+        text = repr(value)
+        return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + "..."
+
+    if isinstance(parameters, dict):
+        return {key: short(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [short(value) for value in parameters]
+    return short(parameters)
+
+
+def explain(cursor, dialect_name: str, statement: str, parameters: Any) -> Optional[List[str]]:
+    """Plan of a SELECT, run on the DBAPI connection that executed it (so no engine events fire)"""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    # An error aborts the caller's whole PostgreSQL transaction, so there the
+    # EXPLAIN runs in a savepoint that a failure is rolled back to
+    savepoint = dialect_name == "postgresql"
+    plan_cursor = cursor.connection.cursor()
+    try:
+        if savepoint:
+            try:
+                plan_cursor.execute("SAVEPOINT slow_query_explain")
+            except Exception:
+                return None  # No transaction to hold a savepoint (autocommit); leave it be
+        try:
+            plan_cursor.execute(prefix + statement, parameters)
+            rows = plan_cursor.fetchall()
+        except Exception as e:
+            if savepoint:
+                plan_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return [f"EXPLAIN failed: {e}"]
+        if savepoint:
+            plan_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        plan_cursor.close()
+    if dialect_name == "sqlite":
+        # (id, parent, notused, detail): indent each step under its parent
+        depth = {0: -1}
+        lines = []
+        for row_id, parent, _, detail in rows:
+            depth[row_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[row_id] + detail)
+        return lines
+    return [row[0] for row in rows]
+
+
+def get_slow_queries(order_by: str = "total_ms", limit: int = 50) -> List[Dict[str, Any]]:
+    with _lock:
+        queries = [query.to_dict() for query in _queries.values()]
+    return sorted(queries, key=lambda q: q[order_by], reverse=True)[:limit]
+
+
+def reset_slow_queries():
+    with _lock:
+        _queries.clear()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._slow_query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_started", None)
+    if started is None or not settings.slow_query_ms:
+        return
+    seconds = time.perf_counter() - started
+    if seconds * 1000 < settings.slow_query_ms:
+        return
+
+    shape = statement_shape(statement)
+    origin = current_origin() or "unknown"
+    params = None if executemany else _printable(parameters)
+    with _lock:
+        query = _queries.get(shape)
+        if query is None:
+            if len(_queries) >= settings.slow_query_max_shapes:
+                return
+            query = _queries[shape] = SlowQuery(shape)
+        is_new_max = seconds > query.max_seconds
+        query.count += 1
+        query.total_seconds += seconds
+        query.last_seen = datetime.utcnow()
+        query.origins[origin] += 1
+        if is_new_max:
+            query.max_seconds = seconds
+            query.statement = statement
+            query.parameters = params
+
+    if is_new_max and settings.slow_query_explain and not executemany:
+        plan = explain(cursor, conn.dialect.name, statement, parameters)
+        if plan is not None:
+            with _lock:
+                query.plan = plan
+
+    logger.warning(
+        f"Slow query ({seconds * 1000:.0f}ms, {origin}): {shape[:300]}",
+        extra={
+            "db_time_ms": round(seconds * 1000, 2),
+            "origin": origin,
+            "statement": statement,
+            "parameters": params,
+            "plan": query.plan,
+        },
+    )
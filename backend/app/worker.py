@@ -0,0 +1,190 @@
+"""
+Ingestion worker - runs queued scrape/import jobs outside the API process.
+
+The API only enqueues jobs (app.services.JobQueue); one or more workers lease
+them from the jobs table, run them and record the result. The interval
+scheduler lives here too, so adding API workers never multiplies scrapes,
+and it runs in only one worker process at a time (the scheduler lease).
+When an ingestion job succeeds and the read models are shared
+(READ_MODEL_STORE=database), the worker warms them straight away.
+
+Run with: python -m app.worker [--concurrency N] [--no-scheduler] [--once] [--profile]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import traceback
+from typing import Iterable, Optional
+
+from pydantic_core import to_jsonable_python
+
+from app import slow_queries  # noqa: F401  (logs the worker's slow statements)
+from app.config import get_settings
+from app.database import SessionLocal
+from app.executors import run_db, shutdown_executors
+from app.models import Job
+from app.profiling import SamplingProfiler, any_of, app_code_on_thread, code_on_stack, save_profile
+from app.progress import JobProgress, job_progress
+from app.query_stats import track_queries
+from app.read_models import read_models
+from app.scheduler import JOB_HANDLERS, lead_scheduler
+from app.services import JobQueue
+from app.services.job_queue import INGESTION_KINDS
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Leases jobs from the queue and runs them, `concurrency` at a time"""
+
+    def __init__(self, worker_id: Optional[str] = None, concurrency: Optional[int] = None,
+                 profile_kinds: Optional[Iterable[str]] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency or settings.worker_concurrency
+        if profile_kinds is None:
+            profile_kinds = [kind.strip() for kind in settings.profile_jobs.split(",") if kind.strip()]
+        self.profile_kinds = set(profile_kinds)
+        self.poll_seconds = settings.worker_poll_seconds
+        self.lease_seconds = settings.job_lease_seconds
+        self._stopping = asyncio.Event()
+        self._warming = asyncio.Lock()
+
+    def stop(self):
+        """Finish the jobs in hand, then return from run()"""
+        self._stopping.set()
+
+    async def run(self, once: bool = False):
+        """Process jobs until stop() is called (or, with once=True, until the queue is empty)"""
+        logger.info(f"Worker {self.worker_id} started ({self.concurrency} slot(s))")
+        await asyncio.gather(*(self._loop(once) for _ in range(self.concurrency)))
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _loop(self, once: bool):
+        while not self._stopping.is_set():
+            job = await run_db(self._queue_call, "lease", self.worker_id, self.lease_seconds)
+            if job is None:
+                if once:
+                    return
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_job(job)
+
+    async def run_job(self, job: Job):
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            logger.error(f"Job {job.id}: unknown kind {job.kind!r}")
+            await run_db(self._queue_call, "fail", job.id, self.worker_id, f"Unknown job kind: {job.kind}",
+                         settings.job_retry_backoff_seconds, retry=False)
+            return
+
+        logger.info(f"Job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts}")
+        profiler = None
+        if "*" in self.profile_kinds or job.kind in self.profile_kinds:
+            # The handler's coroutine on the loop thread, plus its run_db work
+            profiler = SamplingProfiler(any_of(code_on_stack(handler.__code__), app_code_on_thread("ingestion-db")))
+            profiler.start()
+        completed = False
+        with job_progress() as progress, track_queries(origin=f"job {job.kind}"):
+            heartbeat = asyncio.create_task(self._heartbeat(job.id, progress))
+            try:
+                result = await handler(**(job.payload or {}))
+            except Exception:
+                error = traceback.format_exc()
+                logger.error(f"Job {job.id} ({job.kind}) failed:\n{error}")
+                await run_db(self._queue_call, "fail", job.id, self.worker_id, error,
+                             settings.job_retry_backoff_seconds, progress=self._final_progress(job, progress, profiler))
+            else:
+                completed = await run_db(self._queue_call, "complete", job.id, self.worker_id,
+                                         to_jsonable_python(result), progress=self._final_progress(job, progress, profiler))
+                if completed:
+                    logger.info(f"Job {job.id} ({job.kind}) done: {progress.snapshot()}")
+                else:
+                    logger.warning(f"Job {job.id} finished after losing its lease; result dropped")
+            finally:
+                heartbeat.cancel()
+        if completed and job.kind in INGESTION_KINDS:
+            await self._job_landed(job)
+
+    async def _job_landed(self, job: Job):
+        """Completion hook for ingestion jobs: publish the read models for the new data version"""
+        if settings.read_model_store != "database":
+            return  # Per-process caches; each API process's warmer notices the new version
+        async with self._warming:
+            try:
+                await asyncio.to_thread(read_models.warm)
+            except Exception as e:
+                logger.error(f"Read model warm-up after job {job.id} failed: {e}")
+
+    @staticmethod
+    def _final_progress(job: Job, progress: JobProgress, profiler: Optional[SamplingProfiler]) -> dict:
+        snapshot = progress.snapshot()
+        if profiler is not None:
+            profiler.stop()
+            snapshot["profile_id"] = save_profile(profiler, f"job {job.id} {job.kind}")
+            logger.info(f"Job {job.id} profile: {snapshot['profile_id']}")
+        return snapshot
+
+    async def _heartbeat(self, job_id: int, progress: JobProgress):
+        """Save progress and renew the lease while the job runs, so no other worker takes it over
+
+        Renewals go to a plain thread, not run_db: the job's own writes queue
+        on the DB thread, and a long one must not hold up the renewal.
+        """
+        interval = min(settings.job_progress_seconds, self.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            renewed = await asyncio.to_thread(self._queue_call, "extend_lease", job_id, self.worker_id,
+                                              self.lease_seconds, progress=progress.snapshot())
+            if not renewed:
+                logger.warning(f"Job {job_id}: lease lost")
+                return
+
+    @staticmethod
+    def _queue_call(method: str, *args, **kwargs):
+        """Run one JobQueue method in its own short-lived session"""
+        db = SessionLocal()
+        try:
+            return getattr(JobQueue(db), method)(*args, **kwargs)
+        finally:
+            db.close()
+
+
+async def main_async(concurrency: Optional[int], scheduler: bool, once: bool, profile: bool = False):
+    worker = Worker(concurrency=concurrency, profile_kinds=["*"] if profile else None)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    # Every worker competes for the scheduler lease; only the holder enqueues interval jobs
+    leader = asyncio.create_task(lead_scheduler(worker.worker_id)) if scheduler else None
+    try:
+        await worker.run(once=once)
+    finally:
+        if leader:
+            leader.cancel()
+            await asyncio.gather(leader, return_exceptions=True)
+        shutdown_executors()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ingestion worker")
+    parser.add_argument("--concurrency", type=int, help="Jobs run at once (default: WORKER_CONCURRENCY)")
+    parser.add_argument("--no-scheduler", action="store_true", help="Don't enqueue interval jobs from this process")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument("--profile", action="store_true", help="Profile every job run (see PROFILE_DIR)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main_async(args.concurrency, scheduler=not (args.no_scheduler or args.once), once=args.once,
+                           profile=args.profile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Standalone benchmark scripts. Run from the backend directory, e.g.:
+    python -m benchmarks.batch_writes
+"""
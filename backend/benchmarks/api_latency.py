@@ -0,0 +1,182 @@
+"""
+p99 latency of /api/leaders/tier-list with and without a concurrent import.
+
+Serves the real app with uvicorn in this process, seeds a throwaway SQLite
+DB, and hammers the tier list while import_optcg_api_data runs on the
+server's event loop against a synthetic (or recorded) optcgapi.com payload.
+Scenarios: idle, import with ingestion_offload off (old inline behaviour),
+import with ingestion_offload on.
+Run with: python -m benchmarks.api_latency [--cards 20000] [--fixtures DIR]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+_tmp = tempfile.mkdtemp(prefix="optcg-latency-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'bench.db')}"
+os.environ["DEBUG"] = "true"
+
+import httpx  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.executors import shutdown_executors, warm_parse_pool  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Deck, Leader  # noqa: E402
+from app.scheduler import import_optcg_api_data  # noqa: E402
+from app.scrapers.http import set_transport  # noqa: E402
+from app.scrapers.optcg_api import ALL_CARDS_URL  # noqa: E402
+from benchmarks.replay import BackgroundServer, FixtureStore, ReplayServer  # noqa: E402
+
+TIER_LIST = "/api/leaders/tier-list"
+
+
+def seed(leaders: int, decks_per_leader: int):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add_all(Leader(id=f"LT{i // 1000:02d}-{i % 1000:03d}", name=f"Leader {i}", color="Red") for i in range(leaders))
+        db.add_all(
+            Deck(
+                leader_id=f"LT{i // 1000:02d}-{i % 1000:03d}",
+                win_rate=random.uniform(40, 60),
+                games_played=random.randint(10, 500),
+                first_win_rate=random.uniform(40, 60),
+                second_win_rate=random.uniform(40, 60),
+            )
+            for i in range(leaders)
+            for _ in range(decks_per_leader)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def synthesize_fixtures(directory: str, cards: int):
+    """Write an allSetCards payload shaped like optcgapi.com's"""
+    payload = [
+        {
+            "card_set_id": f"SY{i // 1000:02d}-{i % 1000:03d}",
+            "card_name": f"Synthetic Card {i}",
+            "set_id": f"SY-{i // 1000:02d}",
+            "rarity": random.choice(["C", "UC", "R", "SR", "SEC"]),
+            "card_type": "Leader" if i % 50 == 0 else "Character",
+            "card_color": random.choice(["Red", "Blue", "Green", "Purple", "Black", "Yellow"]),
+            "card_cost": str(random.randint(1, 10)),
+            "card_power": str(random.randint(1, 12) * 1000),
+            "card_image": f"https://example.invalid/{i}.png",
+            "market_price": round(random.uniform(0.05, 200), 2),
+            "inventory_price": round(random.uniform(0.05, 200), 2),
+        }
+        for i in range(cards)
+    ]
+    FixtureStore(directory).save(
+        "GET", ALL_CARDS_URL, 200, {"content-type": "application/json"}, json.dumps(payload).encode()
+    )
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def hammer(base_url: str, stop: threading.Event, concurrency: int) -> list:
+    """Sequential GETs from `concurrency` threads until `stop` is set"""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while not stop.is_set():
+                start = time.perf_counter()
+                client.get(TIER_LIST).raise_for_status()
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies
+
+
+def run_scenario(name: str, server: BackgroundServer, with_import: bool, duration: float, concurrency: int) -> dict:
+    stop = threading.Event()
+    result = {}
+    collector = threading.Thread(
+        target=lambda: result.setdefault("latencies", hammer(server.base_url, stop, concurrency))
+    )
+    collector.start()
+
+    start = time.perf_counter()
+    if with_import:
+        future = asyncio.run_coroutine_threadsafe(import_optcg_api_data(), server.loop)
+        imported = future.result()
+    else:
+        time.sleep(duration)
+        imported = None
+    window = time.perf_counter() - start
+    stop.set()
+    collector.join()
+
+    latencies = result["latencies"]
+    return {
+        "scenario": name,
+        "window_seconds": round(window, 2),
+        "requests": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(max(latencies), 1),
+        "import": imported,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=20000, help="Synthetic catalog size")
+    parser.add_argument("--fixtures", help="Recorded fixture dir (default: synthesize one)")
+    parser.add_argument("--leaders", type=int, default=150)
+    parser.add_argument("--decks-per-leader", type=int, default=4)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    seed(args.leaders, args.decks_per_leader)
+    fixture_dir = args.fixtures or os.path.join(_tmp, "fixtures")
+    if not args.fixtures:
+        synthesize_fixtures(fixture_dir, args.cards)
+
+    reports = []
+    try:
+        warm_parse_pool()
+        with ReplayServer(fixture_dir) as replay, BackgroundServer(app) as api:
+            set_transport(replay.transport())
+            reports.append(run_scenario("idle", api, False, args.idle_seconds, args.concurrency))
+            settings.ingestion_offload = False
+            reports.append(run_scenario("import (inline)", api, True, 0, args.concurrency))
+            settings.ingestion_offload = True
+            reports.append(run_scenario("import (offloaded)", api, True, 0, args.concurrency))
+    finally:
+        set_transport(None)
+        shutdown_executors()
+
+    for r in reports:
+        print(
+            f"{r['scenario']:>19}: {r['requests']:>5} reqs in {r['window_seconds']:>6}s | "
+            f"p50 {r['p50_ms']:>7} ms | p95 {r['p95_ms']:>7} ms | p99 {r['p99_ms']:>7} ms | "
+            f"max {r['max_ms']:>7} ms | {r['import'] or ''}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark price writes: per-row PriceService.add_price vs BatchWriter.
+Each mode writes into its own fresh SQLite file so fsync cost is included.
+Run with: python -m benchmarks.batch_writes [--rows 5000] [--batch-size 500]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Card, CardPrice
+from app.schemas.card_price import CardPriceCreate
+from app.services import BatchWriter, PriceService
+
+CARD_COUNT = 500
+
+
+def make_session(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.add_all(Card(id=f"BM01-{i:03d}", name=f"Card {i}", set_code="BM01") for i in range(CARD_COUNT))
+    db.commit()
+    return engine, db
+
+
+def make_prices(rows: int):
+    return [
+        CardPriceCreate(
+            card_id=f"BM01-{i % CARD_COUNT:03d}",
+            source="tcgplayer",
+            price_usd=round(random.uniform(0.1, 100), 2),
+            market_price=round(random.uniform(0.1, 100), 2),
+        )
+        for i in range(rows)
+    ]
+
+
+def bench_per_row(db, prices) -> float:
+    service = PriceService(db)
+    start = time.perf_counter()
+    for price in prices:
+        service.add_price(price)
+    return time.perf_counter() - start
+
+
+def bench_batched(db, prices, batch_size: int) -> float:
+    start = time.perf_counter()
+    with BatchWriter(db, max_rows=batch_size) as writer:
+        for price in prices:
+            writer.add(CardPrice, price.model_dump())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    prices = make_prices(args.rows)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("per_row", "batched"):
+            engine, db = make_session(os.path.join(tmp, f"{name}.db"))
+            try:
+                if name == "per_row":
+                    elapsed = bench_per_row(db, prices)
+                else:
+                    elapsed = bench_batched(db, prices, args.batch_size)
+                assert db.query(CardPrice).count() == args.rows
+            finally:
+                db.close()
+                engine.dispose()
+            results[name] = args.rows / elapsed
+            print(f"{name:>8}: {args.rows} rows in {elapsed:.2f}s -> {results[name]:,.0f} rows/sec")
+
+    print(f" speedup: {results['batched'] / results['per_row']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
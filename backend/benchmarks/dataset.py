@@ -0,0 +1,256 @@
+"""
+Synthetic dataset generator for scale testing.
+
+Bulk-loads leaders, cards, decks (with core cards), matchups and price
+history into a SQLite file whose schema comes from the migrations:
+card_prices rows for the scraped sources every few days, plus daily
+optcgapi price snapshots. Rows go in through executemany on the raw DBAPI
+connection, so millions of rows take seconds.
+Run with: python -m benchmarks.dataset --db /tmp/optcg-large.db --scale large
+          python -m benchmarks.dataset --db /tmp/custom.db --leaders 300 --cards 15000 --price-years 2
+"""
+import argparse
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Sequence
+
+from sqlalchemy import create_engine
+
+from app.migrations import upgrade_database
+
+CARDS_PER_SET = 120
+COLORS = ["Red", "Blue", "Green", "Purple", "Black", "Yellow"]
+RARITIES = ["C", "UC", "R", "SR", "SEC"]
+CARD_TYPES = ["Character", "Character", "Character", "Event", "Stage"]
+SCRAPED_SOURCES = ["tcgplayer", "cardmarket"]
+CHUNK_SIZE = 50_000
+
+
+@dataclass
+class DatasetSpec:
+    leaders: int = 40
+    cards: int = 2_000
+    decks_per_leader: int = 5
+    core_cards_per_deck: int = 15
+    matchup_density: float = 1.0  # Fraction of leader pairs that have a matchup row
+    price_years: float = 0.25
+    price_interval_days: int = 7  # Spacing of tcgplayer/cardmarket rows per card
+    price_change_rate: float = 0.1  # Daily chance a card's optcgapi price moves
+    seed: int = 42
+
+
+SCALES = {
+    "small": DatasetSpec(),
+    "medium": DatasetSpec(leaders=150, cards=8_000, decks_per_leader=8, price_years=1),
+    "large": DatasetSpec(leaders=400, cards=20_000, decks_per_leader=10, price_years=2),
+}
+
+
+def sql_datetime(value: datetime) -> str:
+    """The string format SQLAlchemy's SQLite DateTime type reads and compares"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def bulk_insert(cursor, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            cursor.executemany(sql, chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        cursor.executemany(sql, chunk)
+        count += len(chunk)
+    return count
+
+
+def generate(db_path: str, spec: DatasetSpec) -> Dict[str, int]:
+    """Create a fresh SQLite database at `db_path` filled per `spec`; returns row counts"""
+    if spec.leaders > spec.cards:
+        raise ValueError("Leaders are cards too, so --leaders cannot exceed --cards")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    rng = random.Random(spec.seed)
+    engine = create_engine(f"sqlite:///{db_path}")
+    upgrade_database(engine)
+    raw = engine.raw_connection()
+    counts: Dict[str, int] = {}
+    try:
+        cursor = raw.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        now = datetime.utcnow()
+        created = sql_datetime(now)
+
+        card_ids = [f"SY{i // CARDS_PER_SET + 1:02d}-{i % CARDS_PER_SET + 1:03d}" for i in range(spec.cards)]
+        leader_step = spec.cards // spec.leaders
+        leader_ids = [card_ids[i * leader_step] for i in range(spec.leaders)]
+        leader_set = set(leader_ids)
+
+        counts["cards"] = bulk_insert(
+            cursor, "cards",
+            ["id", "name", "set_code", "rarity", "card_type", "color", "cost", "power", "image_url",
+             "created_at", "updated_at"],
+            (
+                (card_id, f"Synthetic Card {i}", card_id.split("-")[0],
+                 "L" if card_id in leader_set else rng.choice(RARITIES),
+                 "Leader" if card_id in leader_set else rng.choice(CARD_TYPES),
+                 rng.choice(COLORS), str(rng.randint(1, 10)), str(rng.randint(1, 12) * 1000),
+                 f"https://example.invalid/{card_id}.png", created, created)
+                for i, card_id in enumerate(card_ids)
+            ),
+        )
+        counts["leaders"] = bulk_insert(
+            cursor, "leaders",
+            ["id", "name", "color", "image_url", "created_at", "updated_at"],
+            ((leader_id, f"Synthetic Leader {i}", rng.choice(COLORS), None, created, created)
+             for i, leader_id in enumerate(leader_ids)),
+        )
+
+        # Decks: explicit IDs so core cards can reference them
+        deck_rows = []
+        core_rows = []
+        deck_id = 0
+        for leader_id in leader_ids:
+            for rank in range(spec.decks_per_leader):
+                deck_id += 1
+                core = rng.sample(card_ids, min(spec.core_cards_per_deck, len(card_ids)))
+                copies = {card_id: rng.randint(1, 4) for card_id in core}
+                win_rate = rng.uniform(40, 60)
+                placings = rng.randint(0, 300)
+                deck_rows.append((
+                    deck_id, leader_id, json.dumps(copies), round(win_rate, 2), rng.randint(10, 5000),
+                    round(win_rate + rng.uniform(-3, 5), 2), round(win_rate + rng.uniform(-5, 2), 2),
+                    rng.choice("SABCD"), "https://example.invalid/decks", round(rng.uniform(0, 12), 2),
+                    deck_id, rng.randint(0, 2000), placings, rng.randint(0, placings // 10), created, created,
+                ))
+                core_rows.extend(
+                    (deck_id, card_id, round(rng.uniform(30, 100), 1), n) for card_id, n in copies.items()
+                )
+        counts["decks"] = bulk_insert(
+            cursor, "decks",
+            ["id", "leader_id", "deck_list_json", "win_rate", "games_played", "first_win_rate",
+             "second_win_rate", "tier", "source_url", "meta_share", "meta_rank", "tournament_points",
+             "placings", "tournament_wins", "created_at", "updated_at"],
+            deck_rows,
+        )
+        counts["deck_core_cards"] = bulk_insert(
+            cursor, "deck_core_cards", ["deck_id", "card_id", "inclusion_rate", "copies"], core_rows,
+        )
+
+        counts["matchups"] = bulk_insert(
+            cursor, "matchups",
+            ["leader_a_id", "leader_b_id", "win_rate_a", "sample_size", "first_win_rate",
+             "second_win_rate", "created_at", "updated_at"],
+            (
+                (a, b, round(rng.uniform(35, 65), 2), rng.randint(20, 2000),
+                 round(rng.uniform(35, 65), 2), round(rng.uniform(35, 65), 2), created, created)
+                for i, a in enumerate(leader_ids)
+                for b in leader_ids[i + 1:]
+                if rng.random() < spec.matchup_density
+            ),
+        )
+
+        days = max(1, int(spec.price_years * 365))
+        start = now - timedelta(days=days)
+        base_price = {card_id: rng.lognormvariate(0, 1.2) for card_id in card_ids}
+
+        def scraped_rows():
+            for offset in range(0, days, spec.price_interval_days):
+                day = start + timedelta(days=offset)
+                drift = 1 + (offset / days) * 0.2
+                for source in SCRAPED_SOURCES:
+                    fetched = sql_datetime(day + timedelta(seconds=rng.randint(0, 86_399)))
+                    for card_id in card_ids:
+                        price = round(base_price[card_id] * drift * rng.uniform(0.9, 1.1), 2)
+                        yield (card_id, source, price if source == "tcgplayer" else None,
+                               price if source == "cardmarket" else None, price, round(price * 0.8, 2),
+                               round(price * 1.3, 2), fetched)
+
+        counts["card_prices"] = bulk_insert(
+            cursor, "card_prices",
+            ["card_id", "source", "price_usd", "price_eur", "market_price", "low_price", "high_price",
+             "fetched_at"],
+            scraped_rows(),
+        )
+
+        # optcgapi: one batch per day; only cards whose price moved get a snapshot
+        cents = {card_id: max(1, int(base_price[card_id] * 100)) for card_id in card_ids}
+        batch_rows = []
+
+        def snapshot_rows():
+            for batch_id in range(1, days + 1):
+                moved = card_ids if batch_id == 1 else rng.sample(
+                    card_ids, int(len(card_ids) * spec.price_change_rate)
+                )
+                for card_id in moved:
+                    if batch_id > 1:
+                        cents[card_id] = max(1, int(cents[card_id] * rng.uniform(0.85, 1.15)))
+                    yield (card_id, batch_id, cents[card_id], int(cents[card_id] * 0.8))
+                batch_rows.append((
+                    batch_id, "optcgapi", sql_datetime(start + timedelta(days=batch_id - 1)), len(moved)
+                ))
+
+        counts["price_snapshots"] = bulk_insert(
+            cursor, "price_snapshots", ["card_id", "batch_id", "market_cents", "low_cents"], snapshot_rows(),
+        )
+        counts["price_import_batches"] = bulk_insert(
+            cursor, "price_import_batches", ["id", "source", "fetched_at", "snapshot_count"], batch_rows,
+        )
+        # Latest optcgapi price per card, as the importer keeps it
+        counts["card_prices"] += bulk_insert(
+            cursor, "card_prices", ["card_id", "source", "market_price", "low_price", "fetched_at"],
+            ((card_id, "optcgapi", cents[card_id] / 100, int(cents[card_id] * 0.8) / 100, created)
+             for card_id in card_ids),
+        )
+
+        raw.commit()
+        cursor.execute("ANALYZE")
+        raw.commit()
+    finally:
+        raw.close()
+        engine.dispose()
+    return counts
+
+
+def spec_from_args(args) -> DatasetSpec:
+    spec = SCALES[args.scale]
+    overrides = {
+        name: getattr(args, name)
+        for name in asdict(spec)
+        if getattr(args, name, None) is not None
+    }
+    return replace(spec, **overrides)
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="Preset to start from")
+    for name, value in asdict(DatasetSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), help=f"Override (small preset: {value})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file to (re)create")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    start = time.perf_counter()
+    counts = generate(args.db, spec)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"{args.db}: {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, count in counts.items():
+        print(f"  {table:>22}: {count:,}")
+
+
+if __name__ == "__main__":
+    main()
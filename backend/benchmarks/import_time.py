@@ -0,0 +1,95 @@
+"""
+Import-time benchmark for the API and worker entry points.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the median cumulative import time plus the most expensive modules.
+It also fails if the API process imports the scraping stack (scrapers,
+BeautifulSoup, lxml, Playwright, APScheduler), which should only load when
+a job runs.
+Run with: python -m benchmarks.import_time [--runs 5] [--top 15] [--output FILE]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# Modules the API must not import at startup
+API_FORBIDDEN = ("app.scrapers.", "bs4", "lxml", "playwright", "apscheduler", "app.scheduler")
+
+
+def measure(module: str) -> Dict[str, Tuple[int, int]]:
+    """{module: (self us, cumulative us)} for one cold interpreter importing `module`"""
+    env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND_DIR,
+        # Never touch a real database; nothing should connect at import anyway
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.gettempdir(), 'optcg-importtime.db')}",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def report(module: str, runs: int, top: int, forbidden: Tuple[str, ...] = ()) -> Dict:
+    measure(module)  # Warm-up: writes .pyc files so every timed run is comparable
+    samples = [measure(module) for _ in range(runs)]
+    totals = [sample[module][1] / 1000 for sample in samples]
+    last = samples[-1]
+    heaviest = sorted(last.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    loaded = sorted(name for name in last if name.startswith(forbidden) or name in {f.rstrip(".") for f in forbidden})
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "modules_imported": len(last),
+        "heaviest_self_ms": {name: round(self_us / 1000, 1) for name, (self_us, _) in heaviest},
+        "forbidden_imported": loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="How many of the slowest modules to list")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results: List[Dict] = [
+        report("app.main", args.runs, args.top, API_FORBIDDEN),
+        report("app.worker", args.runs, args.top),
+        report("app.scrapers.optcg_api", args.runs, args.top),
+    ]
+    for result in results:
+        print(f"import {result['module']}: median {result['median_ms']}ms, min {result['min_ms']}ms, "
+              f"{result['modules_imported']} modules")
+        for name, ms in result["heaviest_self_ms"].items():
+            print(f"  {ms:>8.1f}ms  {name}")
+        if result["forbidden_imported"]:
+            print(f"  FAIL: imports {', '.join(result['forbidden_imported'])}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if any(r["forbidden_imported"] for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Matchup matrix build time and payload size per wire format.
+
+Generates a synthetic database with --leaders leaders (every pair has a
+matchup by default), then times MatchupService building each
+representation and encoding it, and reports the body size raw and gzipped.
+The "top" rows are the sub-matrix of the --top leaders by meta share.
+Then times the beta-binomial smoothing (app.matchup_stats): loading and
+smoothing the whole matrix, and the smoothing arithmetic alone.
+Run with: python -m benchmarks.matchup_matrix [--leaders 500] [--top 20] [--matchup-density 1.0]
+"""
+import argparse
+import gzip
+import os
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+from typing import Callable, List
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import matchup_stats
+from app.api.matchups import _msgpack_matrix, msgpack
+from app.read_models import json_body
+from app.services import MatchupService
+from benchmarks.dataset import DatasetSpec, generate
+
+
+def timed(fn: Callable, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leaders", type=int, default=500)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--matchup-density", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="optcg-matrix-"), "bench.db")
+    spec = replace(DatasetSpec(), leaders=args.leaders, cards=max(200, args.leaders), decks_per_leader=1, price_years=0.01,
+                   matchup_density=args.matchup_density)
+    counts = generate(db_path, spec)
+    print(f"{args.leaders} leaders, {counts['matchups']:,} matchup rows")
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    service = MatchupService(db)
+
+    formats = {
+        "json": (service.get_matrix, json_body),
+        "columnar": (service.get_matrix_columnar, json_body),
+    }
+    if msgpack is not None:
+        formats["msgpack"] = (service.get_matrix_columnar, lambda value: _msgpack_matrix(to_jsonable_python(value)))
+    formats[f"json top{args.top}"] = (lambda: service.get_matrix(top=args.top), json_body)
+    formats[f"col. top{args.top}"] = (lambda: service.get_matrix_columnar(top=args.top), json_body)
+
+    print(f"{'format':>12} {'build ms':>10} {'encode ms':>10} {'bytes':>12} {'gzip bytes':>12}")
+    for name, (build, encode) in formats.items():
+        build_times = timed(build, args.repeat)
+        value = build()
+        db.expunge_all()
+        encode_times = timed(lambda: encode(value), args.repeat)
+        body = encode(value)
+        print(f"{name:>12} {statistics.median(build_times) * 1000:>10.1f} "
+              f"{statistics.median(encode_times) * 1000:>10.1f} {len(body):>12,} {len(gzip.compress(body)):>12,}")
+
+    try:
+        np = matchup_stats.require_numpy()
+    except matchup_stats.SmoothingUnavailable as e:
+        print(f"Skipping smoothing: {e}")
+        db.close()
+        return
+    stats = matchup_stats.build(db)
+    size = len(stats.index)
+    wins = np.random.default_rng(42).uniform(0, 50, (size, size))
+    games = wins + wins.T + 1
+    load_ms = statistics.median(timed(lambda: matchup_stats.build(db), args.repeat)) * 1000
+    smooth_ms = statistics.median(timed(lambda: matchup_stats.smooth(wins, games), args.repeat)) * 1000
+    print(f"smoothing {size}x{size}: {load_ms:.1f} ms with the query, {smooth_ms:.1f} ms arithmetic "
+          f"(prior {stats.prior_games} games)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Query-plan checks for the hot service queries.
+
+Builds a small synthetic database through the migrations, runs each service
+call below while capturing its SQL, and asks SQLite for the plan of every
+statement. A case fails if its table is scanned without an index, if the
+expected index is not used, or (for ordered cases) if the ORDER BY needs a
+temporary sort. Exits non-zero on failure; tests/test_query_plans.py runs
+the same cases under pytest.
+Run with: python -m benchmarks.query_plans [--verbose]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Card, Deck, Matchup
+from app.services import CardService, DeckService, MatchupService, PriceService
+from app.slow_queries import explain
+from benchmarks.dataset import DatasetSpec, generate
+
+
+@dataclass
+class PlanCase:
+    name: str
+    run: Callable[[Session, Dict[str, str]], object]
+    table: str
+    index: str
+    ordered: bool = False  # The index must also deliver the ORDER BY
+
+
+CASES: List[PlanCase] = [
+    PlanCase("DeckService.get_by_leader", lambda db, p: DeckService(db).get_by_leader(p["leader_id"]),
+             "decks", "ix_decks_leader_win_rate", ordered=True),
+    PlanCase("DeckService.get_most_played", lambda db, p: DeckService(db).get_most_played(),
+             "decks", "ix_decks_games_played", ordered=True),
+    PlanCase("DeckService.get_all", lambda db, p: DeckService(db).get_all(),
+             "decks", "ix_decks_games_played", ordered=True),
+    PlanCase("PriceService.get_latest_price(source)",
+             lambda db, p: PriceService(db).get_latest_price(p["card_id"], source="tcgplayer"),
+             "card_prices", "ix_card_prices_card_source_fetched", ordered=True),
+    PlanCase("PriceService.get_price_history", lambda db, p: PriceService(db).get_price_history(p["card_id"]),
+             "card_prices", "ix_card_prices_card"),
+    PlanCase("CardService.get_with_prices", lambda db, p: CardService(db).get_with_prices(p["card_id"]),
+             "card_prices", "ix_card_prices_card"),
+    PlanCase("MatchupService.get_matchup",
+             lambda db, p: MatchupService(db).get_matchup(p["leader_a"], p["leader_b"]),
+             "matchups", "uq_matchups_leader_pair"),
+    PlanCase("MatchupService.get_matchups_for_leader",
+             lambda db, p: MatchupService(db).get_matchups_for_leader(p["leader_b"]),
+             "matchups", "ix_matchups_leader_b_pair"),
+    PlanCase("MatchupService.get_matrix(top)", lambda db, p: MatchupService(db).get_matrix(top=5),
+             "matchups", "uq_matchups_leader_pair"),
+]
+
+
+def check(case: PlanCase, plans: List[Tuple[str, List[str]]]) -> List[str]:
+    """Problems with one case's plans (empty if it passes)"""
+    table = re.compile(rf"\b(SCAN|SEARCH) {case.table}\b")
+    lines = [line.strip() for _, plan in plans for line in plan]
+    touching = [line for line in lines if table.search(line)]
+    problems = []
+    if not touching:
+        problems.append(f"no statement touched {case.table}")
+    for line in touching:
+        if line.startswith("SCAN") and "INDEX" not in line:
+            problems.append(f"full scan: {line}")
+    if touching and not any(case.index in line for line in touching):
+        problems.append(f"{case.index} not used: {'; '.join(touching)}")
+    if case.ordered and any("TEMP B-TREE FOR ORDER BY" in line for line in lines):
+        problems.append("ORDER BY needs a temporary sort")
+    return problems
+
+
+def build_database(path: str) -> Engine:
+    generate(path, DatasetSpec(leaders=20, cards=600, price_years=0.1))
+    return create_engine(f"sqlite:///{path}")
+
+
+def sample_params(db: Session) -> Dict[str, str]:
+    deck = db.query(Deck).first()
+    matchup = db.query(Matchup).first()
+    return {
+        "leader_id": deck.leader_id,
+        "card_id": db.query(Card.id).filter(Card.card_type != "Leader").first()[0],
+        "leader_a": matchup.leader_a_id,
+        "leader_b": matchup.leader_b_id,
+    }
+
+
+def case_plans(engine: Engine, db: Session, case: PlanCase, params: Dict[str, str]) -> List[Tuple[str, List[str]]]:
+    """Run one case and return (statement, plan) for each statement it issued"""
+    captured: List[Tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        case.run(db, params)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    db.expunge_all()
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        return [(statement, explain(cursor, "sqlite", statement, parameters) or [])
+                for statement, parameters in captured]
+    finally:
+        raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    engine = build_database(os.path.join(tempfile.mkdtemp(prefix="optcg-plans-"), "plans.db"))
+    db = sessionmaker(bind=engine)()
+    failures = 0
+    try:
+        params = sample_params(db)
+        for case in CASES:
+            plans = case_plans(engine, db, case, params)
+            problems = check(case, plans)
+            failures += bool(problems)
+            print(f"{'FAIL' if problems else 'ok  '} {case.name} ({case.index})")
+            for problem in problems:
+                print(f"       {problem}")
+            if args.verbose:
+                for statement, plan in plans:
+                    print(f"       {statement[:120]}")
+                    for line in plan:
+                        print(f"         {line}")
+    finally:
+        db.close()
+        engine.dispose()
+
+    print(f"{len(CASES) - failures}/{len(CASES)} cases use their index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Record/replay HTTP harness for the scrapers.
+
+Record real responses from optcgapi.com and limitlesstcg.com into a fixture
+directory (this is the only step that needs network access):
+    python -m benchmarks.replay record --fixtures benchmarks/fixtures
+
+Replay them from a local stand-in server, e.g. while running a benchmark:
+    with ReplayServer("benchmarks/fixtures", latency=0.05, jitter=0.02) as server:
+        set_transport(server.transport())
+        ...
+
+Fixtures are keyed by method + original URL, so scrapers run unmodified.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.scrapers.http import set_transport
+
+logger = logging.getLogger(__name__)
+
+ORIGINAL_URL_HEADER = "x-replay-url"
+# Hop-by-hop / encoding headers that no longer describe the stored body
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def fixture_key(method: str, url: str) -> str:
+    return hashlib.sha1(f"{method.upper()} {url}".encode()).hexdigest()
+
+
+class FixtureStore:
+    """Directory of recorded responses: <key>.json metadata + <key>.body"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, method: str, url: str, status: int, headers: Dict[str, str], body: bytes):
+        key = fixture_key(method, url)
+        with open(os.path.join(self.directory, f"{key}.body"), "wb") as f:
+            f.write(body)
+        meta = {
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in SKIPPED_HEADERS},
+        }
+        with open(os.path.join(self.directory, f"{key}.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def load(self, method: str, url: str) -> Optional[tuple]:
+        key = fixture_key(method, url)
+        meta_path = os.path.join(self.directory, f"{key}.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        with open(os.path.join(self.directory, f"{key}.body"), "rb") as f:
+            body = f.read()
+        return meta["status"], meta["headers"], body
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Transport installed once via set_transport and shared by many clients
+
+    Scrapers open a short-lived client per request; closing one of those must
+    not tear down the pooled connections other in-flight requests are using,
+    so aclose() is a no-op and shutdown() releases the pool.
+    """
+
+    _inner: httpx.AsyncHTTPTransport
+
+    async def aclose(self):
+        pass
+
+    async def shutdown(self):
+        await self._inner.aclose()
+
+
+class RecordingTransport(SharedTransport):
+    """Forwards requests to the real network and saves every response"""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._inner.handle_async_request(request)
+        body = await response.aread()
+        self.store.save(request.method, str(request.url), response.status_code, dict(response.headers), body)
+        logger.info(f"Recorded {request.method} {request.url} ({response.status_code}, {len(body)} bytes)")
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+
+class RedirectTransport(SharedTransport):
+    """Sends every request to the replay server, carrying the original URL
+
+    Also counts requests and bytes so benchmarks can report throughput.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.requests = 0
+        self.bytes_received = 0
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        target = urlsplit(self.base_url)
+        headers = [(k, v) for k, v in request.headers.raw if k.lower() != b"host"]
+        headers.append((ORIGINAL_URL_HEADER.encode(), str(request.url).encode()))
+        local = httpx.Request(
+            request.method,
+            request.url.copy_with(scheme=target.scheme, host=target.hostname, port=target.port),
+            headers=headers,
+            content=request.content,
+        )
+        response = await self._inner.handle_async_request(local)
+        body = await response.aread()
+        self.requests += 1
+        self.bytes_received += len(body)
+        return httpx.Response(response.status_code, headers=response.headers, content=body, request=request)
+
+
+def build_replay_app(store: FixtureStore, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0) -> Starlette:
+    """Stand-in server answering from recorded fixtures
+
+    Each response is delayed by latency +/- jitter seconds, and a fraction
+    `error_rate` of requests fail with 503 to exercise retry/skip paths.
+    """
+
+    async def replay(request: Request) -> Response:
+        delay = max(0.0, latency + random.uniform(-jitter, jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        if error_rate and random.random() < error_rate:
+            return Response("Injected replay error", status_code=503)
+
+        url = request.headers.get(ORIGINAL_URL_HEADER)
+        fixture = store.load(request.method, url) if url else None
+        if fixture is None:
+            return Response(f"No fixture recorded for {request.method} {url}", status_code=404)
+        status, headers, body = fixture
+        return Response(body, status_code=status, headers=headers)
+
+    return Starlette(routes=[Route("/{path:path}", replay, methods=["GET", "POST", "HEAD"])])
+
+
+class BackgroundServer:
+    """Runs an ASGI app under uvicorn on a free localhost port in a thread
+
+    `loop` is the server's event loop, for scheduling work alongside requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._server.serve())
+        self.loop.close()
+
+    def __enter__(self):
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Background server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+class ReplayServer(BackgroundServer):
+    """Serves recorded fixtures from a local stand-in server"""
+
+    def __init__(self, fixture_dir: str, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0):
+        self.store = FixtureStore(fixture_dir)
+        super().__init__(build_replay_app(self.store, latency, jitter, error_rate))
+
+    def transport(self) -> RedirectTransport:
+        return RedirectTransport(self.base_url)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def record(fixture_dir: str, limitless: bool = True, optcg: bool = True):
+    """Run the real importers once against live sites, saving every response"""
+    from benchmarks.scrapers import bench_database
+    from app.scrapers import LimitlessTCGScraper, OPTCGAPIImporter
+
+    transport = RecordingTransport(FixtureStore(fixture_dir))
+    set_transport(transport)
+    try:
+        with bench_database() as bench:
+            if optcg:
+                print(await OPTCGAPIImporter(bench.session).import_all())
+            if limitless:
+                print(await LimitlessTCGScraper(bench.session).scrape())
+    finally:
+        set_transport(None)
+        await transport.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record scraper fixtures from the live sites")
+    parser.add_argument("command", choices=["record"])
+    parser.add_argument("--fixtures", default="benchmarks/fixtures")
+    parser.add_argument("--skip-limitless", action="store_true")
+    parser.add_argument("--skip-optcg", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(record(args.fixtures, limitless=not args.skip_limitless, optcg=not args.skip_optcg))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+End-to-end scraper benchmark against recorded fixtures (see benchmarks/replay.py).
+Runs OPTCGAPIImporter.import_all and LimitlessTCGScraper.scrape through the
+local replay server into a throwaway SQLite file and reports requests/sec,
+parse time and DB write time.
+Run with: python -m benchmarks.scrapers --fixtures benchmarks/fixtures [--latency 0.05]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.scrapers import LimitlessTCGScraper, OPTCGAPIImporter
+from app.executors import executor_stats, shutdown_executors, warm_parse_pool
+from app.scrapers.http import set_transport
+from benchmarks.replay import ReplayServer
+
+
+@dataclass
+class BenchDatabase:
+    session: object
+    db_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add_db_time(self, seconds: float):
+        with self._lock:
+            self.db_seconds += seconds
+
+
+@contextmanager
+def bench_database():
+    """Fresh file-backed SQLite DB whose statement + commit time is tallied"""
+    bench = BenchDatabase(session=None)
+
+    class TimedConnection(sqlite3.Connection):
+        def commit(self):
+            start = time.perf_counter()
+            try:
+                super().commit()
+            finally:
+                bench.add_db_time(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False, "factory": TimedConnection},
+        )
+        Base.metadata.create_all(bind=engine)
+        bench.session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        bench.db_seconds = 0.0  # Leave schema creation out of the tally
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("bench_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            bench.add_db_time(time.perf_counter() - conn.info["bench_start"].pop())
+
+        try:
+            yield bench
+        finally:
+            bench.session.close()
+            engine.dispose()
+
+
+async def run_target(name: str, server: ReplayServer, delay: float, concurrency: int) -> dict:
+    transport = server.transport()
+    set_transport(transport)
+    parse_before = executor_stats["parse_seconds"]
+    try:
+        with bench_database() as bench:
+            start = time.perf_counter()
+            if name == "optcg":
+                results = await OPTCGAPIImporter(bench.session).import_all()
+            else:
+                scraper = LimitlessTCGScraper(bench.session)
+                scraper.rate_limiter.interval = delay
+                scraper.semaphore = asyncio.Semaphore(concurrency)
+                results = await scraper.scrape()
+            elapsed = time.perf_counter() - start
+            db_seconds = bench.db_seconds
+    finally:
+        set_transport(None)
+        await transport.shutdown()
+
+    return {
+        "target": name,
+        "results": results,
+        "wall_seconds": round(elapsed, 3),
+        "requests": transport.requests,
+        "requests_per_second": round(transport.requests / elapsed, 2) if elapsed else None,
+        "bytes": transport.bytes_received,
+        # Summed across concurrent parses, so it can exceed wall time
+        "parse_seconds": round(executor_stats["parse_seconds"] - parse_before, 3),
+        "db_seconds": round(db_seconds, 3),
+    }
+
+
+async def run(args) -> list:
+    reports = []
+    warm_parse_pool()
+    with ReplayServer(args.fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate) as server:
+        for target in args.targets:
+            reports.append(await run_target(target, server, args.delay, args.concurrency))
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="benchmarks/fixtures")
+    parser.add_argument("--targets", nargs="+", choices=["optcg", "limitless"], default=["optcg", "limitless"])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every replayed response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--delay", type=float, default=0.0, help="Scraper request_delay_seconds override")
+    parser.add_argument("--concurrency", type=int, default=4, help="Scraper concurrency override")
+    args = parser.parse_args()
+
+    try:
+        reports = asyncio.run(run(args))
+    finally:
+        shutdown_executors()
+
+    for report in reports:
+        print(
+            f"{report['target']:>9}: {report['requests']} requests in {report['wall_seconds']}s "
+            f"({report['requests_per_second']} req/s, {report['bytes']:,} bytes) | "
+            f"parse {report['parse_seconds']}s | db {report['db_seconds']}s | {report['results']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Route and service benchmark suite at several dataset scales.
+
+For each scale point a synthetic database is generated with
+benchmarks/dataset.py (cached in --data-dir), then every GET route under
+/api is timed through the ASGI app and every read method of the services is
+timed directly. All timings go to a JSON file so runs from different
+commits can be compared.
+Run with: python -m benchmarks.suite [--scales small medium large] [--output FILE]
+          python -m benchmarks.suite --compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+_tmp = tempfile.mkdtemp(prefix="optcg-suite-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'unused.db')}"
+# Routes read the benchmark databases through a get_db override; a lifespan
+# warmer would read the empty default database instead
+os.environ["READ_MODEL_WARM"] = "false"
+
+from fastapi.routing import APIRoute  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app.database import get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Card, Deck, DeckCoreCard, Leader, Matchup  # noqa: E402
+from app.services import CardService, DeckService, LeaderService, MatchupService, PriceService  # noqa: E402
+from benchmarks.dataset import SCALES, DatasetSpec, generate  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Read methods only; writers (create/upsert/add_price/record_snapshots) are
+# covered by benchmarks/batch_writes.py
+SERVICE_CASES: Dict[str, Callable[[Session, Dict[str, str]], object]] = {
+    "LeaderService.get_all": lambda db, p: LeaderService(db).get_all(),
+    "LeaderService.get_by_id": lambda db, p: LeaderService(db).get_by_id(p["leader_id"]),
+    "LeaderService.get_tier_list": lambda db, p: LeaderService(db).get_tier_list(),
+    "DeckService.get_all": lambda db, p: DeckService(db).get_all(),
+    "DeckService.get_by_id": lambda db, p: DeckService(db).get_by_id(int(p["deck_id"])),
+    "DeckService.get_by_leader": lambda db, p: DeckService(db).get_by_leader(p["leader_id"]),
+    "DeckService.get_most_played": lambda db, p: DeckService(db).get_most_played(),
+    "DeckService.get_most_successful": lambda db, p: DeckService(db).get_most_successful(),
+    "DeckService.get_with_cost": lambda db, p: DeckService(db).get_with_cost(int(p["deck_id"])),
+    "DeckService.get_detailed": lambda db, p: DeckService(db).get_detailed(int(p["deck_id"])),
+    "MatchupService.get_all": lambda db, p: MatchupService(db).get_all(),
+    "MatchupService.get_matchup": lambda db, p: MatchupService(db).get_matchup(p["leader_a"], p["leader_b"]),
+    "MatchupService.get_matchups_for_leader": lambda db, p: MatchupService(db).get_matchups_for_leader(p["leader_id"]),
+    "MatchupService.get_matrix": lambda db, p: MatchupService(db).get_matrix(),
+    "MatchupService.get_matrix_columnar": lambda db, p: MatchupService(db).get_matrix_columnar(),
+    "CardService.get_all": lambda db, p: CardService(db).get_all(),
+    "CardService.get_by_id": lambda db, p: CardService(db).get_by_id(p["card_id"]),
+    "CardService.search": lambda db, p: CardService(db).search(p["q"]),
+    "CardService.get_with_prices": lambda db, p: CardService(db).get_with_prices(p["card_id"]),
+    "CardService.get_by_set": lambda db, p: CardService(db).get_by_set(p["set_code"]),
+    "CardService.get_by_rarity": lambda db, p: CardService(db).get_by_rarity(p["rarity"]),
+    "PriceService.get_latest_price": lambda db, p: PriceService(db).get_latest_price(p["card_id"]),
+    "PriceService.get_price_history": lambda db, p: PriceService(db).get_price_history(p["card_id"], days=365),
+    "PriceService.get_top_movers": lambda db, p: PriceService(db).get_top_movers(),
+    "PriceService.compare_prices": lambda db, p: PriceService(db).compare_prices(p["card_id"]),
+}
+
+
+def dataset_path(data_dir: str, name: str, spec: DatasetSpec) -> str:
+    digest = hashlib.sha1(json.dumps(asdict(spec), sort_keys=True).encode()).hexdigest()[:10]
+    return os.path.join(data_dir, f"{name}-{digest}.db")
+
+
+def sample_params(db: Session) -> Dict[str, str]:
+    """Representative path/query values: the busiest leader, the biggest deck, ..."""
+    leader_a, leader_b = db.query(Matchup.leader_a_id, Matchup.leader_b_id).first()
+    deck_id = db.query(DeckCoreCard.deck_id).group_by(DeckCoreCard.deck_id).first()[0]
+    leader_id = db.query(Deck.leader_id).filter(Deck.id == deck_id).scalar()
+    card = db.query(Card).filter(Card.card_type != "Leader").first()
+    return {
+        "leader_id": leader_id or db.query(Leader.id).first()[0],
+        "leader_a": leader_a,
+        "leader_b": leader_b,
+        "deck_id": str(deck_id),
+        "card_id": card.id,
+        "set_code": card.set_code,
+        "rarity": card.rarity,
+        "job_id": "1",
+        "q": card.name.split()[0],
+    }
+
+
+def time_case(fn: Callable[[], object], repeat: int, budget: float) -> Dict:
+    """Run fn once to warm up, then up to `repeat` times within `budget` seconds"""
+    fn()
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < repeat and (not samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+
+def bench_routes(client: TestClient, params: Dict[str, str], repeat: int, budget: float) -> List[Dict]:
+    results = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods or not route.path.startswith("/api"):
+            continue
+        path_names = [p.name for p in route.dependant.path_params]
+        query = {p.name: params[p.name] for p in route.dependant.query_params if p.required and p.name in params}
+        missing = [n for n in path_names if n not in params] + [
+            p.name for p in route.dependant.query_params if p.required and p.name not in params
+        ]
+        if missing:
+            results.append({"route": route.path, "skipped": f"no sample value for {', '.join(missing)}"})
+            continue
+
+        url = route.path.format(**{n: params[n] for n in path_names})
+        response = client.get(url, params=query)
+        timing = time_case(lambda: client.get(url, params=query), repeat, budget)
+        results.append({
+            "route": route.path,
+            "url": url,
+            "status": response.status_code,
+            "bytes": len(response.content),
+            "queries": int(response.headers.get("x-db-query-count", 0)),
+            **timing,
+        })
+    return results
+
+
+def bench_services(sessions: sessionmaker, params: Dict[str, str], repeat: int, budget: float) -> List[Dict]:
+    results = []
+    for name, case in SERVICE_CASES.items():
+        def run():
+            # Fresh session per call so the identity map never serves a hit
+            db = sessions()
+            try:
+                case(db, params)
+            finally:
+                db.close()
+        results.append({"method": name, **time_case(run, repeat, budget)})
+    return results
+
+
+def run_scale(name: str, spec: DatasetSpec, data_dir: str, regenerate: bool, repeat: int, budget: float) -> Dict:
+    path = dataset_path(data_dir, name, spec)
+    generate_seconds = None
+    if regenerate or not os.path.exists(path):
+        start = time.perf_counter()
+        counts = generate(path, spec)
+        generate_seconds = round(time.perf_counter() - start, 2)
+        print(f"[{name}] generated {sum(counts.values()):,} rows in {generate_seconds}s")
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    try:
+        db = sessions()
+        try:
+            params = sample_params(db)
+            rows = {
+                table: db.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                for table in ("cards", "leaders", "decks", "deck_core_cards", "matchups",
+                              "card_prices", "price_snapshots")
+            }
+        finally:
+            db.close()
+
+        with TestClient(app) as client:
+            routes = bench_routes(client, params, repeat, budget)
+        services = bench_services(sessions, params, repeat, budget)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+    return {
+        "scale": name,
+        "spec": asdict(spec),
+        "rows": rows,
+        "generate_seconds": generate_seconds,
+        "params": params,
+        "routes": routes,
+        "services": services,
+    }
+
+
+def git_revision() -> Dict[str, Optional[str]]:
+    def git(*args) -> Optional[str]:
+        try:
+            return subprocess.check_output(["git", *args], stderr=subprocess.DEVNULL, text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+
+
+def compare(old_path: str, new_path: str, threshold: float):
+    """Print per-case median changes between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def index(report) -> Dict:
+        cases = {}
+        for scale in report["scales"]:
+            for r in scale["routes"]:
+                if "median_ms" in r:
+                    cases[(scale["scale"], r["route"])] = r["median_ms"]
+            for s in scale["services"]:
+                cases[(scale["scale"], s["method"])] = s["median_ms"]
+        return cases
+
+    before, after = index(old), index(new)
+    print(f"{old['revision']['commit']} -> {new['revision']['commit']}")
+    for key in sorted(before.keys() & after.keys()):
+        ratio = after[key] / before[key] if before[key] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ("  faster" if ratio < 1 / threshold else "")
+        print(f"[{key[0]:>6}] {key[1]:<45} {before[key]:>10.2f} -> {after[key]:>10.2f} ms ({ratio:5.2f}x){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "optcg-bench-data"),
+                        help="Where generated datasets are cached between runs")
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild cached datasets")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per case")
+    parser.add_argument("--budget", type=float, default=5.0, help="Seconds per case before stopping early")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Ratio flagged as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare, args.threshold)
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scales": [],
+    }
+    for name in args.scales:
+        scale = run_scale(name, SCALES[name], args.data_dir, args.regenerate, args.repeat, args.budget)
+        report["scales"].append(scale)
+        for r in scale["routes"] + scale["services"]:
+            label = r.get("route") or r.get("method")
+            if "skipped" in r:
+                print(f"[{name:>6}] {label:<45} skipped: {r['skipped']}")
+            else:
+                print(f"[{name:>6}] {label:<45} median {r['median_ms']:>10.2f} ms  p95 {r['p95_ms']:>10.2f} ms")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{revision['commit'] or 'unknown'}{'-dirty' if revision['dirty'] else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+#!/bin/sh
+# Bring the schema to the latest revision, then run the container's command
+# (uvicorn by default). MIGRATE_ON_START=false skips the upgrade where a
+# separate step already ran it (the migrate service in docker-compose.yml).
+set -e
+
+if [ "${MIGRATE_ON_START:-true}" = "true" ]; then
+    python -m app.migrations
+fi
+
+exec "$@"
@@ -0,0 +1,134 @@
+"""baseline
+
+The original schema: cards, leaders, card_prices, decks and matchups.
+Databases created by Base.metadata.create_all before migrations existed
+are stamped at this revision by app.migrations instead of running it;
+tables and columns added after this schema come from later revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 23:41:38.494585
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cards',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('set_code', sa.String(), nullable=True),
+    sa.Column('rarity', sa.String(), nullable=True),
+    sa.Column('card_type', sa.String(), nullable=True),
+    sa.Column('color', sa.String(), nullable=True),
+    sa.Column('cost', sa.String(), nullable=True),
+    sa.Column('power', sa.String(), nullable=True),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('cards', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cards_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cards_name'), ['name'], unique=False)
+
+    op.create_table('leaders',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('color', sa.String(), nullable=False),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('leaders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_leaders_id'), ['id'], unique=False)
+
+    op.create_table('card_prices',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('card_id', sa.String(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('price_usd', sa.Float(), nullable=True),
+    sa.Column('price_eur', sa.Float(), nullable=True),
+    sa.Column('market_price', sa.Float(), nullable=True),
+    sa.Column('low_price', sa.Float(), nullable=True),
+    sa.Column('high_price', sa.Float(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('card_prices', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_card_prices_card_id'), ['card_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_card_prices_id'), ['id'], unique=False)
+
+    op.create_table('decks',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('leader_id', sa.String(), nullable=False),
+    sa.Column('deck_list_json', sa.Text(), nullable=True),
+    sa.Column('win_rate', sa.Float(), nullable=True),
+    sa.Column('games_played', sa.Integer(), nullable=True),
+    sa.Column('first_win_rate', sa.Float(), nullable=True),
+    sa.Column('second_win_rate', sa.Float(), nullable=True),
+    sa.Column('tier', sa.String(), nullable=True),
+    sa.Column('source_url', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['leader_id'], ['leaders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_decks_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_decks_leader_id'), ['leader_id'], unique=False)
+
+    op.create_table('matchups',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('leader_a_id', sa.String(), nullable=False),
+    sa.Column('leader_b_id', sa.String(), nullable=False),
+    sa.Column('win_rate_a', sa.Float(), nullable=True),
+    sa.Column('sample_size', sa.Integer(), nullable=True),
+    sa.Column('first_win_rate', sa.Float(), nullable=True),
+    sa.Column('second_win_rate', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['leader_a_id'], ['leaders.id'], ),
+    sa.ForeignKeyConstraint(['leader_b_id'], ['leaders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('matchups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_matchups_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_matchups_leader_a_id'), ['leader_a_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_matchups_leader_b_id'), ['leader_b_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('matchups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_matchups_leader_b_id'))
+        batch_op.drop_index(batch_op.f('ix_matchups_leader_a_id'))
+        batch_op.drop_index(batch_op.f('ix_matchups_id'))
+
+    op.drop_table('matchups')
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_decks_leader_id'))
+        batch_op.drop_index(batch_op.f('ix_decks_id'))
+
+    op.drop_table('decks')
+    with op.batch_alter_table('card_prices', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_card_prices_id'))
+        batch_op.drop_index(batch_op.f('ix_card_prices_card_id'))
+
+    op.drop_table('card_prices')
+    with op.batch_alter_table('leaders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_leaders_id'))
+
+    op.drop_table('leaders')
+    with op.batch_alter_table('cards', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cards_name'))
+        batch_op.drop_index(batch_op.f('ix_cards_id'))
+
+    op.drop_table('cards')
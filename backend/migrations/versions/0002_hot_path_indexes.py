@@ -0,0 +1,40 @@
+"""hot path indexes
+
+Composite indexes for the service queries that were scanning, and a unique
+index on the matchup pair (duplicate pairs are collapsed to their newest
+row first). IF NOT EXISTS because databases built by create_all after the
+models gained these indexes already have them.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 23:41:52.567830
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_card_prices_card_source_fetched', 'card_prices', ['card_id', 'source', 'fetched_at'],
+                    unique=False, if_not_exists=True)
+    op.create_index('ix_decks_leader_win_rate', 'decks', ['leader_id', 'win_rate'], unique=False, if_not_exists=True)
+    op.create_index('ix_decks_games_played', 'decks', ['games_played'], unique=False, if_not_exists=True)
+
+    op.execute(sa.text(
+        "DELETE FROM matchups WHERE id NOT IN "
+        "(SELECT MAX(id) FROM matchups GROUP BY leader_a_id, leader_b_id)"
+    ))
+    op.create_index('uq_matchups_leader_pair', 'matchups', ['leader_a_id', 'leader_b_id'], unique=True,
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('uq_matchups_leader_pair', table_name='matchups')
+    op.drop_index('ix_decks_games_played', table_name='decks')
+    op.drop_index('ix_decks_leader_win_rate', table_name='decks')
+    op.drop_index('ix_card_prices_card_source_fetched', table_name='card_prices')
@@ -0,0 +1,39 @@
+"""coordination tables
+
+Leases (one process runs the scheduler / warms the read models) and the
+read-model snapshots shared by all API processes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 23:49:44.248522
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leases',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('owner', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('read_model_snapshots',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('version', sa.DateTime(), nullable=True),
+    sa.Column('built_at', sa.DateTime(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('read_model_snapshots')
+    op.drop_table('leases')
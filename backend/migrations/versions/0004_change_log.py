@@ -0,0 +1,83 @@
+"""change log
+
+Change sequence for catalog delta sync (GET /api/sync): a change_log table
+filled by row triggers on cards, leaders and card_prices, seeded with one
+entry per existing row so that since=0 is a full sync.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 23:56:43.218626
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ('cards', 'leaders', 'card_prices')
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('seq', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('row_key', sa.String(), nullable=False),
+    sa.Column('op', sa.String(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.create_index('ix_change_log_row', ['table_name', 'row_key'], unique=False)
+
+    for table in SYNCED_TABLES:
+        op.execute(sa.text(
+            "INSERT INTO change_log (table_name, row_key, op) "
+            f"SELECT '{table}', CAST(id AS VARCHAR), 'upsert' FROM {table} ORDER BY id"
+        ))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(sa.text("""
+            CREATE OR REPLACE FUNCTION record_change() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO change_log (table_name, row_key, op) VALUES (TG_TABLE_NAME, OLD.id::text, 'delete');
+                ELSE
+                    INSERT INTO change_log (table_name, row_key, op) VALUES (TG_TABLE_NAME, NEW.id::text, 'upsert');
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        for table in SYNCED_TABLES:
+            op.execute(sa.text(
+                f"CREATE TRIGGER {table}_change_log AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                "FOR EACH ROW EXECUTE FUNCTION record_change()"
+            ))
+    else:
+        for table in SYNCED_TABLES:
+            for event, row, kind in (('INSERT', 'NEW', 'upsert'), ('UPDATE', 'NEW', 'upsert'), ('DELETE', 'OLD', 'delete')):
+                op.execute(sa.text(
+                    f"CREATE TRIGGER {table}_change_log_{event.lower()} AFTER {event} ON {table} "
+                    f"BEGIN INSERT INTO change_log (table_name, row_key, op) "
+                    f"VALUES ('{table}', CAST({row}.id AS TEXT), '{kind}'); END"
+                ))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in SYNCED_TABLES:
+            op.execute(sa.text(f"DROP TRIGGER IF EXISTS {table}_change_log ON {table}"))
+        op.execute(sa.text("DROP FUNCTION IF EXISTS record_change()"))
+    else:
+        for table in SYNCED_TABLES:
+            for event in ('insert', 'update', 'delete'):
+                op.execute(sa.text(f"DROP TRIGGER IF EXISTS {table}_change_log_{event}"))
+
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_change_log_row')
+
+    op.drop_table('change_log')
@@ -0,0 +1,31 @@
+"""read model bodies
+
+Pre-rendered, pre-compressed JSON bodies of read-model snapshots, one row
+per snapshot key and content encoding.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:12:37.504113
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('read_model_bodies',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('encoding', sa.String(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=False),
+    sa.Column('body', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('key', 'encoding')
+    )
+
+
+def downgrade():
+    op.drop_table('read_model_bodies')
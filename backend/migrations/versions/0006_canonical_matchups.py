@@ -0,0 +1,47 @@
+"""canonical matchups
+
+Store each matchup pair once, seen from the leader with the smaller ID
+(leader_a_id < leader_b_id). Where both orientations of a pair exist the
+newest row is kept, as in 0002; reversed rows are then flipped. The
+single-column leader indexes give way to the pair index (leader_a_id side)
+and ix_matchups_leader_b_pair (leader_b_id side).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 10:04:18.771920
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.text(
+        "DELETE FROM matchups WHERE EXISTS (SELECT 1 FROM matchups AS m "
+        "WHERE m.leader_a_id = matchups.leader_b_id AND m.leader_b_id = matchups.leader_a_id "
+        "AND m.id > matchups.id)"
+    ))
+    # Every right-hand side reads the row's old values. The CAST is for PostgreSQL,
+    # which has ROUND(numeric, int) but no ROUND(double precision, int)
+    op.execute(sa.text(
+        "UPDATE matchups SET leader_a_id = leader_b_id, leader_b_id = leader_a_id, "
+        "win_rate_a = ROUND(CAST(100 - win_rate_a AS NUMERIC), 2), "
+        "first_win_rate = ROUND(CAST(100 - second_win_rate AS NUMERIC), 2), "
+        "second_win_rate = ROUND(CAST(100 - first_win_rate AS NUMERIC), 2) "
+        "WHERE leader_a_id > leader_b_id"
+    ))
+
+    op.create_index('ix_matchups_leader_b_pair', 'matchups', ['leader_b_id', 'leader_a_id'], unique=False)
+    op.drop_index('ix_matchups_leader_b_id', table_name='matchups')
+    op.drop_index('ix_matchups_leader_a_id', table_name='matchups')
+
+
+def downgrade():
+    op.create_index('ix_matchups_leader_a_id', 'matchups', ['leader_a_id'], unique=False)
+    op.create_index('ix_matchups_leader_b_id', 'matchups', ['leader_b_id'], unique=False)
+    op.drop_index('ix_matchups_leader_b_pair', table_name='matchups')
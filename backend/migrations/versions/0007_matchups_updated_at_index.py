@@ -0,0 +1,25 @@
+"""matchups updated_at index
+
+Lets MAX(updated_at), part of the smoothed matchup matrix's data version,
+be read from an index instead of a table scan.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 11:26:05.318442
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_matchups_updated_at', 'matchups', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_matchups_updated_at', table_name='matchups')
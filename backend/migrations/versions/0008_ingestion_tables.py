@@ -0,0 +1,147 @@
+"""ingestion tables
+
+The tables and deck columns the ingestion work added on top of the
+baseline: deck meta / tournament stats and core cards, the job queue,
+per-set sync watermarks and the compact optcgapi price snapshots.
+Databases created by create_all while those models existed, before
+migrations did, are stamped at the baseline with some of this already in
+place, so each table and column is only added when it is missing.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 14:02:17.661203
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+DECK_COLUMNS = (
+    ('meta_share', sa.Float()),
+    ('meta_rank', sa.Integer()),
+    ('tournament_points', sa.Integer()),
+    ('placings', sa.Integer()),
+    ('tournament_wins', sa.Integer()),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+
+    deck_columns = {column['name'] for column in inspector.get_columns('decks')}
+    missing = [(name, type_) for name, type_ in DECK_COLUMNS if name not in deck_columns]
+    if missing:
+        with op.batch_alter_table('decks', schema=None) as batch_op:
+            for name, type_ in missing:
+                batch_op.add_column(sa.Column(name, type_, nullable=True))
+
+    if 'deck_core_cards' not in existing:
+        op.create_table('deck_core_cards',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('deck_id', sa.Integer(), nullable=False),
+        sa.Column('card_id', sa.String(), nullable=False),
+        sa.Column('inclusion_rate', sa.Float(), nullable=True),
+        sa.Column('copies', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['deck_id'], ['decks.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('deck_core_cards', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_deck_core_cards_card_id'), ['card_id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_deck_core_cards_deck_id'), ['deck_id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_deck_core_cards_id'), ['id'], unique=False)
+
+    if 'jobs' not in existing:
+        op.create_table('jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('dedupe_key', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(), nullable=True),
+        sa.Column('lease_owner', sa.String(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('progress', sa.JSON(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('jobs', schema=None) as batch_op:
+            batch_op.create_index('ix_jobs_active_dedupe', ['dedupe_key'], unique=True, sqlite_where=sa.text("status IN ('queued', 'running')"), postgresql_where=sa.text("status IN ('queued', 'running')"))
+            batch_op.create_index('ix_jobs_claim', ['status', 'priority', 'run_after'], unique=False)
+            batch_op.create_index(batch_op.f('ix_jobs_id'), ['id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_jobs_kind'), ['kind'], unique=False)
+
+    if 'set_sync_state' not in existing:
+        op.create_table('set_sync_state',
+        sa.Column('set_id', sa.String(), nullable=False),
+        sa.Column('set_name', sa.String(), nullable=True),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('last_modified', sa.String(), nullable=True),
+        sa.Column('content_hash', sa.String(), nullable=True),
+        sa.Column('card_count', sa.Integer(), nullable=True),
+        sa.Column('checked_at', sa.DateTime(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('set_id')
+        )
+
+    if 'price_import_batches' not in existing:
+        op.create_table('price_import_batches',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True),
+        sa.Column('snapshot_count', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('price_import_batches', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_price_import_batches_fetched_at'), ['fetched_at'], unique=False)
+            batch_op.create_index(batch_op.f('ix_price_import_batches_id'), ['id'], unique=False)
+
+    if 'price_snapshots' not in existing:
+        op.create_table('price_snapshots',
+        sa.Column('card_id', sa.String(), nullable=False),
+        sa.Column('batch_id', sa.Integer(), nullable=False),
+        sa.Column('market_cents', sa.Integer(), nullable=True),
+        sa.Column('low_cents', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['batch_id'], ['price_import_batches.id'], ),
+        sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ),
+        sa.PrimaryKeyConstraint('card_id', 'batch_id'),
+        sqlite_with_rowid=False
+        )
+
+
+def downgrade():
+    op.drop_table('price_snapshots')
+    with op.batch_alter_table('price_import_batches', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_price_import_batches_id'))
+        batch_op.drop_index(batch_op.f('ix_price_import_batches_fetched_at'))
+
+    op.drop_table('price_import_batches')
+    op.drop_table('set_sync_state')
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_kind'))
+        batch_op.drop_index(batch_op.f('ix_jobs_id'))
+        batch_op.drop_index('ix_jobs_claim')
+        batch_op.drop_index('ix_jobs_active_dedupe', sqlite_where=sa.text("status IN ('queued', 'running')"), postgresql_where=sa.text("status IN ('queued', 'running')"))
+
+    op.drop_table('jobs')
+    with op.batch_alter_table('deck_core_cards', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_deck_core_cards_id'))
+        batch_op.drop_index(batch_op.f('ix_deck_core_cards_deck_id'))
+        batch_op.drop_index(batch_op.f('ix_deck_core_cards_card_id'))
+
+    op.drop_table('deck_core_cards')
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        for name, _ in reversed(DECK_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,33 @@
+"""deck tournament win rate
+
+The share of a deck's top placings that won the event, from the Limitless
+detail pages. Kept apart from win_rate, which is a game win rate.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 16:12:40.207318
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tournament_win_rate', sa.Float(), nullable=True))
+
+    # Decks already scraped with details
+    op.execute(sa.text(
+        "UPDATE decks SET tournament_win_rate = ROUND(CAST(tournament_wins * 100.0 / placings AS NUMERIC), 2) "
+        "WHERE placings > 0 AND tournament_wins IS NOT NULL"
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.drop_column('tournament_win_rate')
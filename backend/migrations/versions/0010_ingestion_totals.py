@@ -0,0 +1,62 @@
+"""ingestion totals
+
+Running totals of the jobs' progress counters and stage durations, kept up
+by the job queue as attempts finish, so /metrics reads a few rows instead
+of every finished job's progress. Seeded from the jobs finished so far.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 17:05:48.318207
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    totals = op.create_table('ingestion_totals',
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'metric', 'name')
+    )
+
+    # Same folding as app.services.job_queue.progress_totals, frozen here
+    jobs = sa.table('jobs', sa.column('kind', sa.String()), sa.column('status', sa.String()),
+                    sa.column('progress', sa.JSON()))
+    finished = op.get_bind().execute(
+        sa.select(jobs.c.kind, jobs.c.progress).where(
+            jobs.c.status.in_(('succeeded', 'failed')), jobs.c.progress.isnot(None)
+        )
+    )
+    sums = defaultdict(lambda: [0.0, 0])
+    for kind, progress in finished:
+        for name, value in (progress or {}).items():
+            if name == 'stage_seconds':
+                entries = [('stage_seconds', stage, seconds) for stage, seconds in (value or {}).items()]
+            elif name != 'elapsed_seconds' and isinstance(value, (int, float)) and not isinstance(value, bool):
+                entries = [('counter', name, value)]
+            else:
+                entries = []
+            for metric, entry_name, entry_value in entries:
+                total = sums[(kind, metric, entry_name)]
+                total[0] += entry_value
+                total[1] += 1
+    if sums:
+        op.bulk_insert(totals, [
+            {'kind': kind, 'metric': metric, 'name': name, 'value': value, 'samples': samples}
+            for (kind, metric, name), (value, samples) in sums.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('ingestion_totals')
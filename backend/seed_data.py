@@ -5,7 +5,8 @@ Run with: python seed_data.py
 import json
 from datetime import datetime, timedelta
 import random
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal
+from app.migrations import upgrade_database
 from app.models import Leader, Deck, Matchup, Card, CardPrice
 
 # Sample leaders
@@ -56,8 +57,8 @@ def calculate_tier(win_rate: float) -> str:
 
 
 def seed_database():
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create or upgrade the schema
+    upgrade_database()
     
     db = SessionLocal()
     
@@ -119,8 +120,10 @@ def seed_database():
         
         # Seed matchups
         matchups_count = 0
-        for i, leader_a in enumerate(leaders):
-            for leader_b in leaders[i+1:]:
+        # Pairs are stored once, from the leader with the smaller ID
+        ordered = sorted(leaders, key=lambda leader: leader.id)
+        for i, leader_a in enumerate(ordered):
+            for leader_b in ordered[i+1:]:
                 # Random win rate for leader_a
                 win_rate_a = random.uniform(35, 65)
                 sample = random.randint(50, 500)
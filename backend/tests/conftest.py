@@ -0,0 +1,20 @@
+"""Point the app at a throwaway SQLite file before anything imports app.database"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="optcg-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'app.db')}"
+os.environ["READ_MODEL_WARM"] = "false"
+os.environ["SQL_STRICT"] = "true"  # Over-budget and N+1 requests fail with a 500 (app.middleware)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app_db():
+    """The app's own database (app.database.engine), migrated to head"""
+    from app.database import engine
+    from app.migrations import upgrade_database
+
+    upgrade_database(engine)
+    return engine
@@ -0,0 +1,43 @@
+"""Limitless deck detail pages: parsing and the tournament win rate derived from them"""
+from app.database import SessionLocal
+from app.scrapers.limitless_scraper import LimitlessTCGScraper, parse_deck_details
+
+DETAIL_PAGE = """
+<html><body>
+  <h1>Red Zoro</h1>
+  <div>OP01-001 &bull; 128 placings, including 10 wins &bull; 1662 points</div>
+  <section>
+    <h2>Core Cards</h2>
+    <a href="/cards/OP01-016">Nami 4x</a><span>98.5%</span>
+    <a href="/cards/OP01-025">Roronoa Zoro</a><span>87%</span>
+  </section>
+</body></html>
+"""
+
+
+def test_parse_subtitle_and_core_cards():
+    details = parse_deck_details(DETAIL_PAGE, "red-zoro")
+    assert (details["leader_id"], details["placings"], details["wins"], details["points"]) == (
+        "OP01-001", 128, 10, 1662
+    )
+    assert details["core_cards"] == [
+        {"card_id": "OP01-016", "inclusion_rate": 98.5, "copies": 4},
+        {"card_id": "OP01-025", "inclusion_rate": 87.0, "copies": None},
+    ]
+
+
+def test_tournament_win_rate_from_placings(app_db):
+    db = SessionLocal()
+    try:
+        scraper = LimitlessTCGScraper(db)
+        deck_info = {"name": "Red Zoro", "meta_share": 12.0, "points": 900, "source_url": "/decks/red-zoro"}
+        deck = scraper._update_deck_meta(deck_info, parse_deck_details(DETAIL_PAGE, "red-zoro"))
+        # 10 event wins out of 128 top placings; the game win rate stays a separate estimate
+        assert (deck.placings, deck.tournament_wins, deck.tournament_win_rate) == (128, 10, 7.81)
+        assert deck.tier == "C"
+
+        few = scraper._update_deck_meta({**deck_info, "source_url": "/decks/lucky"}, {"placings": 2, "wins": 2})
+        assert (few.tournament_win_rate, few.tier) == (100.0, "B")  # Too few placings: meta-share tier
+    finally:
+        db.rollback()
+        db.close()
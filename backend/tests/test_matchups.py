@@ -0,0 +1,53 @@
+"""Pairs are stored once; every read must present them from the leader asked about"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.migrations import upgrade_database
+from app.models import Leader
+from app.schemas.matchup import MatchupCreate
+from app.services import MatchupService
+
+
+@pytest.fixture
+def service(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'matchups.db'}")
+    upgrade_database(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([Leader(id="SY01-001", name="A", color="Red"), Leader(id="SY01-051", name="B", color="Blue")])
+    # Reported from the larger ID's side, so it is stored flipped
+    MatchupService(db).create(MatchupCreate(
+        leader_a_id="SY01-051", leader_b_id="SY01-001", win_rate_a=35.63,
+        sample_size=120, first_win_rate=40.1, second_win_rate=30.7,
+    ))
+    yield MatchupService(db)
+    db.close()
+    engine.dispose()
+
+
+def assert_from_larger_id(matchup):
+    assert (matchup.leader_a_id, matchup.leader_b_id) == ("SY01-051", "SY01-001")
+    assert (matchup.win_rate_a, matchup.first_win_rate, matchup.second_win_rate) == (35.63, 40.1, 30.7)
+
+
+def test_stored_canonically_with_rounded_complements(service):
+    stored = service.get_matchup("SY01-001", "SY01-051")
+    assert (stored.leader_a_id, stored.win_rate_a) == ("SY01-001", 64.37)
+    assert (stored.first_win_rate, stored.second_win_rate) == (69.3, 59.9)
+
+
+def test_get_matchup_reverse_orientation(service):
+    assert_from_larger_id(service.get_matchup("SY01-051", "SY01-001"))
+
+
+def test_matchups_for_leader_on_b_side(service):
+    [matchup] = service.get_matchups_for_leader("SY01-051")
+    assert_from_larger_id(matchup)
+    service.db.commit()
+    assert service.get_matchup("SY01-001", "SY01-051").win_rate_a == 64.37
+
+
+def test_matrix_cells_rounded(service):
+    matrix = service.get_matrix()
+    assert matrix.matrix["SY01-051"]["SY01-001"].win_rate == 35.63
+    assert matrix.matrix["SY01-001"]["SY01-051"].win_rate == 64.37
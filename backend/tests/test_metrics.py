@@ -0,0 +1,44 @@
+"""Ingestion totals are kept as attempts finish, so /metrics doesn't depend on the job rows"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.metrics import _ingestion_lines
+from app.migrations import upgrade_database
+from app.models import Job
+from app.services import JobQueue
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    upgrade_database(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def run(queue, progress, succeed=True):
+    job, _ = queue.enqueue("scrape_limitless")
+    queue.lease("worker-1", 60)
+    if succeed:
+        queue.complete(job.id, "worker-1", progress=progress)
+    else:
+        queue.fail(job.id, "worker-1", "boom", backoff_seconds=0, retry=False, progress=progress)
+
+
+def test_totals_survive_deleted_jobs(db):
+    queue = JobQueue(db)
+    run(queue, {"rows_written": 10, "http_requests": 3, "elapsed_seconds": 4.0, "stage_seconds": {"parse": 1.5}})
+    run(queue, {"rows_written": 5, "stage_seconds": {"parse": 0.5, "write": 2.0}}, succeed=False)
+    db.query(Job).delete()
+    db.commit()
+
+    lines = _ingestion_lines(db)
+    assert 'optcg_ingestion_total{kind="scrape_limitless",counter="rows_written"} 15.0' in lines
+    assert 'optcg_ingestion_total{kind="scrape_limitless",counter="http_requests"} 3.0' in lines
+    assert 'optcg_ingestion_stage_seconds_sum{kind="scrape_limitless",stage="parse"} 2.0' in lines
+    assert 'optcg_ingestion_stage_seconds_count{kind="scrape_limitless",stage="parse"} 2' in lines
+    assert 'optcg_ingestion_stage_seconds_count{kind="scrape_limitless",stage="write"} 1' in lines
+    assert not any("elapsed_seconds" in line for line in lines)
@@ -0,0 +1,56 @@
+"""Every path to the head revision must end at the schema the models describe"""
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app import models  # noqa: F401  (registers the tables on Base)
+from app.database import Base
+from app.migrations import BASELINE, upgrade_database
+
+BASELINE_TABLES = {"cards", "leaders", "card_prices", "decks", "matchups"}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def schema_diff(engine):
+    with engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+
+def unversioned_baseline(engine):
+    """A database as create_all built it before migrations existed"""
+    upgrade_database(engine, BASELINE)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+
+
+def test_fresh_database_matches_models(engine):
+    upgrade_database(engine)
+    assert schema_diff(engine) == []
+
+
+def test_unversioned_baseline_upgrades_to_models(engine):
+    unversioned_baseline(engine)
+    assert set(inspect(engine).get_table_names()) == BASELINE_TABLES
+    assert "placings" not in {column["name"] for column in inspect(engine).get_columns("decks")}
+
+    upgrade_database(engine)
+    assert schema_diff(engine) == []
+
+
+def test_unversioned_database_with_ingestion_tables_upgrades(engine):
+    # create_all after the job queue and core cards existed, before the deck stats columns
+    unversioned_baseline(engine)
+    with engine.begin() as connection:
+        Base.metadata.tables["jobs"].create(connection)
+        Base.metadata.tables["deck_core_cards"].create(connection)
+        connection.execute(text("ALTER TABLE decks ADD COLUMN meta_share FLOAT"))
+
+    upgrade_database(engine)
+    assert schema_diff(engine) == []
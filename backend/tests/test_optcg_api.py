@@ -0,0 +1,68 @@
+"""Incremental imports re-import a set's catalog only when it changed; prices are snapshotted every run"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.migrations import upgrade_database
+from app.models import Card, CardPrice, PriceSnapshot
+from app.scrapers.http import set_transport
+from app.scrapers.optcg_api import OPTCGAPIImporter, parse_set_cards
+
+SET = {"set_id": "OP-01", "set_name": "Romance Dawn"}
+
+
+def card(card_id, name, market_price):
+    return {
+        "card_set_id": card_id, "card_name": name, "set_id": "OP-01", "rarity": "C", "card_type": "Character",
+        "card_color": "Red", "card_cost": 2, "card_power": 3000, "card_image": f"https://example.invalid/{card_id}.png",
+        "market_price": market_price, "inventory_price": market_price / 2,
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'optcg.db'}")
+    upgrade_database(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+    set_transport(None)
+
+
+def serve(cards):
+    set_transport(httpx.MockTransport(lambda request: httpx.Response(200, content=json.dumps(cards).encode())))
+
+
+def sync(db, state):
+    # A new importer per run, as each import job starts its own snapshot batch
+    return asyncio.run(OPTCGAPIImporter(db).sync_set(SET, state))
+
+
+def test_price_fields_do_not_change_the_hash():
+    _, before = parse_set_cards(json.dumps([card("OP01-001", "Zoro", 1.0)]).encode())
+    _, repriced = parse_set_cards(json.dumps([card("OP01-001", "Zoro", 2.5)]).encode())
+    _, renamed = parse_set_cards(json.dumps([card("OP01-001", "Roronoa Zoro", 1.0)]).encode())
+    assert before == repriced != renamed
+
+
+def test_price_only_change_records_snapshots(db):
+    serve([card("OP01-001", "Zoro", 1.0), card("OP01-002", "Nami", 4.0)])
+    first = sync(db, None)
+    assert first["changed"] and first["cards"] == 2
+
+    serve([card("OP01-001", "Zoro", 1.5), card("OP01-002", "Nami", 4.0)])
+    second = sync(db, {"content_hash": first["watermark"]["content_hash"]})
+    assert not second["changed"]
+    assert second["prices_changed"] == 1
+    assert db.query(CardPrice.market_price).filter(CardPrice.card_id == "OP01-001").scalar() == 1.5
+    assert db.query(PriceSnapshot).filter(PriceSnapshot.card_id == "OP01-001").count() == 2
+
+    serve([card("OP01-001", "Roronoa Zoro", 1.5), card("OP01-002", "Nami", 4.0)])
+    third = sync(db, {"content_hash": second["watermark"]["content_hash"]})
+    assert third["changed"]
+    assert db.query(Card.name).filter(Card.id == "OP01-001").scalar() == "Roronoa Zoro"
@@ -0,0 +1,28 @@
+"""Stored profiles are only served to callers holding the profiling token"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.profiles import settings
+
+
+@pytest.fixture
+def client(app_db, tmp_path, monkeypatch):
+    from app.main import app
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+    return TestClient(app)
+
+
+def test_profiles_need_token(client, monkeypatch):
+    assert client.get("/api/profiles/").status_code == 404
+
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    profile_id = client.get("/api/leaders/", headers={"X-Profile": "s3cret"}).headers["x-profile-id"]
+
+    assert client.get("/api/profiles/").status_code == 403
+    assert client.get(f"/api/profiles/{profile_id}", headers={"X-Profile": "1"}).status_code == 403
+    listed = client.get("/api/profiles/", headers={"X-Profile": "s3cret"})
+    assert [profile["profile_id"] for profile in listed.json()] == [profile_id]
+    download = client.get(f"/api/profiles/{profile_id}?_profile=s3cret")
+    assert download.status_code == 200
+    assert "x-profile-id" not in download.headers  # The download itself isn't profiled
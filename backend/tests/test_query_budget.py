@@ -0,0 +1,69 @@
+"""The hot routes stay inside the SQL query budget on real data (SQL_STRICT is on in tests)"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_db
+from app.middleware import settings
+from app.models import Deck
+from app.read_models import MemoryStore, read_models
+from benchmarks.dataset import DatasetSpec, generate
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("budget") / "budget.db")
+    generate(path, DatasetSpec(leaders=20, cards=600, price_years=0.1))
+    engine = create_engine(f"sqlite:///{path}")
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        deck_id = db.query(Deck.id).order_by(Deck.id).first()[0]
+    yield Session, deck_id
+    engine.dispose()
+
+
+@pytest.fixture
+def client(seeded, monkeypatch):
+    from app.main import app
+
+    Session, _ = seeded
+
+    def seeded_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    assert settings.sql_strict
+    # A cold cache, so each route builds its read model inside the request
+    monkeypatch.setattr(read_models, "store", MemoryStore())
+    app.dependency_overrides[get_db] = seeded_db
+    try:
+        yield TestClient(app, raise_server_exceptions=False)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+HOT_ROUTES = [
+    "/api/leaders/tier-list",
+    "/api/prices/movers?days=7",
+    "/api/decks/{deck_id}/detailed",
+    "/api/matchups/matrix",
+]
+
+
+@pytest.mark.parametrize("route", HOT_ROUTES)
+def test_route_within_budget(seeded, client, route):
+    response = client.get(route.format(deck_id=seeded[1]))
+    assert response.status_code == 200, response.text
+    count = int(response.headers["x-db-query-count"])
+    assert 0 < count <= settings.sql_query_budget
+    assert float(response.headers["x-db-query-time-ms"]) >= 0
+
+
+def test_over_budget_fails(seeded, client, monkeypatch):
+    monkeypatch.setattr(settings, "sql_query_budget", 1)
+    response = client.get(f"/api/decks/{seeded[1]}/detailed")
+    assert response.status_code == 500
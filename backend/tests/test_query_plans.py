@@ -0,0 +1,22 @@
+"""The hot service queries must be served by their indexes (see benchmarks/query_plans.py)"""
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.query_plans import CASES, build_database, case_plans, check, sample_params
+
+
+@pytest.fixture(scope="module")
+def plans_db(tmp_path_factory):
+    engine = build_database(str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    db = sessionmaker(bind=engine)()
+    try:
+        yield engine, db, sample_params(db)
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_uses_index(plans_db, case):
+    engine, db, params = plans_db
+    assert check(case, case_plans(engine, db, case, params)) == []
@@ -0,0 +1,58 @@
+"""Paginated listings keep every listing, including arts that share a card number"""
+import asyncio
+
+from app import executors
+from app.scrapers.base import BaseScraper
+from app.scrapers.tcgplayer import parse_set_page
+
+
+def listing(*products):
+    rows = "".join(
+        f'<div class="search-result__product"><span class="product-card__name">{name}</span>'
+        f'<span class="product-card__number">{number}</span>'
+        f'<span class="product-card__market-price">${price}</span></div>'
+        for name, number, price in products
+    )
+    return f"<html><body>{rows}</body></html>"
+
+
+PAGE_1 = listing(("Monkey.D.Luffy", "OP01-024", "1.20"), ("Monkey.D.Luffy", "OP01-024", "45.00"))
+PAGE_2 = listing(("Roronoa Zoro", "OP01-025", "0.80"), ("Roronoa Zoro", "OP01-025", "19.99"))
+
+
+class ListingScraper(BaseScraper):
+    def __init__(self, pages):
+        super().__init__()
+        self.rate_limiter.interval = 0
+        self.pages = pages
+        self.fetched = []
+
+    async def fetch(self, url):
+        page = int(url.rsplit("=", 1)[1])
+        self.fetched.append(page)
+        return self.pages(page)
+
+    async def scrape(self):
+        pass
+
+
+def walk(pages, max_pages=10):
+    scraper = ListingScraper(pages)
+    items = asyncio.run(scraper.fetch_pages(lambda page: f"https://example.invalid/?page={page}", parse_set_page, max_pages))
+    return items, scraper.fetched
+
+
+def test_parallel_arts_are_kept(monkeypatch):
+    monkeypatch.setattr(executors.settings, "ingestion_offload", False)
+    items, fetched = walk(lambda page: {1: PAGE_1, 2: PAGE_2}.get(page, "<html></html>"))
+    assert [(item["card_id"], item["market_price"]) for item in items] == [
+        ("OP01-024", 1.2), ("OP01-024", 45.0), ("OP01-025", 0.8), ("OP01-025", 19.99),
+    ]
+    assert fetched == [1, 2, 3]
+
+
+def test_stops_when_page_parameter_is_ignored(monkeypatch):
+    monkeypatch.setattr(executors.settings, "ingestion_offload", False)
+    items, fetched = walk(lambda page: PAGE_1)
+    assert len(items) == 2
+    assert fetched == [1, 2]
@@ -0,0 +1,58 @@
+"""Slow-query plans must not disturb the caller's transaction, and the log is admin-only"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.admin import settings as admin_settings
+from app.slow_queries import explain
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, statement, parameters=None):
+        self.connection.executed.append(statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("syntax error at or near \"%\"")
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def test_failed_postgresql_explain_rolls_back_to_savepoint():
+    connection = FakeConnection()
+    plan = explain(connection.cursor(), "postgresql", "SELECT * FROM cards WHERE id = %(id)s", {"id": "OP01-001"})
+    assert plan[0].startswith("EXPLAIN failed")
+    assert connection.executed == [
+        "SAVEPOINT slow_query_explain",
+        "EXPLAIN SELECT * FROM cards WHERE id = %(id)s",
+        "ROLLBACK TO SAVEPOINT slow_query_explain",
+    ]
+
+
+@pytest.fixture
+def client(app_db):
+    from app.main import app
+    return TestClient(app)
+
+
+def test_slow_queries_need_admin(client, monkeypatch):
+    assert client.get("/api/admin/slow-queries").status_code == 404
+
+    monkeypatch.setattr(admin_settings, "admin_enabled", True)
+    monkeypatch.setattr(admin_settings, "admin_token", "s3cret")
+    assert client.get("/api/admin/slow-queries").status_code == 403
+    assert client.delete("/api/admin/slow-queries", headers={"X-Admin-Token": "1"}).status_code == 403
+    assert client.get("/api/admin/slow-queries", headers={"X-Admin-Token": "s3cret"}).status_code == 200
+    assert client.delete("/api/admin/slow-queries", headers={"X-Admin-Token": "s3cret"}).status_code == 200
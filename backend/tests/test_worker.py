@@ -0,0 +1,49 @@
+"""Worker leases: a job keeps its lease however long its DB work takes"""
+import asyncio
+import time
+
+from app.database import SessionLocal
+from app.executors import run_db
+from app.scheduler import JOB_HANDLERS
+from app.services import JobQueue
+from app.services.job_queue import SUCCEEDED
+from app.worker import Worker
+
+LEASE_SECONDS = 0.6
+
+
+def test_long_db_write_keeps_lease(app_db, monkeypatch):
+    stolen = []
+
+    async def slow_write():
+        # Hold the ingestion DB thread for several lease periods, as a big bulk write would
+        await run_db(time.sleep, 3 * LEASE_SECONDS)
+        return {"written": 1}
+
+    async def other_worker():
+        await asyncio.sleep(2 * LEASE_SECONDS)
+        stolen.append(await asyncio.to_thread(Worker._queue_call, "lease", "other-worker", LEASE_SECONDS))
+
+    monkeypatch.setitem(JOB_HANDLERS, "test_slow_write", slow_write)
+    db = SessionLocal()
+    try:
+        job, _ = JobQueue(db).enqueue("test_slow_write")
+        job_id = job.id
+    finally:
+        db.close()
+
+    worker = Worker(worker_id="test-worker", concurrency=1, profile_kinds=[])
+    worker.lease_seconds = LEASE_SECONDS
+
+    async def run():
+        await asyncio.gather(worker.run(once=True), other_worker())
+
+    asyncio.run(run())
+
+    assert stolen == [None]
+    db = SessionLocal()
+    try:
+        job = JobQueue(db).get(job_id)
+        assert (job.status, job.attempts) == (SUCCEEDED, 1)
+    finally:
+        db.close()
@@ -46,6 +46,12 @@ export interface Deck {
   second_win_rate: number;
   tier: string | null;
   source_url: string | null;
+  meta_share: number | null;
+  meta_rank: number | null;
+  tournament_points: number | null;
+  placings: number | null;
+  tournament_wins: number | null;
+  tournament_win_rate: number | null;  // % of placings that won the event
   created_at: string;
   updated_at: string;
 }
@@ -70,6 +76,7 @@ export interface CardInDeck {
   count: number;
   price_usd: number | null;
   price_eur: number | null;
+  inclusion_rate: number | null;
 }
 
 export interface DeckDetailedResponse extends Deck {